@@ -0,0 +1,54 @@
+# Opaque keyset cursors for /v1/content pages (shared by the live query and the replica).
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Keyset position of a page boundary: (published_at, doc id); id is None for legacy cursors
+After = Tuple[str, Optional[str]]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def filter_hash(
+    channel_id: Optional[str], made_for_kids: Optional[bool], language: Optional[str], topic: Optional[str]
+) -> str:
+    raw = json.dumps([channel_id, made_for_kids, (language or "").lower() or None, topic])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
+
+
+def doc_id(item: Dict[str, Any]) -> str:
+    # Same scheme as the ingest writer's make_content_id
+    return f"yt:{item.get('video_id') or item.get('source_item_id')}"
+
+
+def encode_cursor(item: Dict[str, Any], filters: str) -> str:
+    """Opaque, URL-safe cursor after `item`: base64 of {"p": published_at, "i": doc id, "f": filter hash}."""
+    raw = json.dumps({"p": item.get("published_at"), "i": doc_id(item), "f": filters}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], filters: str) -> Optional[After]:
+    """Decode a cursor issued for the same filters; bare `published_at` cursors from older clients still work."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        data = None
+    if not isinstance(data, dict):
+        return cursor, None
+    if data.get("f") != filters or not data.get("p"):
+        raise InvalidCursor("cursor does not belong to these filters")
+    return str(data["p"]), (str(data["i"]) if data.get("i") else None)
+
+
+def next_page_cursor(docs: List[Dict[str, Any]], page_size: int, filters: str) -> Optional[str]:
+    """Cursor for the following page when more than `page_size` docs were fetched."""
+    return encode_cursor(docs[page_size - 1], filters) if len(docs) > page_size else None
@@ -1,69 +1,385 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional, List, Dict, Any
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Hashable, Tuple
 
 from fastapi import FastAPI, Query, Request
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+try:  # imported as a package: `uvicorn apps.api.main:app` from the repo root, tests
+    from .cursors import After, InvalidCursor, decode_cursor, doc_id, encode_cursor, filter_hash, next_page_cursor
+    from .replica import Replica
+except ImportError:  # the container runs `uvicorn main:app` from apps/api
+    from cursors import After, InvalidCursor, decode_cursor, doc_id, encode_cursor, filter_hash, next_page_cursor  # type: ignore
+    from replica import Replica  # type: ignore
+
+
+_client: Any = None
 
 
 def _fs_client(project_id: str):
+    """Process-wide async Firestore client (one gRPC channel shared by all requests)."""
+    global _client
+    if _client is not None and getattr(_client, "project", project_id) == project_id:
+        return _client
     try:
         from google.cloud import firestore  # type: ignore
     except Exception as e:
         raise RuntimeError(
             "google-cloud-firestore is required. Install via `make install-ingest` or `pip install google-cloud-firestore`"
         ) from e
-    return firestore.Client(project=project_id)
+    _client = firestore.AsyncClient(project=project_id)
+    return _client
+
+
+# Upper bound on the Firestore reads behind one response (fallback queries included); cancelled when it expires
+QUERY_TIMEOUT = float(os.getenv("LUMENS_API_QUERY_TIMEOUT", "10"))
+
+
+async def _with_timeout(coro: Awaitable[Any]) -> Any:
+    return await asyncio.wait_for(coro, QUERY_TIMEOUT)
+
+
+async def _stream(q: Any) -> List[Dict[str, Any]]:
+    return [d.to_dict() async for d in q.stream()]
+
+
+class _ResponseCache:
+    """Bounded in-memory LRU of query results with a TTL and stale-while-revalidate.
+
+    Fresh entries (younger than `ttl`) are served directly. Entries up to
+    `ttl + stale` old are served immediately while one background task
+    refreshes them; older entries are recomputed inline. `prefetch` warms a
+    key the client is likely to ask for next. Concurrent misses
+    for the same key share a single computation. Failed computations are
+    never cached. Runs on the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0, stale: float = 600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale = stale
+        self.counters: Dict[str, int] = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "prefetches": 0, "background_errors": 0, "evictions": 0
+        }
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= self.ttl + self.stale:
+                self._entries.move_to_end(key)
+                if age <= self.ttl:
+                    self.counters["hits"] += 1
+                else:
+                    self.counters["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self.counters["refreshes"] += 1
+                        self._spawn(key, compute, background=True)
+                return entry[1]
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # shield: a cancelled waiter must not cancel the shared query
+            value = await asyncio.shield(pending)
+            if value is not None:
+                self.counters["coalesced"] += 1
+                return value
+        self.counters["misses"] += 1
+        return await asyncio.shield(self._spawn(key, compute, background=False))
+
+    def prefetch(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        """Warm `key` in the background unless it is already fresh or loading."""
+        entry = self._entries.get(key)
+        if key in self._inflight or (entry is not None and time.monotonic() - entry[0] <= self.ttl):
+            return
+        self.counters["prefetches"] += 1
+        self._spawn(key, compute, background=True)
+
+    def _spawn(self, key: Hashable, compute: Callable[[], Awaitable[Any]], background: bool) -> "asyncio.Future[Any]":
+        task = asyncio.ensure_future(self._load(key, compute, background))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, compute: Callable[[], Awaitable[Any]], background: bool) -> Any:
+        try:
+            value = await compute()
+        except Exception:
+            if not background:
+                raise
+            self.counters["background_errors"] += 1
+            return None
+        finally:
+            self._inflight.pop(key, None)
+        self._put(key, value)
+        return value
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self.counters)
+        out["entries"] = len(self._entries)
+        out["in_flight"] = len(self._inflight)
+        lookups = out["hits"] + out["stale_hits"] + out["coalesced"] + out["misses"]
+        served = out["hits"] + out["stale_hits"] + out["coalesced"]
+        out["hit_rate_pct"] = round(100.0 * served / lookups) if lookups else 0
+        return out
+
 
+# Feeds only change when ingest runs, so short TTLs with a long stale window are safe
+_cache = _ResponseCache(
+    max_entries=int(os.getenv("LUMENS_API_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("LUMENS_API_CACHE_TTL", "60")),
+    stale=float(os.getenv("LUMENS_API_CACHE_STALE", "600")),
+)
 
-def _query_content(
+
+# Per-endpoint HTTP caching policy for browsers and any CDN in front of Cloud Run
+CACHE_CONTROL: Dict[str, str] = {
+    "content": os.getenv("LUMENS_API_CACHE_CONTROL_CONTENT", "public, max-age=60, stale-while-revalidate=600"),
+    "home": os.getenv("LUMENS_API_CACHE_CONTROL_HOME", "public, max-age=60, stale-while-revalidate=600"),
+    "categories": os.getenv("LUMENS_API_CACHE_CONTROL_CATEGORIES", "public, max-age=604800, immutable"),
+}
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+def _etag(items: List[Dict[str, Any]], *extra: Any) -> str:
+    """Strong ETag over a result set: doc ids plus their `updated_at` stamps.
+
+    Items without a stamp (written before the writer recorded one) hash
+    their full content instead.
+    """
+    h = hashlib.sha1()
+    for part in extra:
+        h.update(f"{part}\0".encode("utf-8"))
+    for it in items:
+        h.update(f"{it.get('video_id') or it.get('source_item_id') or ''}\0".encode("utf-8"))
+        stamp = it.get("updated_at")
+        h.update(str(stamp).encode("utf-8") if stamp else json.dumps(it, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\n")
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {t.strip() for t in header.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _conditional(request: Request, endpoint: str, etag: str, build: Callable[[Dict[str, str]], Response]) -> Response:
+    """304 when the client already has `etag`; otherwise the response from `build(headers)`."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL[endpoint]}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return build(headers)
+
+
+async def _query_content(
     project_id: str,
     limit: int,
     channel_id: Optional[str] = None,
     made_for_kids: Optional[bool] = None,
     language: Optional[str] = None,
     topic: Optional[str] = None,
+    fields: Optional[List[str]] = None,
 ) -> List[Dict[str, Any]]:
     client = _fs_client(project_id)
-    from google.cloud.firestore_v1 import FieldFilter  # type: ignore
     from google.cloud import firestore as _fs  # type: ignore
 
-    q = client.collection("content")
-    if channel_id:
-        q = q.where(filter=FieldFilter("channel_id", "==", channel_id))
-    if made_for_kids is not None:
-        q = q.where(filter=FieldFilter("made_for_kids", "==", made_for_kids))
-    if language:
-        # If requesting English, prefer derived boolean filter to catch mislabels
-        if language.lower() == "en":
-            q = q.where(filter=FieldFilter("is_english", "==", True))
-        else:
-            q = q.where(filter=FieldFilter("language", "==", language))
-    if topic:
-        q = q.where(filter=FieldFilter("topics", "array_contains", topic))
+    q = _content_query(client, channel_id, made_for_kids, language, topic, fields)
     # Order newest first; if Firestore requires an index and it's missing,
     # fall back to unordered results instead of failing the page.
     try:
-        q = q.order_by("published_at", direction=_fs.Query.DESCENDING).limit(limit)
-        return [d.to_dict() for d in q.stream()]
+        return await _stream(q.order_by("published_at", direction=_fs.Query.DESCENDING).limit(limit))
     except Exception:
-        q = q.limit(limit)
-        return [d.to_dict() for d in q.stream()]
+        return await _stream(q.limit(limit))
+
+
+# Feed snapshots precomputed by ingest (services/ingest/lib/store/feeds.py)
+FEED_COLLECTION = "feeds"
+
+
+def _feed_key(language: Optional[str], made_for_kids: Optional[bool], topic: Optional[str]) -> Optional[str]:
+    """Snapshot doc id for these filters (mirrors ingest `feed_key`); None if not materialized."""
+    lang = (language or "any").lower()
+    if lang not in ("any", "en"):
+        return None
+    if topic and topic not in {c["slug"] for c in CATEGORIES}:
+        return None
+    kids = "any" if made_for_kids is None else ("kids" if made_for_kids else "general")
+    return f"{lang}__{kids}__{topic or 'all'}"
+
+
+async def _feed_page(
+    project_id: str,
+    limit: int,
+    channel_id: Optional[str] = None,
+    made_for_kids: Optional[bool] = None,
+    language: Optional[str] = None,
+    topic: Optional[str] = None,
+    after: Optional[After] = None,
+    fields: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """First page from a feed snapshot with one document read; None means use the live query.
+
+    Snapshots hold card fields only, so projections needing other fields
+    (including whole documents) go to the live query.
+    """
+    key = None if after or channel_id else _feed_key(language, made_for_kids, topic)
+    if key is None:
+        return None
+    snap = await _fs_client(project_id).collection(FEED_COLLECTION).document(key).get()
+    doc = snap.to_dict() if snap.exists else None
+    if not doc or limit > int(doc.get("size") or 0):
+        return None
+    held = doc.get("fields")
+    if held is not None and (fields is None or not set(fields) <= set(held)):
+        return None
+    items = doc.get("items") or []
+    filters = filter_hash(channel_id, made_for_kids, language, topic)
+    next_cursor = next_page_cursor(items, limit, filters)
+    if next_cursor is None and len(items) == limit and doc.get("next_cursor"):
+        # The snapshot ends exactly at this page but the feed continues
+        next_cursor = encode_cursor(items[-1], filters)
+    return {"items": items[:limit], "nextCursor": next_cursor, "topicFallback": bool(doc.get("fallback"))}
+
+
+class _FirestoreReplicaSource:
+    """Reads `content` for the replica: full scans plus `updated_at` delta pulls.
 
+    Any object with the same two async-iterator methods can stand in (tests,
+    or a different backing store); with FIRESTORE_EMULATOR_HOST set the
+    client talks to the emulator.
+    """
 
-def _env() -> Environment:
-    templates_dir = os.path.join(os.path.dirname(__file__), "templates")
-    return Environment(
-        loader=FileSystemLoader(templates_dir),
-        autoescape=select_autoescape(["html", "xml"]),
+    def __init__(self, project_id: str, collection: str = "content") -> None:
+        self.project_id = project_id
+        self.collection = collection
+
+    async def scan(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        async for d in _fs_client(self.project_id).collection(self.collection).stream():
+            yield d.id, d.to_dict()
+
+    async def changes_since(self, stamp: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Docs with `updated_at >= stamp` (inclusive: stamps have one-second resolution)."""
+        from google.cloud.firestore_v1 import FieldFilter  # type: ignore
+
+        q = _fs_client(self.project_id).collection(self.collection).where(filter=FieldFilter("updated_at", ">=", stamp))
+        async for d in q.stream():
+            yield d.id, d.to_dict()
+
+
+# Optional local replica (LUMENS_API_REPLICA=1); set up at startup
+_replica: Optional[Replica] = None
+_replica_task: Optional["asyncio.Task[None]"] = None
+
+
+async def _start_replica(project_id: str, source: Any = None) -> Replica:
+    global _replica, _replica_task
+    replica = Replica(
+        source or _FirestoreReplicaSource(project_id),
+        sync_interval=float(os.getenv("LUMENS_API_REPLICA_SYNC_SECONDS", "60")),
+        rescan_interval=float(os.getenv("LUMENS_API_REPLICA_RESCAN_SECONDS", str(6 * 3600))),
+        lag=float(os.getenv("LUMENS_API_REPLICA_LAG_SECONDS", "30")),
     )
+    snapshot = os.getenv("LUMENS_API_REPLICA_SNAPSHOT")
+    if snapshot and os.path.exists(snapshot):
+        print(f"Replica: loaded {replica.load_ndjson(snapshot)} docs from {snapshot}")
+    _replica = replica
+    _replica_task = asyncio.ensure_future(replica.run())
+    return replica
+
+
+# Templates compile once per process; compiled bytecode is also cached on disk so
+# fresh instances (cold starts) skip the Jinja compile step
+_templates_dir = os.path.join(os.path.dirname(__file__), "templates")
+_bytecode_dir = os.getenv("LUMENS_TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lumens-jinja"))
+os.makedirs(_bytecode_dir, exist_ok=True)
+_jinja = Environment(
+    loader=FileSystemLoader(_templates_dir),
+    autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=FileSystemBytecodeCache(_bytecode_dir),
+    auto_reload=os.getenv("LUMENS_TEMPLATE_RELOAD", "").lower() in ("1", "true", "yes"),
+)
+
+
+class _FragmentCache:
+    """LRU of rendered card HTML keyed by (doc id, update stamp).
+
+    Rendering happens on the streaming response's worker thread, hence the lock.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self.counters: Dict[str, int] = {"hits": 0, "renders": 0}
+        self._entries: "OrderedDict[Tuple[str, str], Markup]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, item: Dict[str, Any]) -> Markup:
+        stamp = item.get("updated_at") or hashlib.sha1(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        key = (doc_id(item), str(stamp))
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return html
+        html = Markup(_jinja.get_template("_card.html").render(it=item))
+        with self._lock:
+            self.counters["renders"] += 1
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries)}
+
+
+_cards = _FragmentCache(int(os.getenv("LUMENS_CARD_CACHE_SIZE", "4096")))
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # The async client binds to the running loop, so create it from inside it
+    project_id = os.getenv("LUMENS_GCP_PROJECT")
+    if project_id:
+        try:
+            _fs_client(project_id)
+        except Exception as e:
+            print(f"WARN: Firestore client not created at startup: {e}")
+        if os.getenv("LUMENS_API_REPLICA", "").lower() in ("1", "true", "yes"):
+            await _start_replica(project_id)
+    try:
+        yield
+    finally:
+        if _replica_task is not None:
+            _replica_task.cancel()
 
 
-app = FastAPI(title="Lumens API (MVP)")
+app = FastAPI(title="Lumens API (MVP)", lifespan=_lifespan)
 
 
 # Mount static assets
@@ -73,64 +389,155 @@ if os.path.isdir(static_dir):
 
 
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"ok": True}
 
 
+def _content_key(
+    project_id: str,
+    limit: int,
+    channel_id: Optional[str],
+    made_for_kids: Optional[bool],
+    language: Optional[str],
+    topic: Optional[str],
+    cursor: Optional[str],
+    fields: Optional[List[str]] = None,
+) -> Tuple[Any, ...]:
+    return ("content", project_id, channel_id, made_for_kids, language, topic, cursor, limit, tuple(fields or ()))
+
+
+def _content_loader(
+    project_id: str,
+    limit: int,
+    channel_id: Optional[str],
+    made_for_kids: Optional[bool],
+    language: Optional[str],
+    topic: Optional[str],
+    after: Optional[After],
+    fields: Optional[List[str]] = None,
+) -> Callable[[], Awaitable[Tuple[Dict[str, Any], str]]]:
+    """Cache loader for one `/v1/content` page: (payload, etag)."""
+
+    async def _fetch() -> Dict[str, Any]:
+        if _replica is not None and _replica.ready:
+            page = _replica.page(limit, channel_id, made_for_kids, language, topic, after)
+            return {**page, "items": _decorate_items(_project(page["items"], fields))}
+        # First pages of common feeds come from ingest-time snapshots
+        try:
+            snapshot = await _feed_page(project_id, limit, channel_id, made_for_kids, language, topic, after, fields)
+        except Exception:
+            snapshot = None
+        if snapshot is not None:
+            return {**snapshot, "items": _decorate_items(_project(snapshot["items"], fields))}
+        # Use paged query; fall back to simple if unavailable
+        try:
+            return await _query_content_paged(project_id, limit, channel_id, made_for_kids, language, topic, after, fields)
+        except Exception:
+            items = await _query_content(project_id, limit, channel_id, made_for_kids, language, topic, fields)
+            return {"items": _decorate_items(items)}
+
+    async def _load() -> Tuple[Dict[str, Any], str]:
+        # One deadline for the whole fetch, fallbacks included
+        result = await _with_timeout(_fetch())
+        # A channel's own page keeps its re-uploads: their canonical is usually on another channel
+        result = {**result, "items": _visible(result["items"], collapse=not channel_id)}
+        # Each projection is a distinct representation, so it is part of the ETag
+        return result, _etag(result["items"], result.get("nextCursor"), fields)
+
+    return _load
+
+
 @app.get("/v1/content")
-def get_content(
+async def get_content(
+    request: Request,
     limit: int = Query(24, ge=1, le=100),
     channelId: Optional[str] = None,
     madeForKids: Optional[bool] = Query(None),
     language: Optional[str] = Query(None),
     topic: Optional[str] = Query(None),
-    cursor: Optional[str] = Query(None, description="Opaque cursor from previous page (published_at)"),
-) -> JSONResponse:
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's nextCursor"),
+    fields: Optional[str] = Query(
+        None, description="'card' (default), 'full', or a comma-separated list of fields (dotted paths allowed)"
+    ),
+) -> Response:
     project_id = os.getenv("LUMENS_GCP_PROJECT")
     if not project_id:
         return JSONResponse({"error": "Set LUMENS_GCP_PROJECT"}, status_code=400)
-    # Use paged query; fall back to simple if unavailable
+    filters = filter_hash(channelId, madeForKids, language, topic)
     try:
-        result = _query_content_paged(project_id, limit, channelId, madeForKids, language, topic, cursor)  # type: ignore[name-defined]
-        return JSONResponse(result)
-    except Exception:
-        items = _query_content(project_id, limit, channelId, madeForKids, language, topic)
-        return JSONResponse({"items": _decorate_items(items)})
+        after = decode_cursor(cursor, filters)
+        projection = _parse_fields(fields)
+    except (InvalidCursor, InvalidFields) as e:
+        return JSONResponse({"error": str(e)}, status_code=400, headers=NO_STORE)
+
+    key = _content_key(project_id, limit, channelId, madeForKids, language, topic, cursor, projection)
+    try:
+        result, etag = await _cache.get(
+            key, _content_loader(project_id, limit, channelId, madeForKids, language, topic, after, projection)
+        )
+    except asyncio.TimeoutError:
+        return JSONResponse({"error": "Firestore query timed out"}, status_code=504, headers=NO_STORE)
+    next_cursor = result.get("nextCursor")
+    if next_cursor and not (_replica is not None and _replica.ready):
+        # Infinite scroll asks for the next page right away; have it cached by then
+        _cache.prefetch(
+            _content_key(project_id, limit, channelId, madeForKids, language, topic, next_cursor, projection),
+            _content_loader(
+                project_id, limit, channelId, madeForKids, language, topic, decode_cursor(next_cursor, filters), projection
+            ),
+        )
+    return _conditional(request, "content", etag, lambda headers: JSONResponse(result, headers=headers))
 
 
 @app.get("/")
-def home(
+async def home(
     request: Request,
     limit: int = Query(24, ge=1, le=100),
     lang: Optional[str] = Query("en"),
-) -> HTMLResponse:
+) -> Response:
     project_id = os.getenv("LUMENS_GCP_PROJECT")
     if not project_id:
         return HTMLResponse(
             "<h3>Set LUMENS_GCP_PROJECT to your GCP project id</h3>", status_code=500
         )
-    items = _query_content(project_id, limit, language=lang)
-    # Prepare display-friendly fields
-    for it in items:
-        it["thumb"] = (
-            it.get("thumbnails", {}).get("medium", {}).get("url")
-            or it.get("thumbnails", {}).get("default", {}).get("url")
-        )
-        vid = it.get("video_id") or it.get("source_item_id")
-        it["url"] = it.get("video_url") or (f"https://www.youtube.com/watch?v={vid}" if vid else "#")
-        if vid:
-            # Use official YouTube embed with safe, monetization-friendly params
-            it["embed"] = (
-                f"https://www.youtube.com/embed/{vid}?playsinline=1&rel=0&modestbranding=1&enablejsapi=1"
-            )
-        else:
-            it["embed"] = None
 
+    # The grid only shows card fields (plus the ones ETags and duplicate collapsing read)
+    card = _parse_fields("card")
+
+    async def _fetch() -> List[Dict[str, Any]]:
+        try:
+            snapshot = await _feed_page(project_id, limit, language=lang, fields=card)
+        except Exception:
+            snapshot = None
+        if snapshot is not None:
+            return _project(snapshot["items"], card)
+        return await _query_content(project_id, limit, language=lang, fields=card)
+
+    async def _load() -> Tuple[List[Dict[str, Any]], str]:
+        if _replica is not None and _replica.ready:
+            items = _visible(_project(_replica.page(limit, language=lang)["items"], card))
+            return items, _etag(items, os.getenv("K_REVISION", ""))
+        items = _visible(await _with_timeout(_fetch()))
+        # The page also changes with each deploy (template/static tweaks)
+        return items, _etag(items, os.getenv("K_REVISION", ""))
+
+    try:
+        cached, etag = await _cache.get(("home", project_id, lang, limit), _load)
+    except asyncio.TimeoutError:
+        return HTMLResponse("<h3>Content is taking too long to load; please retry</h3>", status_code=504, headers=NO_STORE)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL["home"]})
+    items = _decorate_items(cached)
+    for it in items:
+        it["url"] = it["url"] or "#"
     featured = items[0] if items else None
-    env = _env()
-    tpl = env.get_template("index.html")
-    html = tpl.render(items=items, featured=featured, title="Latest Videos")
-    return HTMLResponse(html)
+    # Cards render lazily while the page streams, so the head and hero go out first
+    chunks = _jinja.get_template("index.html").generate(
+        cards=(_cards.render(it) for it in items), featured=featured, title="Latest Videos"
+    )
+    return StreamingResponse(
+        chunks, media_type="text/html; charset=utf-8", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL["home"]}
+    )
 
 
 # Curated categories (topic slugs) for clients
@@ -141,6 +548,99 @@ CATEGORIES: List[Dict[str, str]] = [
     {"slug": "seerah", "label": "Seerah"},
     {"slug": "nasheeds", "label": "Nasheeds"},
 ]
+_CATEGORIES_ETAG = f'"{hashlib.sha1(json.dumps(CATEGORIES, sort_keys=True).encode("utf-8")).hexdigest()[:32]}"'
+
+
+# Named projections for list endpoints; None means whole documents
+FIELD_PROFILES: Dict[str, Optional[List[str]]] = {
+    "card": [
+        "video_id",
+        "video_url",
+        "title",
+        "channel_id",
+        "channel_title",
+        "published_at",
+        "duration_seconds",
+        "thumbnails.medium",
+        "thumbnails.default",
+    ],
+    "full": None,
+}
+# Always read: keyset cursors, ETags, decoration, policy filtering and duplicate collapsing depend on them.
+# Feed snapshots store exactly card + these (FEED_FIELDS in services/ingest/lib/store/feeds.py)
+_REQUIRED_FIELDS = ["video_id", "source_item_id", "published_at", "updated_at", "duplicate_of", "eligible"]
+# Fields added by _decorate_items and what they are derived from
+_DERIVED_FIELDS: Dict[str, List[str]] = {
+    "thumb": ["thumbnails.medium", "thumbnails.default"],
+    "url": ["video_url"],
+    "embed": [],
+}
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Projection for a `fields=` value: a profile name or comma-separated field paths."""
+    name = (fields or "card").strip()
+    if name in FIELD_PROFILES:
+        profile = FIELD_PROFILES[name]
+        return None if profile is None else sorted({*profile, *_REQUIRED_FIELDS})
+    paths = set(_REQUIRED_FIELDS)
+    for raw in name.split(","):
+        path = raw.strip()
+        if not path:
+            continue
+        if not _FIELD_RE.match(path):
+            raise InvalidFields(f"invalid field: {path!r}")
+        paths.update(_DERIVED_FIELDS.get(path, [path]))
+    return sorted(paths)
+
+
+def _project(items: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Apply a projection in memory (feed snapshots and the replica hold whole documents)."""
+    if not fields:
+        return items
+    out: List[Dict[str, Any]] = []
+    for it in items:
+        d: Dict[str, Any] = {}
+        for path in fields:
+            parts = path.split(".")
+            src: Any = it
+            for part in parts:
+                src = src.get(part) if isinstance(src, dict) else None
+                if src is None:
+                    break
+            if src is None:
+                continue
+            dst = d
+            for part in parts[:-1]:
+                dst = dst.setdefault(part, {})
+            dst[parts[-1]] = src
+        out.append(d)
+    return out
+
+
+def _collapse_duplicates(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop re-uploads ingest tagged with `duplicate_of`; the canonical video is listed instead.
+
+    Cursors come from the unfiltered page, so a page may be a little short
+    but paging never skips or repeats items.
+    """
+    return [it for it in items if not it.get("duplicate_of")]
+
+
+def _drop_ineligible(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop records an ingest policy marked `eligible: false` (records without a decision are kept)."""
+    return [it for it in items if it.get("eligible") is not False]
+
+
+def _visible(items: List[Dict[str, Any]], collapse: bool = True) -> List[Dict[str, Any]]:
+    """What list endpoints show: eligible records, re-uploads collapsed into their canonical video unless `collapse` is off."""
+    items = _drop_ineligible(items)
+    return _collapse_duplicates(items) if collapse else items
 
 
 def _decorate_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -163,18 +663,16 @@ def _decorate_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return out
 
 
-def _query_content_paged(
-    project_id: str,
-    limit: int,
+def _content_query(
+    client: Any,
     channel_id: Optional[str] = None,
     made_for_kids: Optional[bool] = None,
     language: Optional[str] = None,
     topic: Optional[str] = None,
-    cursor: Optional[str] = None,
-) -> Dict[str, Any]:
-    client = _fs_client(project_id)
+    fields: Optional[List[str]] = None,
+) -> Any:
+    """Filtered `content` query; `fields` projects server-side so unused fields are never read or sent."""
     from google.cloud.firestore_v1 import FieldFilter  # type: ignore
-    from google.cloud import firestore as _fs  # type: ignore
 
     q = client.collection("content")
     if channel_id:
@@ -182,52 +680,104 @@ def _query_content_paged(
     if made_for_kids is not None:
         q = q.where(filter=FieldFilter("made_for_kids", "==", made_for_kids))
     if language:
+        # If requesting English, prefer derived boolean filter to catch mislabels
         if language.lower() == "en":
             q = q.where(filter=FieldFilter("is_english", "==", True))
         else:
             q = q.where(filter=FieldFilter("language", "==", language))
     if topic:
         q = q.where(filter=FieldFilter("topics", "array_contains", topic))
+    if fields:
+        q = q.select(fields)
+    return q
+
+
+# Per-topic doc counts maintained by the ingest Firestore writer
+TOPIC_COVERAGE = ("meta", "topic_coverage")
+
+
+async def _topic_coverage(project_id: str) -> Optional[Dict[str, int]]:
+    """Cached topic → doc count index; None when it is missing or cannot be read (then topics are queried blindly)."""
+
+    async def _load() -> Optional[Dict[str, int]]:
+        snap = await _fs_client(project_id).collection(TOPIC_COVERAGE[0]).document(TOPIC_COVERAGE[1]).get()
+        if not snap.exists:
+            # No writer run has recorded coverage yet; an empty index would hide every topic
+            return None
+        doc = snap.to_dict() or {}
+        return {str(k): int(v or 0) for k, v in (doc.get("topics") or {}).items()}
+
+    try:
+        return await _cache.get(("topic_coverage", project_id), _load)
+    except Exception:
+        return None
+
+
+async def _query_content_paged(
+    project_id: str,
+    limit: int,
+    channel_id: Optional[str] = None,
+    made_for_kids: Optional[bool] = None,
+    language: Optional[str] = None,
+    topic: Optional[str] = None,
+    after: Optional[After] = None,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """One page ordered by (published_at, doc id) descending, resuming strictly after `after`."""
+    client = _fs_client(project_id)
+    from google.cloud import firestore as _fs  # type: ignore
+
+    filters = filter_hash(channel_id, made_for_kids, language, topic)
+
+    # If no content carries the topic yet, skip straight to latest items without
+    # the topic filter so clients still show content (one query instead of two)
+    topic_fallback = False
+    if topic:
+        coverage = await _topic_coverage(project_id)
+        if coverage is not None and not coverage.get(topic):
+            topic, topic_fallback = None, True
+    q = _content_query(client, channel_id, made_for_kids, language, topic, fields)
 
     try:
-        q = q.order_by("published_at", direction=_fs.Query.DESCENDING)
         page_size = min(100, max(1, int(limit)))
-        if cursor:
-            q = q.start_after({"published_at": cursor})  # type: ignore[arg-type]
-        docs = list(q.limit(page_size + 1).stream())
-        items = _decorate_items([d.to_dict() for d in docs[:page_size]])
-        next_cursor = None
-        if len(docs) > page_size:
-            last = docs[page_size - 1].to_dict()
-            next_cursor = last.get("published_at")
-        # Fallback: if a topic was requested but no items matched (e.g., topics not populated yet),
-        # return latest items without topic filter so clients still show content.
-        if topic and not items:
-            q2 = client.collection("content")
-            if channel_id:
-                q2 = q2.where(filter=FieldFilter("channel_id", "==", channel_id))
-            if made_for_kids is not None:
-                q2 = q2.where(filter=FieldFilter("made_for_kids", "==", made_for_kids))
-            if language:
-                if language.lower() == "en":
-                    q2 = q2.where(filter=FieldFilter("is_english", "==", True))
-                else:
-                    q2 = q2.where(filter=FieldFilter("language", "==", language))
-            q2 = q2.order_by("published_at", direction=_fs.Query.DESCENDING)
-            if cursor:
-                q2 = q2.start_after({"published_at": cursor})  # type: ignore[arg-type]
-            docs2 = list(q2.limit(page_size + 1).stream())
-            items = _decorate_items([d.to_dict() for d in docs2[:page_size]])
-            next_cursor = None
-            if len(docs2) > page_size:
-                last2 = docs2[page_size - 1].to_dict()
-                next_cursor = last2.get("published_at")
-        return {"items": items, "nextCursor": next_cursor}
+
+        async def _page(query: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            query = query.order_by("published_at", direction=_fs.Query.DESCENDING)
+            if after and after[1]:
+                # Tie-break on the doc id so items sharing a timestamp are neither skipped nor repeated
+                query = query.order_by("__name__", direction=_fs.Query.DESCENDING)
+                last_ref = client.collection("content").document(after[1])
+                query = query.start_after({"published_at": after[0], "__name__": last_ref})  # type: ignore[arg-type]
+            elif after:
+                query = query.start_after({"published_at": after[0]})  # type: ignore[arg-type]
+            else:
+                query = query.order_by("__name__", direction=_fs.Query.DESCENDING)
+            docs = await _stream(query.limit(page_size + 1))
+            return _decorate_items(docs[:page_size]), next_page_cursor(docs, page_size, filters)
+
+        items, next_cursor = await _page(q)
+        # Coverage index can lag a fresh ingest; keep the empty-result fallback as a safety net.
+        # First page only: an empty later page is just the end of the topic's items
+        if topic and not items and after is None:
+            topic_fallback = True
+            items, next_cursor = await _page(_content_query(client, channel_id, made_for_kids, language, None, fields))
+        return {"items": items, "nextCursor": next_cursor, "topicFallback": topic_fallback}
     except Exception:
-        docs = list(q.limit(limit).stream())
-        return {"items": _decorate_items([d.to_dict() for d in docs]), "nextCursor": None}
+        docs = await _stream(q.limit(limit))
+        return {"items": _decorate_items(docs), "nextCursor": None, "topicFallback": topic_fallback}
 
 
 @app.get("/v1/categories")
-def get_categories() -> JSONResponse:
-    return JSONResponse({"items": CATEGORIES})
+async def get_categories(request: Request) -> Response:
+    return _conditional(
+        request, "categories", _CATEGORIES_ETAG, lambda headers: JSONResponse({"items": CATEGORIES}, headers=headers)
+    )
+
+
+@app.get("/v1/stats")
+async def get_stats() -> JSONResponse:
+    """Process-local counters for monitoring (per instance, reset on restart)."""
+    stats: Dict[str, Any] = {"cache": _cache.stats(), "cards": _cards.stats()}
+    if _replica is not None:
+        stats["replica"] = _replica.stats()
+    return JSONResponse(stats)
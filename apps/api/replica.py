@@ -0,0 +1,197 @@
+# In-memory read replica of Firestore `content` (LUMENS_API_REPLICA=1).
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .cursors import After, filter_hash, next_page_cursor
+except ImportError:  # the container runs `uvicorn main:app` from apps/api
+    from cursors import After, filter_hash, next_page_cursor  # type: ignore
+
+
+def _shift_stamp(stamp: str, seconds: float) -> str:
+    """Move an ISO `updated_at` stamp by `seconds`, keeping the writer's format (unparseable stamps are returned as is)."""
+    try:
+        t = dt.datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+    except ValueError:
+        return stamp
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=dt.timezone.utc)
+    shifted = (t + dt.timedelta(seconds=seconds)).astimezone(dt.timezone.utc).replace(microsecond=0)
+    return shifted.isoformat().replace("+00:00", "Z")
+
+
+class Replica:
+    """Compact in-memory SQLite copy of `content` answering feed queries in-process.
+
+    Filter columns are indexed together with `published_at`, and topics live
+    in a side table, so every `/v1/content` filter combination is an index
+    range scan. Bootstraps from an ingest NDJSON snapshot and/or a full scan
+    of `source`, then applies `updated_at` deltas every `sync_interval`
+    seconds; a periodic full rescan picks up deletions.
+
+    Delta pulls re-read the last `lag` seconds before the watermark: the
+    ingest writer stamps a batch before committing it, and parallel commits
+    with retry backoff can land after later-stamped ones. Upserts are
+    idempotent, so the overlap only costs a few re-reads.
+    """
+
+    def __init__(
+        self, source: Any, sync_interval: float = 60.0, rescan_interval: float = 6 * 3600, lag: float = 30.0
+    ) -> None:
+        self.source = source
+        self.sync_interval = sync_interval
+        self.rescan_interval = rescan_interval
+        self.lag = lag
+        self.ready = False
+        self.watermark: Optional[str] = None
+        self.counters: Dict[str, int] = {"scans": 0, "delta_pulls": 0, "upserts": 0, "errors": 0, "queries": 0}
+        self._db = sqlite3.connect(":memory:")
+        self._db.executescript(
+            """
+            CREATE TABLE content (
+                id TEXT PRIMARY KEY, is_english INTEGER, made_for_kids INTEGER, channel_id TEXT,
+                language TEXT, published_at TEXT, doc TEXT NOT NULL);
+            CREATE TABLE topics (topic TEXT NOT NULL, id TEXT NOT NULL, PRIMARY KEY (topic, id));
+            CREATE INDEX content_en ON content (is_english, published_at);
+            CREATE INDEX content_kids ON content (made_for_kids, published_at);
+            CREATE INDEX content_channel ON content (channel_id, published_at);
+            CREATE INDEX content_lang ON content (language, published_at);
+            CREATE INDEX content_published ON content (published_at, id);
+            """
+        )
+
+    def upsert(self, docs: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        n = 0
+        for doc_id, d in docs:
+            kids = d.get("made_for_kids")
+            self._db.execute(
+                "INSERT OR REPLACE INTO content VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    doc_id,
+                    1 if d.get("is_english") else 0,
+                    None if kids is None else int(bool(kids)),
+                    d.get("channel_id"),
+                    d.get("language"),
+                    d.get("published_at"),
+                    json.dumps(d, default=str),
+                ),
+            )
+            self._db.execute("DELETE FROM topics WHERE id = ?", (doc_id,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO topics VALUES (?, ?)", [(t, doc_id) for t in d.get("topics") or []]
+            )
+            stamp = d.get("updated_at")
+            if stamp and (self.watermark is None or str(stamp) > self.watermark):
+                self.watermark = str(stamp)
+            n += 1
+        self.counters["upserts"] += n
+        return n
+
+    def load_ndjson(self, path: str) -> int:
+        docs = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    d = json.loads(line)
+                    if d.get("video_id"):
+                        docs.append((f"yt:{d['video_id']}", d))
+        n = self.upsert(docs)
+        self.ready = self.ready or n > 0
+        return n
+
+    async def full_scan(self) -> int:
+        docs = [item async for item in self.source.scan()]
+        self._db.execute("DELETE FROM content")
+        self._db.execute("DELETE FROM topics")
+        n = self.upsert(docs)
+        self.counters["scans"] += 1
+        self.ready = True
+        return n
+
+    async def pull_changes(self) -> int:
+        if self.watermark is None:
+            return await self.full_scan()
+        since = _shift_stamp(self.watermark, -self.lag)
+        n = self.upsert([item async for item in self.source.changes_since(since)])
+        self.counters["delta_pulls"] += 1
+        return n
+
+    async def run(self) -> None:
+        """Background sync loop (deltas every `sync_interval`, full rescans every `rescan_interval`)."""
+        last_scan = 0.0 if not self.ready else time.monotonic()
+        while True:
+            try:
+                if time.monotonic() - last_scan >= self.rescan_interval or not self.ready:
+                    await self.full_scan()
+                    last_scan = time.monotonic()
+                else:
+                    await self.pull_changes()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["errors"] += 1
+                print(f"WARN: replica sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def has_topic(self, topic: str) -> bool:
+        return self._db.execute("SELECT 1 FROM topics WHERE topic = ? LIMIT 1", (topic,)).fetchone() is not None
+
+    def page(
+        self,
+        limit: int,
+        channel_id: Optional[str] = None,
+        made_for_kids: Optional[bool] = None,
+        language: Optional[str] = None,
+        topic: Optional[str] = None,
+        after: Optional[After] = None,
+    ) -> Dict[str, Any]:
+        """Same semantics as `_query_content_paged`, including the topic fallback."""
+        self.counters["queries"] += 1
+        filters = filter_hash(channel_id, made_for_kids, language, topic)
+        topic_fallback = bool(topic) and not self.has_topic(str(topic))
+        if topic_fallback:
+            topic = None
+        where: List[str] = []
+        args: List[Any] = []
+        if channel_id:
+            where.append("channel_id = ?")
+            args.append(channel_id)
+        if made_for_kids is not None:
+            where.append("made_for_kids = ?")
+            args.append(int(made_for_kids))
+        if language:
+            if language.lower() == "en":
+                where.append("is_english = 1")
+            else:
+                where.append("language = ?")
+                args.append(language)
+        if topic:
+            where.append("id IN (SELECT id FROM topics WHERE topic = ?)")
+            args.append(topic)
+        if after and after[1]:
+            where.append("(published_at < ? OR (published_at = ? AND id < ?))")
+            args.extend([after[0], after[0], after[1]])
+        elif after:
+            where.append("published_at < ?")
+            args.append(after[0])
+        sql = "SELECT doc FROM content"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY published_at DESC, id DESC LIMIT ?"
+        rows = self._db.execute(sql, [*args, limit + 1]).fetchall()
+        docs = [json.loads(r[0]) for r in rows]
+        return {"items": docs[:limit], "nextCursor": next_page_cursor(docs, limit, filters), "topicFallback": topic_fallback}
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self.counters)
+        out["docs"] = self._db.execute("SELECT COUNT(*) FROM content").fetchone()[0]
+        out["ready"] = self.ready
+        out["watermark"] = self.watermark
+        return out
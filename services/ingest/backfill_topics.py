@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .lib.pipeline import TopicCounter
+from .lib.store.feeds import DEFAULT_FEED_SIZE, write_feed_snapshots
+from .lib.topics import TopicTagger, topic_dictionaries
+from ..policy.compiler import load_policy
+from ..policy.reevaluate import iter_firestore, iter_ndjson, write_ndjson
+
+
+def retag(records: Iterable[Dict], tagger: TopicTagger, counter: TopicCounter, policies: List = ()) -> Iterator[Dict]:
+    """Yield only the records whose `topics` gained a slug (policies re-applied to them)."""
+    for rec in records:
+        counter.seen += 1
+        if not tagger.tag_batch([rec]):
+            continue
+        counter.tagged += 1
+        for t in rec["topics"]:
+            counter.per_topic[t] = counter.per_topic.get(t, 0) + 1
+        # Topic rules (blocked_topics, on_topic) depend on the new topics
+        for policy in policies:
+            policy.apply([rec])
+        yield rec
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Tag stored content with topic slugs (topics[]) without re-ingesting.")
+    ap.add_argument("--ndjson", default=None, help="Read content from an ingest NDJSON snapshot instead of Firestore")
+    ap.add_argument("--out", default=None, help="With --ndjson: write the re-tagged docs to this NDJSON file")
+    ap.add_argument("--firestore-project", default=os.getenv("LUMENS_GCP_PROJECT"), help="Scan and update Firestore in this project (env LUMENS_GCP_PROJECT)")
+    ap.add_argument("--firestore-collection", default="content", help="Firestore collection (default: content)")
+    ap.add_argument("--firestore-concurrency", type=int, default=4, help="Max Firestore update batches in flight (default: 4)")
+    ap.add_argument("--policy", action="append", default=[p for p in os.getenv("LUMENS_POLICIES", "").split(",") if p], help="Policy whose allowed_topics are tagged too and which is re-applied to re-tagged docs; repeatable (env LUMENS_POLICIES)")
+    ap.add_argument("--feed-size", type=int, default=int(os.getenv("LUMENS_FEED_SIZE", str(DEFAULT_FEED_SIZE))), help=f"Items per feed snapshot rebuilt after docs were re-tagged in Firestore; 0 disables (default: {DEFAULT_FEED_SIZE})")
+    ap.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = ap.parse_args(argv)
+
+    policies = [load_policy(Path(p)) for p in args.policy]
+    tagger = TopicTagger(topic_dictionaries(t for p in policies for t in p.allowed_topics))
+    counter = TopicCounter()
+    started = time.monotonic()
+
+    if args.ndjson:
+        changed = retag(iter_ndjson(Path(args.ndjson)), tagger, counter, policies)
+        if args.out and not args.dry_run:
+            n = write_ndjson(changed, Path(args.out))
+            print(f"Wrote {n} re-tagged docs → {args.out}")
+        else:
+            for _ in changed:
+                pass
+    elif args.firestore_project:
+        from .lib.store.firestore_writer import FirestoreContentWriter, firestore_client
+
+        client = firestore_client(str(args.firestore_project))
+        changed = retag(iter_firestore(client, args.firestore_collection), tagger, counter, policies)
+        if args.dry_run:
+            for _ in changed:
+                pass
+        else:
+            writer = FirestoreContentWriter(client, args.firestore_collection, max_in_flight=max(1, args.firestore_concurrency))
+            for rec in changed:
+                payload = {"video_id": rec.get("video_id"), "topics": rec["topics"]}
+                if policies:
+                    payload.update(policies=rec["policies"], eligible=rec["eligible"])
+                writer.add(payload)
+            writer.close()
+            counts = writer.counts()
+            print(f"Firestore: {counts['written']} docs updated, {counts['failed']} failed, {counts['retries']} retries")
+            # Category feeds were built before these docs had topics (fallback feeds); rebuild them on the topic index
+            if args.feed_size > 0 and counts["written"]:
+                try:
+                    n = write_feed_snapshots(client, args.firestore_collection, args.feed_size)
+                    print(f"Rebuilt {n} feed snapshots (first {args.feed_size} items each)")
+                except Exception as e:
+                    print(f"WARN: feed snapshots not rebuilt: {e}")
+    else:
+        print("Pass --ndjson or --firestore-project")
+        return 2
+
+    elapsed = time.monotonic() - started
+    print(f"Scanned {counter.seen} docs in {elapsed:.1f}s ({counter.seen / max(elapsed, 1e-9):.0f} docs/s); {counter.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
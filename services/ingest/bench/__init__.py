@@ -0,0 +1 @@
+# Offline ingest benchmarks against a local fake YouTube Data API.
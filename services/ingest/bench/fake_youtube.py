@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""Local stand-in for the YouTube Data API v3 endpoints ingest calls.
+
+Serves /channels, /playlistItems, /search and /videos from an in-memory
+catalog (synthetic, or loaded from a recorded JSON fixture) with real
+pagination, ETags / If-None-Match, gzip, injected latency, random backend
+errors and a daily quota that answers 403 quotaExceeded once spent.
+Point ingest at it with LUMENS_YT_API_BASE=<server url>.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..lib.quota import call_cost
+
+
+# Title words lean on topic vocabulary; descriptions are mostly channel boilerplate
+_TITLE_WORDS = (
+    "story prophet yusuf musa ibrahim nuh dua ramadan iftar seerah nasheed arabic alphabet quran "
+    "learn wudu salah manners sharing kindness hajj eid mosque family friends animals garden"
+).split()
+_DESCRIPTION_WORDS = (
+    "watch subscribe channel new episode every week fun learning for children parents enjoy together "
+    "share like comment bell notification music animation characters adventure today"
+).split()
+
+
+@dataclass
+class FakeVideo:
+    id: str
+    title: str
+    description: str
+    published_at: str
+    duration_seconds: int
+    views: int
+    language: str = "en"
+    made_for_kids: bool = True
+
+
+@dataclass
+class FakeChannel:
+    id: str
+    title: str
+    handle: str
+    videos: List[FakeVideo] = field(default_factory=list)  # newest first
+
+    @property
+    def uploads(self) -> str:
+        return "UU" + self.id[2:]
+
+
+class FakeCatalog:
+    def __init__(self, channels: List[FakeChannel]) -> None:
+        self.channels = channels
+        self.by_id = {c.id: c for c in channels}
+        self.by_uploads = {c.uploads: c for c in channels}
+        self.by_handle = {c.handle.lower(): c for c in channels}
+        self.videos: Dict[str, Tuple[FakeChannel, FakeVideo]] = {v.id: (c, v) for c in channels for v in c.videos}
+
+    @classmethod
+    def synthetic(
+        cls, n_channels: int, videos_per_channel: int = 60, seed: int = 0, mirror_ratio: float = 0.05
+    ) -> "FakeCatalog":
+        """Deterministic catalog; about `mirror_ratio` of videos re-upload another channel's video."""
+        rng = random.Random(seed)
+        start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+        channels: List[FakeChannel] = []
+        originals: List[FakeVideo] = []
+        for c in range(n_channels):
+            title = f"Bench Channel {c}"
+            channel = FakeChannel(f"UCbench{c:017d}", title, f"@benchchannel{c}")
+            for i in range(videos_per_channel):
+                published = start + dt.timedelta(hours=videos_per_channel - i, minutes=c)
+                if originals and rng.random() < mirror_ratio:
+                    src = rng.choice(originals)
+                    video_title, duration = f"{src.title} | {title}", src.duration_seconds + rng.randint(-2, 2)
+                else:
+                    video_title = " ".join(rng.choice(_TITLE_WORDS) for _ in range(rng.randint(3, 7))).title()
+                    video_title, duration = f"{video_title} Episode {i}", rng.randint(60, 1500)
+                video = FakeVideo(
+                    id=f"v{c:05d}{i:05d}",
+                    title=video_title,
+                    description=" ".join(rng.choice(_DESCRIPTION_WORDS) for _ in range(rng.randint(20, 80))),
+                    published_at=published.isoformat().replace("+00:00", "Z"),
+                    duration_seconds=duration,
+                    views=rng.randint(10, 1_000_000),
+                    language="ar" if rng.random() < 0.1 else "en",
+                    made_for_kids=rng.random() < 0.8,
+                )
+                channel.videos.append(video)
+                originals.append(video)
+            channels.append(channel)
+        return cls(channels)
+
+    def add_uploads(self, per_channel: int, seed: int = 1) -> int:
+        """Publish `per_channel` new videos on every channel (newest first), as between daily runs."""
+        rng = random.Random(seed)
+        added = 0
+        for c, channel in enumerate(self.channels):
+            newest = channel.videos[0].published_at if channel.videos else "2025-01-01T00:00:00Z"
+            base = dt.datetime.fromisoformat(newest.replace("Z", "+00:00"))
+            fresh = []
+            for i in range(per_channel):
+                n = len(channel.videos) + i
+                published = base + dt.timedelta(hours=per_channel - i)
+                video = FakeVideo(
+                    id=f"v{c:05d}{n:05d}",
+                    title=" ".join(rng.choice(_TITLE_WORDS) for _ in range(4)).title() + f" Episode {n}",
+                    description=" ".join(rng.choice(_DESCRIPTION_WORDS) for _ in range(30)),
+                    published_at=published.isoformat().replace("+00:00", "Z"),
+                    duration_seconds=rng.randint(60, 1500),
+                    views=rng.randint(10, 1000),
+                )
+                fresh.append(video)
+                self.videos[video.id] = (channel, video)
+            channel.videos[:0] = fresh
+            added += len(fresh)
+        return added
+
+    @classmethod
+    def load(cls, path: Path) -> "FakeCatalog":
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            [
+                FakeChannel(c["id"], c["title"], c["handle"], [FakeVideo(**v) for v in c.get("videos", [])])
+                for c in data["channels"]
+            ]
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"channels": [asdict(c) for c in self.channels]}, f)
+
+    def write_channels_csv(self, path: Path, handle_ratio: float = 0.1) -> None:
+        """Sources CSV for ingest; every 1/handle_ratio-th channel is listed by @handle (resolved via /search)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        every = int(1 / handle_ratio) if handle_ratio else 0
+        with path.open("w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["source", "source_ref", "name", "notes"])
+            for i, c in enumerate(self.channels):
+                ref = c.handle if every and i % every == 0 else f"https://www.youtube.com/channel/{c.id}"
+                w.writerow(["youtube", ref, c.title, "bench"])
+
+
+def _duration(seconds: int) -> str:
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"PT{h}H{m}M{s}S" if h else f"PT{m}M{s}S"
+
+
+def _snippet(channel: FakeChannel, video: FakeVideo) -> Dict[str, Any]:
+    thumb = f"https://i.ytimg.com/vi/{video.id}"
+    return {
+        "publishedAt": video.published_at,
+        "channelId": channel.id,
+        "channelTitle": channel.title,
+        "title": video.title,
+        "description": video.description,
+        "thumbnails": {"default": {"url": f"{thumb}/default.jpg"}, "medium": {"url": f"{thumb}/mqdefault.jpg"}},
+    }
+
+
+class _ApiError(Exception):
+    def __init__(self, status: int, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.status, self.reason, self.message = status, reason, message
+
+
+def _page(items: List[Any], params: Dict[str, str]) -> Tuple[List[Any], Optional[str]]:
+    size = max(1, min(50, int(params.get("maxResults") or 5)))
+    token = params.get("pageToken") or ""
+    offset = int(token[1:]) if token.startswith("p") and token[1:].isdigit() else 0
+    end = offset + size
+    return items[offset:end], (f"p{end}" if end < len(items) else None)
+
+
+class FakeYouTubeApi:
+    """Request handling and counters, independent of the HTTP server."""
+
+    def __init__(
+        self,
+        catalog: FakeCatalog,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        quota: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        self.catalog = catalog
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota = quota
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls: Dict[str, int] = {}
+            self.units = 0
+            self.not_modified = 0
+            self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "calls_by_endpoint": dict(sorted(self.calls.items())),
+                "units": self.units,
+                "not_modified": self.not_modified,
+                "errors": self.errors,
+            }
+
+    def handle(self, path: str, params: Dict[str, str], if_none_match: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+            over_quota = self.quota is not None and self.units + call_cost(path) > self.quota
+            if not over_quota:
+                self.units += call_cost(path)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+        if delay:
+            time.sleep(delay)
+        try:
+            if over_quota:
+                raise _ApiError(403, "quotaExceeded", "The request cannot be completed because you have exceeded your quota.")
+            if fail:
+                raise _ApiError(500, "backendError", "Backend Error")
+            handler = {
+                "/channels": self._channels,
+                "/playlistItems": self._playlist_items,
+                "/search": self._search,
+                "/videos": self._videos,
+            }.get(path)
+            if handler is None:
+                raise _ApiError(404, "notFound", f"Unknown endpoint {path}")
+            payload = handler(params)
+        except _ApiError as e:
+            with self._lock:
+                self.errors += 1
+            body = {"error": {"code": e.status, "message": e.message, "errors": [{"reason": e.reason}]}}
+            return e.status, {"Content-Type": "application/json"}, json.dumps(body).encode("utf-8")
+        text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        etag = '"' + hashlib.sha1(text.encode("utf-8")).hexdigest() + '"'
+        if if_none_match == etag:
+            with self._lock:
+                self.not_modified += 1
+            return 304, {"ETag": etag}, b""
+        payload["etag"] = etag
+        return 200, {"Content-Type": "application/json", "ETag": etag}, json.dumps(payload).encode("utf-8")
+
+    def _channels(self, params: Dict[str, str]) -> Dict[str, Any]:
+        if params.get("forUsername"):
+            channel = self.catalog.by_handle.get("@" + params["forUsername"].lower())
+        else:
+            channel = self.catalog.by_id.get(params.get("id", ""))
+        items = []
+        if channel:
+            items.append({"kind": "youtube#channel", "id": channel.id, "contentDetails": {"relatedPlaylists": {"uploads": channel.uploads}}})
+        return {"kind": "youtube#channelListResponse", "items": items, "pageInfo": {"totalResults": len(items)}}
+
+    def _playlist_items(self, params: Dict[str, str]) -> Dict[str, Any]:
+        channel = self.catalog.by_uploads.get(params.get("playlistId", ""))
+        if channel is None:
+            raise _ApiError(404, "playlistNotFound", "The playlist identified with the request's playlistId parameter cannot be found.")
+        videos, token = _page(channel.videos, params)
+        items = [
+            {
+                "kind": "youtube#playlistItem",
+                "snippet": {**_snippet(channel, v), "resourceId": {"kind": "youtube#video", "videoId": v.id}},
+            }
+            for v in videos
+        ]
+        out: Dict[str, Any] = {"kind": "youtube#playlistItemListResponse", "items": items}
+        if token:
+            out["nextPageToken"] = token
+        return out
+
+    def _search(self, params: Dict[str, str]) -> Dict[str, Any]:
+        if params.get("type") == "channel":
+            q = (params.get("q") or "").lower()
+            channel = self.catalog.by_handle.get("@" + q) or next(
+                (c for c in self.catalog.channels if c.title.lower() == q), None
+            )
+            items = [{"id": {"kind": "youtube#channel", "channelId": channel.id}, "snippet": {"channelId": channel.id, "title": channel.title}}] if channel else []
+            return {"kind": "youtube#searchListResponse", "items": items}
+        channel = self.catalog.by_id.get(params.get("channelId", ""))
+        videos = channel.videos if channel else []
+        after = params.get("publishedAfter")
+        if after:
+            videos = [v for v in videos if v.published_at > after]
+        page, token = _page(videos, params)
+        items = [{"id": {"kind": "youtube#video", "videoId": v.id}, "snippet": _snippet(channel, v)} for v in page]
+        out: Dict[str, Any] = {"kind": "youtube#searchListResponse", "items": items}
+        if token:
+            out["nextPageToken"] = token
+        return out
+
+    def _videos(self, params: Dict[str, str]) -> Dict[str, Any]:
+        parts = set((params.get("part") or "").split(","))
+        items = []
+        for vid in (params.get("id") or "").split(",")[:50]:
+            found = self.catalog.videos.get(vid)
+            if not found:
+                continue
+            channel, v = found
+            item: Dict[str, Any] = {"kind": "youtube#video", "id": v.id}
+            if "snippet" in parts:
+                item["snippet"] = {**_snippet(channel, v), "defaultAudioLanguage": v.language, "defaultLanguage": v.language}
+            if "contentDetails" in parts:
+                item["contentDetails"] = {"duration": _duration(v.duration_seconds)}
+            if "statistics" in parts:
+                item["statistics"] = {"viewCount": str(v.views), "likeCount": str(v.views // 50), "commentCount": "0"}
+            if "status" in parts:
+                item["status"] = {"madeForKids": v.made_for_kids, "selfDeclaredMadeForKids": v.made_for_kids}
+            items.append(item)
+        return {"kind": "youtube#videoListResponse", "items": items}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    api: FakeYouTubeApi
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        path = "/" + url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, headers, body = self.api.handle(path, params, self.headers.get("If-None-Match"))
+        if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class FakeYouTubeServer:
+    """Threaded HTTP server around a FakeYouTubeApi; use as a context manager."""
+
+    def __init__(self, api: FakeYouTubeApi, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.api = api
+        handler = type("Handler", (_Handler,), {"api": api})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/youtube/v3"
+
+    def start(self) -> "FakeYouTubeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeYouTubeServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Serve a fake YouTube Data API for offline ingest runs.")
+    ap.add_argument("--channels", type=int, default=10, help="Synthetic channels (ignored with --fixture)")
+    ap.add_argument("--videos-per-channel", type=int, default=60)
+    ap.add_argument("--fixture", default=None, help="Recorded catalog JSON (see --save-fixture)")
+    ap.add_argument("--save-fixture", default=None, help="Write the catalog as a JSON fixture and exit")
+    ap.add_argument("--csv-out", default=None, help="Write a sources CSV for the catalog")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered 500 backendError")
+    ap.add_argument("--quota", type=int, default=None, help="Units served before answering 403 quotaExceeded")
+    args = ap.parse_args(argv)
+
+    catalog = FakeCatalog.load(Path(args.fixture)) if args.fixture else FakeCatalog.synthetic(args.channels, args.videos_per_channel)
+    if args.csv_out:
+        catalog.write_channels_csv(Path(args.csv_out))
+    if args.save_fixture:
+        catalog.save(Path(args.save_fixture))
+        return 0
+    api = FakeYouTubeApi(catalog, args.latency_ms, args.jitter_ms, args.error_rate, args.quota)
+    server = FakeYouTubeServer(api, port=args.port)
+    print(f"Serving {len(catalog.channels)} channels / {len(catalog.videos)} videos at {server.url}")
+    print(f"Run ingest with LUMENS_YT_API_BASE={server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
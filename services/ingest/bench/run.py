@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .fake_youtube import FakeCatalog, FakeYouTubeApi, FakeYouTubeServer
+
+
+ROOT = Path(__file__).resolve().parents[3]
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Deterministic per-run metrics: any increase over the baseline is a regression
+EXACT_METRICS = ("calls", "units")
+
+
+def _peak_rss_mb(rusage: Any) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss * scale / (1024 * 1024), 1)
+
+
+# Unset would not do: the ingest CLI loads .env, which fills in missing keys
+_ISOLATED_ENV = {"LUMENS_GCP_PROJECT": "", "LUMENS_POLICIES": "", "LUMENS_QUOTA_BUDGET": ""}
+
+
+def _ingest_command(channels_csv: Path, workdir: Path, limit: int, concurrency: int, extra_args: List[str]) -> List[str]:
+    """Ingest CLI invocation for one pass; it never writes to Firestore, whatever `extra_args` say."""
+    return [
+        sys.executable, "-m", "services.ingest.cli",
+        "--channels", str(channels_csv),
+        "--out", str(workdir / "out" / "videos"),
+        "--limit", str(limit),
+        "--concurrency", str(concurrency),
+        "--cache-dir", str(workdir / "cache"),
+        "--state", str(workdir / "state.json"),
+        "--channels-map", str(workdir / "channels_map.json"),
+        "--api-key", "bench",
+        *extra_args,
+        "--firestore-project", "",
+    ]
+
+
+def _child_env(api_url: str) -> Dict[str, str]:
+    return {**os.environ, **_ISOLATED_ENV, "LUMENS_YT_API_BASE": api_url, "PYTHONPATH": str(ROOT)}
+
+
+def run_pass(
+    server: FakeYouTubeServer, channels_csv: Path, workdir: Path, limit: int, concurrency: int, extra_args: List[str]
+) -> Dict[str, Any]:
+    """One `services.ingest.cli` run in a child process (so peak RSS is its own)."""
+    out_prefix = workdir / "out" / "videos"
+    cmd = _ingest_command(channels_csv, workdir, limit, concurrency, extra_args)
+    env = _child_env(server.url)
+    server.api.reset()
+    log = workdir / "ingest.log"
+    started = time.perf_counter()
+    with log.open("w", encoding="utf-8") as f:
+        proc = subprocess.Popen(cmd, cwd=str(ROOT), env=env, stdout=f, stderr=subprocess.STDOUT)
+        _, status, rusage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ingest exited with {proc.returncode}; see {log}:\n{log.read_text()[-2000:]}")
+    ndjson = out_prefix.with_suffix(".ndjson")
+    with ndjson.open("r", encoding="utf-8") as f:
+        records = sum(1 for line in f if line.strip())
+    stats = server.api.stats()
+    return {
+        "wall_s": round(wall, 2),
+        "records": records,
+        "records_per_s": round(records / wall, 1) if wall else 0.0,
+        "calls": stats["calls"],
+        "units": stats["units"],
+        "not_modified": stats["not_modified"],
+        "errors": stats["errors"],
+        "calls_by_endpoint": stats["calls_by_endpoint"],
+        "peak_rss_mb": _peak_rss_mb(rusage),
+    }
+
+
+def run_size(
+    n_channels: int,
+    videos_per_channel: int,
+    limit: int,
+    concurrency: int,
+    latency_ms: float,
+    passes: int,
+    extra_args: List[str],
+    new_per_channel: int = 2,
+) -> List[Dict[str, Any]]:
+    """Cold run, then `passes - 1` warm re-runs sharing caches and state (the daily-job case).
+
+    Before each warm run every channel publishes `new_per_channel` videos.
+    """
+    catalog = FakeCatalog.synthetic(n_channels, videos_per_channel)
+    api = FakeYouTubeApi(catalog, latency_ms=latency_ms, jitter_ms=latency_ms / 4)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="lumens-bench-") as tmp, FakeYouTubeServer(api) as server:
+        workdir = Path(tmp)
+        channels_csv = workdir / "channels.csv"
+        catalog.write_channels_csv(channels_csv)
+        for i in range(passes):
+            if i:
+                catalog.add_uploads(new_per_channel, seed=i)
+            result = run_pass(server, channels_csv, workdir, limit, concurrency, extra_args)
+            results.append({"channels": n_channels, "pass": "cold" if i == 0 else f"warm{i}", **result})
+    return results
+
+
+def _key(row: Dict[str, Any]) -> str:
+    return f"{row['channels']}/{row['pass']}"
+
+
+def check_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_slowdown: float) -> List[str]:
+    """Regressions against a baseline: more calls/units, different record counts, or wall time beyond `max_slowdown`x."""
+    base = {_key(r): r for r in baseline}
+    problems = []
+    for row in results:
+        ref = base.get(_key(row))
+        if ref is None:
+            continue
+        for metric in EXACT_METRICS:
+            if row[metric] > ref[metric]:
+                problems.append(f"{_key(row)}: {metric} {row[metric]} > baseline {ref[metric]}")
+        if row["records"] != ref["records"]:
+            problems.append(f"{_key(row)}: records {row['records']} != baseline {ref['records']}")
+        if max_slowdown and row["wall_s"] > ref["wall_s"] * max_slowdown:
+            problems.append(f"{_key(row)}: wall {row['wall_s']}s > {max_slowdown}x baseline {ref['wall_s']}s")
+    return problems
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    cols = ["channels", "pass", "wall_s", "records", "records_per_s", "calls", "units", "not_modified", "peak_rss_mb"]
+    print("  ".join(f"{c:>13}" for c in cols))
+    for row in results:
+        print("  ".join(f"{row[c]!s:>13}" for c in cols))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark ingest end to end against a local fake YouTube API.")
+    ap.add_argument("--sizes", default="10,100,1000", help="Comma-separated channel counts (default: 10,100,1000)")
+    ap.add_argument("--videos-per-channel", type=int, default=60)
+    ap.add_argument("--limit", type=int, default=50, help="Ingest --limit per channel (default: 50)")
+    ap.add_argument("--concurrency", type=int, default=8, help="Ingest --concurrency (default: 8)")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="Injected per-call latency (default: 20ms)")
+    ap.add_argument("--passes", type=int, default=2, help="Runs per size: one cold, the rest warm (default: 2)")
+    ap.add_argument("--new-per-channel", type=int, default=2, help="Videos each channel publishes before a warm run (default: 2)")
+    ap.add_argument("--out", default="out/bench.json", help="Write results as JSON (default: out/bench.json)")
+    ap.add_argument("--check", nargs="?", const=str(BASELINE), default=None, help="Fail on regressions against a baseline JSON (default: services/ingest/bench/baseline.json)")
+    ap.add_argument("--max-slowdown", type=float, default=3.0, help="With --check: allowed wall-time factor over baseline; 0 ignores time (default: 3)")
+    ap.add_argument("--write-baseline", action="store_true", help="Save these results as the new baseline")
+    ap.add_argument("ingest_args", nargs=argparse.REMAINDER, help="Extra ingest CLI args after `--`")
+    args = ap.parse_args(argv)
+
+    extra = [a for a in args.ingest_args if a != "--"]
+    results: List[Dict[str, Any]] = []
+    for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+        rows = run_size(size, args.videos_per_channel, args.limit, args.concurrency, args.latency_ms, max(1, args.passes), extra, args.new_per_channel)
+        for row in rows:
+            print(
+                f"{row['channels']} channels ({row['pass']}): {row['records']} records in {row['wall_s']}s "
+                f"({row['records_per_s']}/s), {row['calls']} calls, {row['units']} units, peak RSS {row['peak_rss_mb']} MB"
+            )
+        results.extend(rows)
+    print_table(results)
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.write_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written → {BASELINE}")
+    if args.check:
+        problems = check_baseline(results, json.loads(Path(args.check).read_text(encoding="utf-8")), args.max_slowdown)
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        if problems:
+            return 1
+        print("Benchmark within baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,20 +3,288 @@ from __future__ import annotations
 
 import argparse
 import os
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
+from .lib.cache import ResponseCache
+from .lib.enrich import set_enrichment_cache, set_text_language_detector
+from .lib.enrich_cache import EnrichmentCache
 from .lib.env import load_env_files
-from .lib.io import parse_csv, write_outputs, load_json, save_json
+from .lib.quota import QuotaLedger, estimate_source_units
+from .lib.io import SourceRow, parse_csv, write_outputs, load_json, save_json
 from .lib.youtube import (
     detect_youtube_ref,
-    resolve_channel_id,
+    derive_uploads_playlist_id,
     iter_channel_videos,
     iter_playlist_videos,
+    get_transport,
+    set_response_cache,
+    set_quota_ledger,
 )
-from .lib.enrich import enrich_records
-from .lib.store.firestore_writer import write_firestore_content
-from .lib.resolve import build_channels_map
+from .lib.pipeline import (
+    PolicyCounter,
+    StageCounter,
+    TopicCounter,
+    enrich_stage,
+    language_filter_stage,
+    ordered_map,
+    policy_stage,
+    tap,
+    topic_stage,
+)
+from .lib.store.firestore_writer import FirestoreContentWriter, firestore_client
+from .lib.store.feeds import DEFAULT_FEED_SIZE, write_feed_snapshots
+from .lib.store.fingerprints import FingerprintStore
+from .lib.near_dupes import NearDuplicateIndex, near_duplicate_stage
+from .lib.resolve import ResolutionCache, build_channels_map, resolve_channel_cached
+from .lib.state import IngestState, SourceProgress
+from .lib.textlang import TextLanguageDetector
+from .lib.topics import TopicTagger, topic_dictionaries
+from ..policy.compiler import load_policy
+
+
+@dataclass
+class _SourceFetch:
+    """Records fetched for one CSV source, keyed for state by channel or playlist id."""
+
+    records: List[Dict]
+    state_key: Optional[str] = None
+
+
+def _fetch_source(
+    row: SourceRow,
+    api_key: str,
+    limit: int,
+    relevance_language: Optional[str],
+    channels_map: Dict[str, str],
+    state: IngestState,
+    resolution: Optional[ResolutionCache] = None,
+) -> Optional[_SourceFetch]:
+    """Fetch the latest records for a single source row.
+
+    Safe to run from worker threads: it only reads the shared map/state and
+    returns its records instead of mutating run-level collections.
+    """
+    kind, value = detect_youtube_ref(row.source_ref)
+    print(f"→ {row.name}: {kind} {value}")
+    if kind == "playlist_id":
+        records: List[Dict] = []
+        prev = state.get(value)
+        try:
+            # Curated playlists are not in upload order: skip known/older
+            # items rather than stopping at the first one.
+            for rec in iter_playlist_videos(value, api_key, limit):
+                if prev and (prev.is_known(rec) or prev.is_older(rec)):
+                    continue
+                records.append(rec)
+        except Exception as e:
+            print(f"WARN: playlist {value} failed: {e}")
+        return _SourceFetch(records, value)
+
+    # Prefer cached mapping
+    channel_id = channels_map.get(value) or channels_map.get(row.source_ref)
+    if not channel_id:
+        try:
+            channel_id = resolve_channel_cached(kind, value, api_key, relevance_language, resolution)
+        except Exception as e:
+            print(f"WARN: resolving {row.source_ref} failed: {e}")
+            channel_id = None
+    if not channel_id:
+        print(f"WARN: could not resolve channel for {row.source_ref}")
+        return None
+    records = []
+    try:
+        prev = state.get(channel_id)
+        uploads_known, uploads = resolution.uploads_for(channel_id) if resolution else (False, None)
+        on_uploads = resolution.store_uploads if resolution else None
+        watermark = prev.watermark if prev else None
+        for rec in iter_channel_videos(
+            channel_id, api_key, limit, relevance_language, uploads, on_uploads, watermark, uploads_known
+        ):
+            # Incremental stop condition: uploads are newest first, so the first
+            # recently seen id or anything older than the watermark ends this channel
+            if prev and (prev.is_known(rec) or prev.is_older(rec)):
+                break
+            records.append(rec)
+    except Exception as e:
+        print(f"WARN: channel {channel_id} failed: {e}")
+    return _SourceFetch(records, channel_id)
+
+
+def _dedup_fetched(results: Iterable[Optional[_SourceFetch]], progress: Dict[str, SourceProgress]) -> Iterator[Dict]:
+    """Flatten per-source results, dropping repeated video ids and recording per-source progress."""
+    seen_video_ids: set[str] = set()
+    for result in results:
+        if result is None:
+            continue
+        source_progress = progress.setdefault(result.state_key, SourceProgress()) if result.state_key else None
+        for rec in result.records:
+            # Progress covers everything the source returned, so state advances
+            # even for videos another source already contributed
+            if source_progress is not None:
+                source_progress.add(rec)
+            if rec["video_id"] in seen_video_ids:
+                continue
+            seen_video_ids.add(rec["video_id"])
+            yield rec
+
+
+class _FirestoreSink:
+    """Streams records into Firestore; a failure disables the sink instead of aborting the run."""
+
+    def __init__(self, writer: FirestoreContentWriter, fingerprints: Optional[FingerprintStore] = None) -> None:
+        self.client = writer.client
+        self.writer: Optional[FirestoreContentWriter] = writer
+        self.fingerprints = fingerprints
+
+    @classmethod
+    def open(
+        cls, project: str, collection: str, fingerprints_path: Optional[Path] = None, max_in_flight: int = 4
+    ) -> Optional["_FirestoreSink"]:
+        try:
+            client = firestore_client(project)
+        except Exception as e:
+            print(f"WARN: Firestore write skipped/failed: {e}")
+            return None
+        fingerprints = None
+        if fingerprints_path:
+            try:
+                fingerprints = FingerprintStore(fingerprints_path)
+            except Exception as e:
+                print(f"WARN: Firestore fingerprint store unavailable, rewriting all docs: {e}")
+        return cls(FirestoreContentWriter(client, collection, fingerprints, max_in_flight), fingerprints)
+
+    def add(self, rec: Dict) -> None:
+        if self.writer is None:
+            return
+        try:
+            self.writer.add(rec)
+        except Exception as e:
+            print(f"WARN: Firestore write failed after {self.writer.written} docs: {e}")
+            self.writer = None
+
+    def close(self) -> Optional[Dict[str, int]]:
+        try:
+            if self.writer is None:
+                return None
+            try:
+                self.writer.close()
+                return self.writer.counts()
+            except Exception as e:
+                print(f"WARN: Firestore write failed after {self.writer.written} docs: {e}")
+                return None
+        finally:
+            if self.fingerprints is not None:
+                self.fingerprints.close()
+
+
+def _save_resolution_cache(cache: ResolutionCache) -> None:
+    c = cache.counters
+    print(f"Resolution cache: {c['hits']} hits, {c['negative_hits']} negative hits, {c['misses']} misses")
+    try:
+        cache.save()
+    except Exception as e:
+        print(f"WARN: failed to write resolution cache: {e}")
+
+
+@contextmanager
+def _installed_response_cache(path: Path) -> Iterator[ResponseCache]:
+    """Use an ETag response cache for yt_api calls for the duration of the block."""
+    cache = ResponseCache(path)
+    previous = set_response_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_response_cache(previous)
+        stats = cache.stats()
+        print(
+            f"HTTP cache: {stats['hits']} not-modified, {stats['misses']} misses, "
+            f"{stats['refreshed']} refreshed ({stats['hit_rate_pct']}% hit rate)"
+        )
+        cache.close()
+
+
+@contextmanager
+def _installed_quota_ledger(budget: Optional[int]) -> Iterator[QuotaLedger]:
+    """Account this run's API calls on a fresh ledger and print the report at the end."""
+    ledger = QuotaLedger(budget)
+    previous = set_quota_ledger(ledger)
+    try:
+        yield ledger
+    finally:
+        set_quota_ledger(previous)
+        print(ledger.summary())
+
+
+def _plan_within_budget(
+    rows: List[SourceRow],
+    ledger: QuotaLedger,
+    limit: int,
+    enrich: bool,
+    channels_map: Dict[str, str],
+    state: IngestState,
+    resolution: Optional[ResolutionCache] = None,
+) -> List[SourceRow]:
+    """Admit sources stalest-first until the quota budget is reserved.
+
+    Sources without incremental state (never ingested or unresolved) go
+    first, then the rest by oldest watermark, ties in CSV order. Admitted
+    rows keep their CSV order.
+    """
+    planned = []
+    for idx, row in enumerate(rows):
+        kind, value = detect_youtube_ref(row.source_ref)
+        channel_id = value if kind == "channel_id" else channels_map.get(value) or channels_map.get(row.source_ref)
+        resolved = kind in ("channel_id", "playlist_id") or bool(channel_id)
+        if not resolved and resolution is not None:
+            resolved, channel_id = resolution.lookup(value)
+        staleness = state.staleness_key(value if kind == "playlist_id" else channel_id)
+        uploads_known = bool(channel_id and derive_uploads_playlist_id(channel_id))
+        units = estimate_source_units(kind, limit, resolved, enrich, uploads_known)
+        planned.append((staleness, idx, units, row))
+    admitted = []
+    for _, idx, units, row in sorted(planned, key=lambda p: (p[0], p[1])):
+        if ledger.reserve(units):
+            admitted.append((idx, row))
+        else:
+            print(f"SKIP: {row.name} needs ~{units} units; quota budget reserved")
+    return [row for _, row in sorted(admitted, key=lambda a: a[0])]
+
+
+@contextmanager
+def _installed_enrichment_cache(path: Path, stats_ttl_hours: float) -> Iterator[EnrichmentCache]:
+    """Serve videos.list details from a local store for the duration of the block."""
+    cache = EnrichmentCache(path, stats_ttl=stats_ttl_hours * 3600)
+    previous = set_enrichment_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_enrichment_cache(previous)
+        stats = cache.stats()
+        print(
+            f"Enrichment cache: {stats['fresh']} fresh, {stats['stale']} stale stats, "
+            f"{stats['missing']} new ({stats['hit_rate_pct']}% hit rate)"
+        )
+        cache.close()
+
+
+@contextmanager
+def _installed_text_detector(cache_path: Optional[Path], workers: int) -> Iterator[TextLanguageDetector]:
+    """Use a cached, process-parallel text language detector for the duration of the block."""
+    detector = TextLanguageDetector(cache_path, workers=workers)
+    previous = set_text_language_detector(detector)
+    try:
+        yield detector
+    finally:
+        set_text_language_detector(previous)
+        stats = detector.stats()
+        print(
+            f"Text language: {stats['detected']} detected, {stats['cached']} cached, "
+            f"{stats['skipped']} skipped (explicit language)"
+        )
+        detector.close()
 
 
 def run_ingest(
@@ -30,117 +298,135 @@ def run_ingest(
     firestore_collection: str = "content",
     channels_map_path: Path | None = None,
     state_path: Path | None = None,
+    concurrency: int = 1,
+    cache_dir: Path | None = None,
+    quota_budget: int | None = None,
+    stats_ttl_hours: float = 72.0,
+    enrich_concurrency: int = 4,
+    lang_workers: int = 1,
+    firestore_concurrency: int = 4,
+    feed_size: int = DEFAULT_FEED_SIZE,
+    policy_paths: Optional[List[Path]] = None,
+    tag_topics: bool = True,
+    near_dupes: bool = True,
 ) -> int:
+    # Compile policies up front so a broken policy fails before any quota is spent
+    policies = [load_policy(p) for p in policy_paths or []]
+    # Topic dictionaries cover the API categories plus every policy's allowed_topics
+    tagger = TopicTagger(topic_dictionaries(t for p in policies for t in p.allowed_topics)) if tag_topics else None
     src_rows = parse_csv(channels_csv)
     if not src_rows:
         print(f"No sources found in {channels_csv}")
         return 0
-    all_records: List[Dict] = []
-    seen_video_ids: set[str] = set()
     # Load optional mapping (source_ref/handle -> channel_id)
     channels_map: Dict[str, str] = {}
     if channels_map_path:
         m = load_json(channels_map_path)
         if isinstance(m, dict):
             channels_map = {str(k): str(v) for k, v in m.items()}
-    # Load incremental state: {channel_id: last_video_id}
-    state: Dict[str, str] = {}
-    if state_path:
-        s = load_json(state_path)
-        if isinstance(s, dict):
-            state = {str(k): str(v) for k, v in s.items()}
-    # Track new heads to update state after ingest
-    new_heads: Dict[str, str] = {}
-
-    for row in src_rows:
-        if row.source.lower() != "youtube":
-            continue
-        kind, value = detect_youtube_ref(row.source_ref)
-        print(f"→ {row.name}: {kind} {value}")
-        if kind == "playlist_id":
-            try:
-                for rec in iter_playlist_videos(value, api_key, limit):
-                    if rec["video_id"] in seen_video_ids:
-                        continue
-                    seen_video_ids.add(rec["video_id"])
-                    all_records.append(rec)
-            except Exception as e:
-                print(f"WARN: playlist {value} failed: {e}")
-            continue
+    # Load incremental state (legacy {channel_id: last_video_id} files are migrated)
+    state = IngestState.load(state_path) if state_path else IngestState()
+    with ExitStack() as stack:
+        ledger = stack.enter_context(_installed_quota_ledger(quota_budget))
+        if cache_dir:
+            stack.enter_context(_installed_response_cache(cache_dir / "http.sqlite"))
+            if enrich:
+                stack.enter_context(_installed_enrichment_cache(cache_dir / "enrich.sqlite", stats_ttl_hours))
+        if enrich:
+            stack.enter_context(
+                _installed_text_detector(cache_dir / "textlang.sqlite" if cache_dir else None, lang_workers)
+            )
+        # Channel resolutions (including negative results) persist across runs
+        resolution = ResolutionCache(cache_dir / "resolve.json" if cache_dir else None)
+        stack.callback(_save_resolution_cache, resolution)
+        # Track what each source fetched to update state after ingest
+        progress: Dict[str, SourceProgress] = {}
+        relevance_language = lang if lang and lang.lower() not in ("any", "*") else None
 
-        # Prefer cached mapping
-        channel_id = channels_map.get(value) or channels_map.get(row.source_ref)
-        if not channel_id:
-            channel_id = resolve_channel_id(kind, value, api_key, lang if lang and lang.lower() not in ("any", "*") else None)
-        if not channel_id:
-            print(f"WARN: could not resolve channel for {row.source_ref}")
-            continue
-        try:
-            fetched_for_channel = 0
-            stop_at = state.get(channel_id)
-            for rec in iter_channel_videos(channel_id, api_key, limit, lang if lang and lang.lower() not in ("any", "*") else None):
-                if rec["video_id"] in seen_video_ids:
-                    continue
-                # Incremental stop condition: if we hit the last seen video, stop fetching this channel
-                if stop_at and rec["video_id"] == stop_at:
-                    break
-                seen_video_ids.add(rec["video_id"])
-                all_records.append(rec)
-                fetched_for_channel += 1
-                # Record head (first seen) to update state later
-                if channel_id not in new_heads:
-                    new_heads[channel_id] = rec["video_id"]
-            if fetched_for_channel == 0 and stop_at:
-                # No new videos; keep existing head
-                pass
-        except Exception as e:
-            print(f"WARN: channel {channel_id} failed: {e}")
+        def _fetch(row: SourceRow) -> Optional[_SourceFetch]:
+            return _fetch_source(row, api_key, limit, relevance_language, channels_map, state, resolution)
 
-    if enrich:
-        try:
-            enrich_records(all_records, api_key)
-        except Exception as e:
-            print(f"WARN: enrichment failed: {e}")
-
-    # Language filtering (default: en). Use derived flags if present.
-    lang_norm = (lang or "").strip().lower()
-    if lang_norm and lang_norm not in ("any", "*"):
-        before = len(all_records)
-        kept: List[Dict] = []
-        for r in all_records:
-            lg = str(r.get("language") or "").lower()
-            lg_full = str(r.get("language_full") or "").lower()
-            text_lg = str(r.get("text_language") or "").lower()
-            conf = r.get("text_lang_conf")
-            is_en = bool(r.get("is_english")) if lang_norm == "en" else False
-            match = False
-            if lang_norm == "en":
-                match = is_en or lg == "en" or lg_full.startswith("en-") or (text_lg == "en" and (conf or 0.0) >= 0.7)
-            else:
-                match = lg == lang_norm or lg_full.startswith(f"{lang_norm}-") or (text_lg == lang_norm and (conf or 0.0) >= 0.7)
-            if match:
-                kept.append(r)
-        all_records = kept
-        print(f"Language filter '{lang_norm}': kept {len(all_records)}/{before}")
-
-    total, ndjson_path, text_path = write_outputs(all_records, out_prefix)
-    print(f"Wrote {total} records → {ndjson_path} and {text_path}")
-    if firestore_project:
-        try:
-            written = write_firestore_content(all_records, firestore_project, firestore_collection)
-            print(f"Stored {written} docs in Firestore project {firestore_project} collection '{firestore_collection}'")
-        except Exception as e:
-            print(f"WARN: Firestore write skipped/failed: {e}")
-    # Save updated state if requested
-    if state_path and new_heads:
-        # Merge old state with new heads
-        merged = {**state, **new_heads}
-        try:
-            save_json(merged, state_path)
-            print(f"Updated state → {state_path}")
-        except Exception as e:
-            print(f"WARN: failed to write state file: {e}")
-    return 0
+        youtube_rows = [row for row in src_rows if row.source.lower() == "youtube"]
+        if quota_budget is not None:
+            youtube_rows = _plan_within_budget(youtube_rows, ledger, limit, enrich, channels_map, state, resolution)
+
+        # Streaming pipeline: fetch → enrich (50-id micro-batches, several in flight
+        # while fetching continues) → language filter → sinks.
+        # Sources are fetched in parallel but yielded in CSV order, so dedup,
+        # head tracking and output order match a serial run.
+        records = _dedup_fetched(ordered_map(_fetch, youtube_rows, concurrency), progress)
+        if enrich:
+            records = enrich_stage(records, api_key, max_in_flight=enrich_concurrency)
+        lang_norm = (lang or "").strip().lower()
+        lang_counter = StageCounter()
+        if lang_norm and lang_norm not in ("any", "*"):
+            records = language_filter_stage(records, lang_norm, lang_counter)
+        dup_index = None
+        if near_dupes:
+            # Persisted under the cache dir so re-uploads are caught across runs
+            dup_index = NearDuplicateIndex(cache_dir / "near_dupes.sqlite" if cache_dir else None)
+            stack.callback(dup_index.close)
+            records = near_duplicate_stage(records, dup_index)
+        # Topics are tagged before policies so topic rules see them
+        topic_counter = TopicCounter()
+        if tagger is not None:
+            records = topic_stage(records, tagger, counter=topic_counter)
+        policy_counter = PolicyCounter()
+        if policies:
+            records = policy_stage(records, policies, counter=policy_counter)
+        fs_sink = None
+        if firestore_project:
+            fs_sink = _FirestoreSink.open(
+                firestore_project,
+                firestore_collection,
+                cache_dir / "firestore.sqlite" if cache_dir else None,
+                firestore_concurrency,
+            )
+        if fs_sink:
+            records = tap(records, fs_sink.add)
+
+        total, ndjson_path, text_path = write_outputs(records, out_prefix)
+        if lang_norm and lang_norm not in ("any", "*"):
+            print(f"Language filter '{lang_norm}': kept {lang_counter.kept}/{lang_counter.seen}")
+        print(f"Wrote {total} records → {ndjson_path} and {text_path}")
+        if dup_index is not None:
+            dup_stats = dup_index.stats()
+            print(f"Near-duplicates: {dup_stats['duplicates']}/{dup_stats['checked']} records tagged duplicate_of")
+        if tagger is not None:
+            print(f"Topics: {topic_counter.summary()}")
+        for policy in policies:
+            blocked = policy_counter.ineligible.get(policy.snapshot_id, 0)
+            print(f"Policy {policy.snapshot_id}: {policy_counter.evaluated} evaluated, {blocked} ineligible")
+        if fs_sink:
+            fs_counts = fs_sink.close()
+            if fs_counts is not None:
+                print(
+                    f"Stored {fs_counts['written']} docs in Firestore project {firestore_project} collection "
+                    f"'{firestore_collection}' ({fs_counts['skipped']} unchanged skipped, {fs_counts['failed']} failed, "
+                    f"{fs_counts['retries']} retries)"
+                )
+                # Feed snapshots only change when content did
+                if feed_size > 0 and fs_counts["written"]:
+                    try:
+                        n = write_feed_snapshots(fs_sink.client, firestore_collection, feed_size)
+                        print(f"Rebuilt {n} feed snapshots (first {feed_size} items each)")
+                    except Exception as e:
+                        print(f"WARN: feed snapshots not rebuilt: {e}")
+        # Save updated state if requested
+        if state_path and any(p.ids for p in progress.values()):
+            for key, source_progress in progress.items():
+                state.update(key, source_progress)
+            try:
+                state.save(state_path)
+                print(f"Updated state → {state_path}")
+            except Exception as e:
+                print(f"WARN: failed to write state file: {e}")
+        http_stats = get_transport().stats.as_dict()
+        print(
+            f"HTTP: {http_stats['calls']} calls over {http_stats['connections_opened']} connections, "
+            f"avg {http_stats['avg_ms']}ms, {http_stats['wire_bytes']} bytes on the wire"
+        )
+        return 0
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -155,13 +441,25 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap.add_argument("--limit", type=int, default=100, help="Max videos per source")
     ap.add_argument("--enrich", dest="enrich", action="store_true", default=True, help="Fetch durations and stats via videos.list (default on)")
     ap.add_argument("--no-enrich", dest="enrich", action="store_false", help="Disable enrichment step to save quota")
+    ap.add_argument("--no-topics", dest="topics", action="store_false", help="Do not tag records with topic slugs (topics[])")
+    ap.add_argument("--no-near-dupes", dest="near_dupes", action="store_false", help="Do not tag re-uploads with duplicate_of (index persists under --cache-dir)")
     ap.add_argument("--api-key", default=os.getenv("LUMENS_YT_API_KEY"), help="YouTube Data API key (or env LUMENS_YT_API_KEY; .env is auto-loaded if present)")
     ap.add_argument("--firestore-project", default=os.getenv("LUMENS_GCP_PROJECT"), help="If set, write output to Firestore Native in this GCP project (requires ADC)")
     ap.add_argument("--lang", default="en", help="Preferred language root to keep (default: en; use 'any' to disable)")
     ap.add_argument("--firestore-collection", default="content", help="Firestore collection name (default: content)")
+    ap.add_argument("--firestore-concurrency", type=int, default=4, help="Max Firestore batch commits in flight (default: 4)")
+    ap.add_argument("--feed-size", type=int, default=int(os.getenv("LUMENS_FEED_SIZE", str(DEFAULT_FEED_SIZE))), help=f"Items per precomputed feed snapshot written after a Firestore ingest; 0 disables (default: {DEFAULT_FEED_SIZE})")
+    ap.add_argument("--policy", action="append", default=[p for p in os.getenv("LUMENS_POLICIES", "").split(",") if p], help="Policy to evaluate on every record (policy.yaml or compiled .json); repeatable (env LUMENS_POLICIES, comma-separated)")
     ap.add_argument("--resolve-out", default=None, help="Resolve channels only and write mapping JSON to this path, then exit")
     ap.add_argument("--channels-map", default=None, help="Path to a JSON mapping (source_ref or handle → channel_id) to avoid search calls")
-    ap.add_argument("--state", default=None, help="Path to a JSON state file {channel_id: last_video_id} for incremental ingest")
+    ap.add_argument("--state", default=None, help="Path to a JSON state file (per-source published_at watermark + recent ids) for incremental ingest")
+    ap.add_argument("--cache-dir", default=os.getenv("LUMENS_CACHE_DIR", "out/cache"), help="Directory for local caches such as the ETag response cache (default: out/cache)")
+    ap.add_argument("--no-cache", dest="cache_dir", action="store_const", const=None, help="Disable local caches")
+    ap.add_argument("--stats-ttl-hours", type=float, default=72.0, help="Re-fetch cached view/like counts older than this many hours (default: 72)")
+    ap.add_argument("--enrich-concurrency", type=int, default=4, help="Max videos.list batches in flight while fetching continues (default: 4)")
+    ap.add_argument("--lang-workers", type=int, default=min(4, os.cpu_count() or 1), help="Processes used for title/description language detection (default: up to 4)")
+    ap.add_argument("--quota-budget", type=int, default=int(os.environ["LUMENS_QUOTA_BUDGET"]) if os.getenv("LUMENS_QUOTA_BUDGET") else None, help="Max YouTube API units this run may spend; stalest sources are fetched first (default: unlimited)")
+    ap.add_argument("--concurrency", type=int, default=int(os.getenv("LUMENS_INGEST_CONCURRENCY", "1")), help="Number of sources fetched in parallel (default: 1, serial)")
     args = ap.parse_args(argv)
 
     if not args.api_key:
@@ -171,7 +469,13 @@ def main(argv: Optional[List[str]] = None) -> int:
     # Resolve-only mode
     if args.resolve_out:
         rows = parse_csv(Path(args.channels))
-        mapping = build_channels_map(rows, str(args.api_key), (str(args.lang).lower() if str(args.lang).lower() not in ("any", "*") else None))
+        with ExitStack() as stack:
+            stack.enter_context(_installed_quota_ledger(None))
+            if args.cache_dir:
+                stack.enter_context(_installed_response_cache(Path(args.cache_dir) / "http.sqlite"))
+            resolution = ResolutionCache(Path(args.cache_dir) / "resolve.json" if args.cache_dir else None)
+            stack.callback(_save_resolution_cache, resolution)
+            mapping = build_channels_map(rows, str(args.api_key), (str(args.lang).lower() if str(args.lang).lower() not in ("any", "*") else None), resolution)
         save_json(mapping, Path(args.resolve_out))
         print(f"Resolved {len(mapping)} entries → {args.resolve_out}")
         return 0
@@ -187,6 +491,17 @@ def main(argv: Optional[List[str]] = None) -> int:
         str(args.firestore_collection),
         Path(args.channels_map) if args.channels_map else None,
         Path(args.state) if args.state else None,
+        max(1, int(args.concurrency)),
+        Path(args.cache_dir) if args.cache_dir else None,
+        args.quota_budget,
+        float(args.stats_ttl_hours),
+        max(1, int(args.enrich_concurrency)),
+        max(1, int(args.lang_workers)),
+        max(1, int(args.firestore_concurrency)),
+        max(0, int(args.feed_size)),
+        [Path(p) for p in args.policy],
+        bool(args.topics),
+        bool(args.near_dupes),
     )
 
 
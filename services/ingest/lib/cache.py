@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+
+def open_sqlite(path: Path) -> sqlite3.Connection:
+    """Open a SQLite database shared across threads (callers serialize access)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    body: str
+    stored_at: float
+
+
+class ResponseCache:
+    """Persistent ETag cache for YouTube Data API GET responses.
+
+    Entries are keyed by path + sorted params (the API key is dropped) and
+    revalidated with `If-None-Match`; a 304 serves the stored body. Entries
+    older than `max_age` seconds are dropped, and the least recently used
+    ones are evicted once `max_entries` or `max_bytes` is exceeded.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 20000,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: float = 7 * 86400,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "refreshed": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._stores_since_evict = 0
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, etag TEXT NOT NULL, body TEXT NOT NULL,"
+            " size INTEGER NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses(used_at)")
+
+    @staticmethod
+    def make_key(path: str, params: Mapping[str, object]) -> str:
+        items = sorted((str(k), str(v)) for k, v in params.items() if k != "key")
+        return f"{path}?{urlencode(items)}"
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT etag, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[2] > self.max_age:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.counters["evicted"] += 1
+                row = None
+            if not row:
+                self.counters["misses"] += 1
+                return None
+        return CachedResponse(row[0], row[1], row[2])
+
+    def mark_hit(self, key: str) -> None:
+        """Record a 304 revalidation; the entry's age restarts from now."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, used_at = ? WHERE key = ?", (now, now, key))
+            self.counters["hits"] += 1
+
+    def store(self, key: str, etag: str, body: str, refreshed: bool = False) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, body, size, stored_at, used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, body, len(body), now, now),
+            )
+            self.counters["stored"] += 1
+            if refreshed:
+                self.counters["refreshed"] += 1
+            self._stores_since_evict += 1
+            if self._stores_since_evict >= self.EVICT_EVERY:
+                self._evict_locked()
+
+    def evict(self) -> int:
+        with self._lock:
+            return self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        self._stores_since_evict = 0
+        removed = self._db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.max_age,)).rowcount
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # Walk entries oldest-used first until both limits are satisfied
+            drop = []
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY used_at ASC"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                drop.append((key,))
+                count -= 1
+                total -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", drop)
+            removed += len(drop)
+        self.counters["evicted"] += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counters)
+        lookups = out["hits"] + out["misses"] + out["refreshed"]
+        out["hit_rate_pct"] = round(100.0 * out["hits"] / lookups) if lookups else 0
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._evict_locked()
+            self._db.close()
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Iterator, List, Optional, Tuple
 
+from .enrich_cache import EnrichmentCache
+from .textlang import TextLanguageDetector
 from .youtube import yt_api
 
 
+_FULL_PARTS = "contentDetails,statistics,snippet,status"
+
+
 def _chunked(seq: List[str], size: int) -> Iterator[List[str]]:
     for i in range(0, len(seq), size):
         yield seq[i : i + size]
@@ -33,21 +40,37 @@ def iso8601_duration_to_seconds(value: str) -> Optional[int]:
     return days * 86400 + hours * 3600 + minutes * 60 + seconds
 
 
-def fetch_videos_info(video_ids: List[str], api_key: str) -> Dict[str, Dict]:
-    """Fetch videos.list for batches of ids; returns map id -> details."""
-    out: Dict[str, Dict] = {}
-    if not video_ids:
-        return out
-    for batch in _chunked(video_ids, 50):
-        resp = yt_api(
+_enrichment_cache: Optional[EnrichmentCache] = None
+
+
+def set_enrichment_cache(cache: Optional[EnrichmentCache]) -> Optional[EnrichmentCache]:
+    """Install (or clear with None) the cache consulted by `fetch_videos_info`."""
+    global _enrichment_cache
+    previous = _enrichment_cache
+    _enrichment_cache = cache
+    return previous
+
+
+def _videos_list(video_ids: List[str], api_key: str, part: str, max_in_flight: int = 1) -> Dict[str, Dict]:
+    def _call(batch: List[str]) -> Dict:
+        return yt_api(
             "/videos",
             {
-                "part": "contentDetails,statistics,snippet,status",
+                "part": part,
                 "id": ",".join(batch),
                 "maxResults": "50",
             },
             api_key,
         )
+
+    batches = list(_chunked(video_ids, 50))
+    if max_in_flight > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(batches))) as pool:
+            responses = list(pool.map(_call, batches))
+    else:
+        responses = [_call(batch) for batch in batches]
+    out: Dict[str, Dict] = {}
+    for resp in responses:
         for item in resp.get("items", []):
             vid = item.get("id")
             if not vid:
@@ -56,10 +79,86 @@ def fetch_videos_info(video_ids: List[str], api_key: str) -> Dict[str, Dict]:
     return out
 
 
+def fetch_videos_info(video_ids: List[str], api_key: str, max_in_flight: int = 1) -> Dict[str, Dict]:
+    """Fetch videos.list for batches of ids; returns map id -> details.
+
+    Up to `max_in_flight` 50-id batches are requested concurrently.
+
+    With an enrichment cache installed, only new or stale ids are requested.
+    A 50-id batch holding any new id is fetched in full (its stale ids ride
+    along for free); batches of stale ids only re-fetch `statistics`.
+    """
+    if not video_ids:
+        return {}
+    cache = _enrichment_cache
+    if cache is None:
+        return _videos_list(video_ids, api_key, _FULL_PARTS, max_in_flight)
+    out, stale, missing = cache.partition(video_ids)
+    new_ids = set(missing)
+    full: List[str] = []
+    stats_only: List[str] = []
+    for batch in _chunked([vid for vid in dict.fromkeys(video_ids) if vid in stale or vid in new_ids], 50):
+        (full if new_ids.intersection(batch) else stats_only).extend(batch)
+    fetched: Dict[str, Dict] = {}
+    if full:
+        fetched = _videos_list(full, api_key, _FULL_PARTS, max_in_flight)
+        cache.put(fetched.values())
+        out.update(fetched)
+    if stats_only:
+        refreshed = _videos_list(stats_only, api_key, "statistics", max_in_flight)
+        cache.put_stats(refreshed.values())
+        for vid in stats_only:
+            if vid in refreshed:
+                stale[vid]["statistics"] = refreshed[vid].get("statistics", {})
+    for vid, item in stale.items():
+        out.setdefault(vid, item)
+    return out
+
+
+def _language_root(tag: Optional[str]) -> str:
+    return str(tag or "").strip().lower().replace("_", "-").split("-", 1)[0]
+
+
+# Script a title in these languages is written in; anything else always gets a text hint
+_LANGUAGE_SCRIPTS = {
+    "en": "LATIN", "fr": "LATIN", "de": "LATIN", "es": "LATIN", "it": "LATIN", "pt": "LATIN",
+    "nl": "LATIN", "id": "LATIN", "ms": "LATIN", "tr": "LATIN", "sw": "LATIN", "so": "LATIN",
+    "ar": "ARABIC", "ur": "ARABIC", "fa": "ARABIC", "ps": "ARABIC",
+    "ru": "CYRILLIC", "uk": "CYRILLIC", "bn": "BENGALI", "hi": "DEVANAGARI",
+}
+
+
+def _title_script(title: str) -> Optional[str]:
+    """Dominant Unicode script of the letters in `title`, or None without letters."""
+    counts: Dict[str, int] = {}
+    for ch in title:
+        if ch.isalpha():
+            script = unicodedata.name(ch, "").split(" ", 1)[0]
+            counts[script] = counts.get(script, 0) + 1
+    return max(counts, key=counts.get) if counts else None
+
+
+def _explicit_language_conclusive(sn: Dict) -> bool:
+    """True when audio and metadata language tags agree and the title is written in
+    that language's script, so a text hint adds nothing.
+
+    A title in another script (e.g. tagged `en` but titled in Arabic) keeps its
+    text hint, so `is_english` can still come from the text as before.
+    """
+    audio = _language_root(sn.get("defaultAudioLanguage"))
+    meta = _language_root(sn.get("defaultLanguage"))
+    if not audio or audio != meta:
+        return False
+    script = _title_script(sn.get("title") or "")
+    return script is None or script == _LANGUAGE_SCRIPTS.get(audio)
+
+
 def enrich_records(records: List[Dict], api_key: str) -> None:
     """Enrich records in-place with duration_seconds, stats, language, and kids flags."""
     ids = [r.get("video_id") for r in records if r.get("video_id")]
     details = fetch_videos_info(ids, api_key)
+    # Records whose language still needs a text-based hint, detected as one batch below
+    pending_text: List[Tuple[Dict, str]] = []
     for r in records:
         vid = r.get("video_id")
         info = details.get(vid, {})
@@ -98,48 +197,51 @@ def enrich_records(records: List[Dict], api_key: str) -> None:
             if not r.get("language_full"):
                 r["language_full"] = norm
 
-        # Lightweight text-based language hint from title + description
-        title = (sn.get("title") or "").strip()
-        desc = (sn.get("description") or "").strip()
-        text_lang, text_conf = _detect_text_language(f"{title}\n{desc}")
+        # Lightweight text-based language hint from title + description,
+        # skipped when the explicit language metadata is already conclusive
+        if _explicit_language_conclusive(sn):
+            _text_detector.skip()
+        else:
+            title = (sn.get("title") or "").strip()
+            desc = (sn.get("description") or "").strip()
+            if title or desc:
+                pending_text.append((r, f"{title}\n{desc}"))
+
+        # Kids flags (if present in status)
+        if isinstance(status, dict):
+            if "madeForKids" in status:
+                r["made_for_kids"] = bool(status.get("madeForKids"))
+            if "selfDeclaredMadeForKids" in status:
+                r["self_declared_made_for_kids"] = bool(status.get("selfDeclaredMadeForKids"))
+
+    text_hints = dict(zip((id(r) for r, _ in pending_text), _text_detector.detect_many([t for _, t in pending_text])))
+    for r in records:
+        text_lang, text_conf = text_hints.get(id(r), (None, None))
         if text_lang:
             r.setdefault("text_language", text_lang)
         if text_conf is not None:
             r.setdefault("text_lang_conf", text_conf)
-
         # Derived boolean for easy filtering in Firestore queries
         # Mark as English if either explicit language root is 'en' or text hint is 'en' with reasonable confidence
         if "is_english" not in r:
             r["is_english"] = (r.get("language") == "en") or (text_lang == "en" and (text_conf or 0.0) >= 0.7)
-        # Kids flags (if present in status)
-        if isinstance(status, dict):
-            if "madeForKids" in status:
-                r["made_for_kids"] = bool(status.get("madeForKids"))
-            if "selfDeclaredMadeForKids" in status:
-                r["self_declared_made_for_kids"] = bool(status.get("selfDeclaredMadeForKids"))
+
+
+_text_detector = TextLanguageDetector()
+
+
+def set_text_language_detector(detector: TextLanguageDetector) -> TextLanguageDetector:
+    """Install the detector used for title/description language hints; returns the previous one."""
+    global _text_detector
+    previous = _text_detector
+    _text_detector = detector
+    return previous
 
 
 def _detect_text_language(text: str) -> Tuple[Optional[str], Optional[float]]:
-    """Detect language of provided text via langdetect; returns (lang, confidence).
+    """Detect language of provided text; returns (lang, confidence).
 
     - Uses title + description as a proxy when audio language is mislabeled.
     - Returns (None, None) if detection is not possible.
     """
-    try:
-        # Lazy import to avoid mandatory dep at import time
-        from langdetect import detect_langs  # type: ignore
-    except Exception:
-        return None, None
-    try:
-        cleaned = (text or "").strip()
-        if not cleaned or len(cleaned) < 20:
-            return None, None
-        # detect_langs returns list like ['en:0.99','fr:0.01']
-        langs = detect_langs(cleaned)
-        if not langs:
-            return None, None
-        best = max(langs, key=lambda l: l.prob)
-        # langdetect returns e.g., 'en'
-        return getattr(best, 'lang', None), float(getattr(best, 'prob', 0.0))
-    except Exception:
-        return None, None
+    return _text_detector.detect_many([text])[0]
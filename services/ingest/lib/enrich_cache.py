@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .cache import open_sqlite
+
+
+def _static_fields(item: Dict) -> Dict:
+    """The slice of a videos.list item that practically never changes."""
+    content = item.get("contentDetails") or {}
+    sn = item.get("snippet") or {}
+    status = item.get("status") or {}
+    return {
+        "contentDetails": {k: content[k] for k in ("duration",) if k in content},
+        "snippet": {
+            k: sn[k]
+            for k in ("defaultAudioLanguage", "defaultLanguage", "title", "description")
+            if k in sn
+        },
+        "status": {k: status[k] for k in ("madeForKids", "selfDeclaredMadeForKids") if k in status},
+    }
+
+
+class EnrichmentCache:
+    """Local videos.list store keyed by video id.
+
+    Immutable fields (duration, language, kids flags, title/description
+    used for text language hints) are kept forever; `statistics` are
+    considered fresh for `stats_ttl` seconds and are then re-fetched alone.
+    """
+
+    def __init__(self, path: Path, stats_ttl: float = 72 * 3600) -> None:
+        self.path = path
+        self.stats_ttl = stats_ttl
+        self.counters: Dict[str, int] = {"fresh": 0, "stale": 0, "missing": 0}
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " id TEXT PRIMARY KEY, static TEXT NOT NULL, stats TEXT, stats_at REAL NOT NULL)"
+        )
+
+    def partition(self, video_ids: Iterable[str]) -> Tuple[Dict[str, Dict], Dict[str, Dict], List[str]]:
+        """Split ids into (fresh items, stale items needing stats, missing ids)."""
+        ids = list(dict.fromkeys(video_ids))
+        rows: Dict[str, Tuple[str, str, float]] = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                for vid, static, stats, stats_at in self._db.execute(
+                    f"SELECT id, static, stats, stats_at FROM videos WHERE id IN ({marks})", chunk
+                ):
+                    rows[vid] = (static, stats, stats_at)
+        now = time.time()
+        fresh: Dict[str, Dict] = {}
+        stale: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for vid in ids:
+            row = rows.get(vid)
+            if not row:
+                missing.append(vid)
+                continue
+            item = {"id": vid, **json.loads(row[0])}
+            if row[1] and now - row[2] <= self.stats_ttl:
+                item["statistics"] = json.loads(row[1])
+                fresh[vid] = item
+            else:
+                stale[vid] = item
+        with self._lock:
+            self.counters["fresh"] += len(fresh)
+            self.counters["stale"] += len(stale)
+            self.counters["missing"] += len(missing)
+        return fresh, stale, missing
+
+    def put(self, items: Iterable[Dict]) -> None:
+        """Store full videos.list items (static fields + statistics)."""
+        now = time.time()
+        rows = [
+            (item["id"], json.dumps(_static_fields(item)), json.dumps(item.get("statistics") or {}), now)
+            for item in items
+            if item.get("id")
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO videos (id, static, stats, stats_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def put_stats(self, items: Iterable[Dict]) -> None:
+        """Refresh only the statistics of already cached videos."""
+        now = time.time()
+        rows = [(json.dumps(item.get("statistics") or {}), now, item["id"]) for item in items if item.get("id")]
+        with self._lock:
+            self._db.executemany("UPDATE videos SET stats = ?, stats_at = ? WHERE id = ?", rows)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counters)
+        total = out["fresh"] + out["stale"] + out["missing"]
+        out["hit_rate_pct"] = round(100.0 * out["fresh"] / total) if total else 0
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import open_sqlite
+from ...policy.automaton import normalize_text
+
+
+# Title words that re-uploads add, drop or change without changing the episode
+NOISE_WORDS = frozenset(
+    """a an the of for and with to in on by as saw pbuh ra hd 4k 1080p 720p official video full new
+    kids kid children islamic cartoon cartoons animated animation reupload re upload mirror version
+    english eng sub subs subtitles""".split()
+)
+
+BITS = 64
+BANDS = 4  # 16-bit bands: any pair within 3 bits shares at least one band
+MAX_DISTANCE = 3
+DURATION_BUCKET = 30  # seconds; every bucket within the duration tolerance is probed
+DURATION_SLACK = 3  # seconds
+DURATION_RATIO = 0.03  # of the longer duration
+
+
+def title_tokens(title: str, channel_title: str = "") -> List[str]:
+    """Normalized title words minus noise words and the uploader's own channel name."""
+    text = (title or "").replace("'", "").replace("’", "")
+    drop = NOISE_WORDS | set(normalize_text(channel_title).split())
+    return [w for w in normalize_text(text).split() if w not in drop]
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over character trigrams of the joined tokens (0 for no tokens)."""
+    text = f" {' '.join(tokens)} "
+    weights = [0] * BITS
+    for feature in {text[i : i + 3] for i in range(len(text) - 2)}:
+        h = _feature_hash(feature)
+        for bit in range(BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(BITS) if weights[bit] > 0)
+
+
+def _bands(sig: int) -> List[int]:
+    width = BITS // BANDS
+    mask = (1 << width) - 1
+    return [(sig >> (i * width)) & mask for i in range(BANDS)]
+
+
+def _signed(sig: int) -> int:
+    # SQLite integers are signed 64-bit
+    return sig - (1 << 64) if sig >= (1 << 63) else sig
+
+
+def _durations_match(a: Optional[int], b: Optional[int]) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return abs(a - b) <= max(DURATION_SLACK, DURATION_RATIO * max(a, b))
+
+
+def _probe_buckets(duration: Optional[int]) -> List[int]:
+    """Duration buckets that can hold a video whose duration matches `duration`."""
+    if duration is None:
+        return [-1]
+    # Shorter matches are >= (1 - ratio) * d; longer ones <= d / (1 - ratio)
+    low = min(duration - DURATION_SLACK, duration * (1 - DURATION_RATIO))
+    high = max(duration + DURATION_SLACK, duration / (1 - DURATION_RATIO))
+    return list(range(max(0, int(low) // DURATION_BUCKET), int(high) // DURATION_BUCKET + 1))
+
+
+class NearDuplicateIndex:
+    """Persistent SimHash index for spotting re-uploads across channels.
+
+    Each record's signature is its SimHash over the normalized title
+    (`title_tokens`). Signatures are split into BANDS bands stored with a
+    duration bucket, so a lookup only reads rows that share a band value in
+    a bucket within the duration tolerance instead of scanning the catalog.
+    Candidates are confirmed by Hamming distance, duration (within 3s or
+    3%) and identical numbers in the title ("Episode 3" vs "Episode 4").
+
+    The first video indexed for a group is its canonical; later matches
+    record `canonical` = that video id. Looking up an already indexed id
+    returns its stored answer, so re-ingesting a video is stable.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.counters: Dict[str, int] = {"checked": 0, "duplicates": 0, "candidates": 0}
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path) if path else open_sqlite(Path(":memory:"))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " video_id TEXT PRIMARY KEY, sig INTEGER NOT NULL, duration INTEGER, numbers TEXT NOT NULL,"
+            " canonical TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER NOT NULL, value INTEGER NOT NULL, bucket INTEGER NOT NULL, video_id TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS bands_lookup ON bands(band, value, bucket)")
+
+    @staticmethod
+    def _bucket(duration: Optional[int]) -> int:
+        return -1 if duration is None else int(duration) // DURATION_BUCKET
+
+    def _candidates(self, sig: int, duration: Optional[int]) -> List[Tuple[str, int, Optional[int], str]]:
+        buckets = _probe_buckets(duration)
+        where = " OR ".join(["(b.band = ? AND b.value = ?)"] * BANDS)
+        params: List[int] = []
+        for i, value in enumerate(_bands(sig)):
+            params += [i, value]
+        marks = ",".join("?" * len(buckets))
+        return self._db.execute(
+            "SELECT DISTINCT i.video_id, i.sig, i.duration, i.numbers FROM bands b"
+            f" JOIN items i ON i.video_id = b.video_id WHERE ({where}) AND b.bucket IN ({marks})",
+            [*params, *buckets],
+        ).fetchall()
+
+    def check(self, video_id: str, title: str, duration: Optional[int] = None, channel_title: str = "") -> Optional[str]:
+        """Index a video and return the canonical video id it duplicates, if any."""
+        tokens = title_tokens(title, channel_title)
+        if not video_id or not tokens:
+            return None
+        sig = simhash(tokens)
+        numbers = " ".join(t for t in tokens if t.isdigit())
+        duration = int(duration) if duration is not None else None
+        with self._lock:
+            self.counters["checked"] += 1
+            row = self._db.execute("SELECT canonical FROM items WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None:
+                if row[0]:
+                    self.counters["duplicates"] += 1
+                return row[0]
+            best: Optional[Tuple[int, str]] = None
+            for other_id, other_sig, other_dur, other_numbers in self._candidates(sig, duration):
+                self.counters["candidates"] += 1
+                dist = bin((other_sig & ((1 << 64) - 1)) ^ sig).count("1")
+                if dist > MAX_DISTANCE or other_numbers != numbers or not _durations_match(duration, other_dur):
+                    continue
+                if best is None or dist < best[0]:
+                    best = (dist, other_id)
+            canonical = best[1] if best else None
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "INSERT INTO items (video_id, sig, duration, numbers, canonical) VALUES (?, ?, ?, ?, ?)",
+                (video_id, _signed(sig), duration, numbers, canonical),
+            )
+            # Only canonicals are banded, so every candidate is a group's canonical
+            if canonical is None:
+                self._db.executemany(
+                    "INSERT INTO bands (band, value, bucket, video_id) VALUES (?, ?, ?, ?)",
+                    [(i, value, self._bucket(duration), video_id) for i, value in enumerate(_bands(sig))],
+                )
+            else:
+                self.counters["duplicates"] += 1
+            self._db.execute("COMMIT")
+        return canonical
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def near_duplicate_stage(records: Iterable[Dict], index: NearDuplicateIndex) -> Iterator[Dict]:
+    """Set `duplicate_of` (canonical `video_id`) on records that re-upload an already indexed video."""
+    for rec in records:
+        canonical = index.check(
+            str(rec.get("video_id") or ""),
+            str(rec.get("title") or ""),
+            rec.get("duration_seconds"),
+            str(rec.get("channel_title") or ""),
+        )
+        if canonical and canonical != rec.get("video_id"):
+            rec["duplicate_of"] = canonical
+        yield rec
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from .enrich import enrich_records
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def ordered_map(fn: Callable[[T], R], items: Iterable[T], concurrency: int) -> Iterator[R]:
+    """Lazily map `fn` over `items` on a thread pool, yielding results in input order.
+
+    At most `2 * concurrency` calls are in flight, so a slow consumer never
+    lets results pile up in memory. `concurrency <= 1` runs inline.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    window = 2 * concurrency
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending: Deque[Future] = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _batched(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _enrich_batch(batch: List[Dict], api_key: str) -> List[Dict]:
+    try:
+        enrich_records(batch, api_key)
+    except Exception as e:
+        print(f"WARN: enrichment failed for {len(batch)} records: {e}")
+    return batch
+
+
+def enrich_stage(records: Iterable[Dict], api_key: str, batch_size: int = 50, max_in_flight: int = 1) -> Iterator[Dict]:
+    """Enrich records in micro-batches (one videos.list call per batch).
+
+    Each batch is dispatched as soon as `batch_size` records are buffered,
+    with up to `max_in_flight` batches running on worker threads while the
+    upstream fetch stage keeps producing. Records are yielded in input order.
+    """
+    if max_in_flight <= 1:
+        for batch in _batched(records, batch_size):
+            yield from _enrich_batch(batch, api_key)
+        return
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        pending: Deque[Future] = deque()
+        for batch in _batched(records, batch_size):
+            pending.append(pool.submit(_enrich_batch, batch, api_key))
+            # Hand finished batches downstream early; block only when the window is full
+            while pending and (len(pending) >= max_in_flight or pending[0].done()):
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def matches_language(rec: Dict, lang_norm: str) -> bool:
+    """True if the record's declared or detected language matches `lang_norm`."""
+    lg = str(rec.get("language") or "").lower()
+    lg_full = str(rec.get("language_full") or "").lower()
+    text_lg = str(rec.get("text_language") or "").lower()
+    conf = rec.get("text_lang_conf")
+    if lang_norm == "en":
+        is_en = bool(rec.get("is_english"))
+        return is_en or lg == "en" or lg_full.startswith("en-") or (text_lg == "en" and (conf or 0.0) >= 0.7)
+    return lg == lang_norm or lg_full.startswith(f"{lang_norm}-") or (text_lg == lang_norm and (conf or 0.0) >= 0.7)
+
+
+class StageCounter:
+    """Counts records passing through a stage (for end-of-run summaries)."""
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.kept = 0
+
+
+def language_filter_stage(records: Iterable[Dict], lang_norm: str, counter: Optional[StageCounter] = None) -> Iterator[Dict]:
+    counter = counter or StageCounter()
+    for rec in records:
+        counter.seen += 1
+        if matches_language(rec, lang_norm):
+            counter.kept += 1
+            yield rec
+
+
+class PolicyCounter:
+    """Per-policy evaluated/ineligible counts for the end-of-run summary."""
+
+    def __init__(self) -> None:
+        self.evaluated = 0
+        self.ineligible: Dict[str, int] = {}
+
+
+def policy_stage(
+    records: Iterable[Dict], policies: List[Any], batch_size: int = 200, counter: Optional[PolicyCounter] = None
+) -> Iterator[Dict]:
+    """Evaluate compiled policies over record batches, writing `policies`/`eligible` onto each record.
+
+    Records are annotated, not dropped; consumers decide what to do with
+    ineligible ones.
+    """
+    counter = counter or PolicyCounter()
+    for batch in _batched(records, batch_size):
+        for policy in policies:
+            blocked = policy.apply(batch)
+            counter.ineligible[policy.snapshot_id] = counter.ineligible.get(policy.snapshot_id, 0) + blocked
+        counter.evaluated += len(batch)
+        yield from batch
+
+
+class TopicCounter:
+    """Records seen/tagged and per-topic counts for the end-of-run summary."""
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.tagged = 0
+        self.per_topic: Dict[str, int] = {}
+
+    def summary(self) -> str:
+        top = ", ".join(f"{t}={n}" for t, n in sorted(self.per_topic.items(), key=lambda kv: (-kv[1], kv[0])))
+        return f"{self.tagged}/{self.seen} records tagged" + (f" ({top})" if top else "")
+
+
+def topic_stage(
+    records: Iterable[Dict], tagger: Any, batch_size: int = 200, counter: Optional[TopicCounter] = None
+) -> Iterator[Dict]:
+    """Tag record batches with topic slugs (`topics[]`), yielding records in input order."""
+    counter = counter or TopicCounter()
+    for batch in _batched(records, batch_size):
+        tagger.tag_batch(batch)
+        counter.seen += len(batch)
+        for rec in batch:
+            topics = rec.get("topics") or []
+            if topics:
+                counter.tagged += 1
+            for t in topics:
+                counter.per_topic[t] = counter.per_topic.get(t, 0) + 1
+        yield from batch
+
+
+def tap(records: Iterable[Dict], fn: Callable[[Dict], None]) -> Iterator[Dict]:
+    """Pass records through unchanged, calling `fn` on each (e.g. a secondary sink)."""
+    for rec in records:
+        fn(rec)
+        yield rec
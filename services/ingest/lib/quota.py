@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, Optional
+
+
+# YouTube Data API v3 list costs (units per call); unknown endpoints cost 1.
+QUOTA_COSTS: Dict[str, int] = {
+    "/search": 100,
+    "/playlistItems": 1,
+    "/channels": 1,
+    "/videos": 1,
+}
+DEFAULT_DAILY_QUOTA = 10000
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised before a call that would take the run over its quota budget."""
+
+
+def call_cost(path: str) -> int:
+    return QUOTA_COSTS.get(path, 1)
+
+
+class QuotaLedger:
+    """Thread-safe per-endpoint quota accounting with an optional hard budget.
+
+    `charge` is called before every API request (including retries) and
+    refuses calls that would exceed the budget. `reserve` lets a scheduler
+    admit work up front against the same budget.
+    """
+
+    def __init__(self, budget: Optional[int] = None) -> None:
+        self.budget = budget
+        self.used = 0
+        self.reserved = 0
+        self.calls: Dict[str, int] = {}
+        self.units: Dict[str, int] = {}
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    def charge(self, path: str) -> None:
+        cost = call_cost(path)
+        with self._lock:
+            if self.budget is not None and self.used + cost > self.budget:
+                self.refused += 1
+                raise QuotaExceeded(f"quota budget exhausted: {path} needs {cost} units, {self.budget - self.used} left")
+            self.used += cost
+            self.calls[path] = self.calls.get(path, 0) + 1
+            self.units[path] = self.units.get(path, 0) + cost
+
+    def reserve(self, units: int) -> bool:
+        """Reserve `units` for planned work; False if it would not fit the budget."""
+        with self._lock:
+            if self.budget is not None and self.reserved + units > self.budget:
+                return False
+            self.reserved += units
+            return True
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.budget is None:
+            return None
+        return max(0, self.budget - self.used)
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "used": self.used,
+                "reserved": self.reserved,
+                "refused_calls": self.refused,
+                "endpoints": {
+                    path: {"calls": self.calls[path], "units": self.units[path]}
+                    for path in sorted(self.calls, key=lambda p: -self.units[p])
+                },
+            }
+
+    def summary(self) -> str:
+        rep = self.report()
+        parts = [f"{p.lstrip('/')} {e['calls']}×={e['units']}u" for p, e in rep["endpoints"].items()]
+        budget = f"/{rep['budget']}" if rep["budget"] is not None else ""
+        refused = f", {rep['refused_calls']} calls refused" if rep["refused_calls"] else ""
+        return f"Quota: {rep['used']}{budget} units ({', '.join(parts) or 'no calls'}){refused}"
+
+
+def estimate_source_units(kind: str, limit: int, resolved: bool, enrich: bool, uploads_known: bool = False) -> int:
+    """Upper-bound estimate of the units one CSV source costs to ingest.
+
+    Counts channel resolution (searches are 100 units), the uploads-playlist
+    lookup unless it can be derived from the channel id, one playlistItems
+    page per 50 videos and, when enriching, one videos.list batch per 50 ids.
+    """
+    pages = max(1, math.ceil(limit / 50))
+    units = pages
+    if kind != "playlist_id":
+        if not uploads_known:
+            units += call_cost("/channels")
+        if not resolved:
+            units += call_cost("/channels") if kind == "user" else call_cost("/search")
+    if enrich:
+        units += pages * call_cost("/videos")
+    return units
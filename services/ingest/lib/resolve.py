@@ -1,12 +1,121 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from .io import SourceRow
+from .io import SourceRow, load_json, save_json
 from .youtube import detect_youtube_ref, resolve_channel_id
 
 
-def build_channels_map(rows: List[SourceRow], api_key: str, relevance_language: str | None = None) -> Dict[str, str]:
+class ResolutionCache:
+    """Persistent ref → channel resolution cache, including negative results.
+
+    Stored as JSON: `refs` maps a handle/query/user ref to its channel id
+    (None when the ref could not be resolved) with the time it was resolved;
+    `uploads` records `/channels` uploads playlist answers (None when the
+    channel has none), also with the time they were looked up. Positive
+    entries live for `ttl` seconds, negative ones for the shorter
+    `negative_ttl` so fixed refs and channels are retried soon.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = 30 * 86400, negative_ttl: float = 86400) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refs: Dict[str, Dict] = {}
+        self.uploads: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path:
+            data = load_json(path)
+            if isinstance(data, dict) and data.get("schema_version") == self.SCHEMA_VERSION:
+                self.refs = dict(data.get("refs") or {})
+                # Entries without a timestamp predate the TTL and are looked up again
+                self.uploads = {k: v for k, v in (data.get("uploads") or {}).items() if isinstance(v, dict)}
+
+    def _fresh(self, entry: Dict, value: Optional[str]) -> bool:
+        ttl = entry.get("ttl") or (self.ttl if value else self.negative_ttl)
+        return time.time() - float(entry.get("resolved_at") or 0) <= ttl
+
+    def lookup(self, ref: str) -> Tuple[bool, Optional[str]]:
+        """Return (found, channel_id); found with None means a cached negative result."""
+        with self._lock:
+            entry = self.refs.get(ref)
+            if entry is not None:
+                cid = entry.get("channel_id")
+                if self._fresh(entry, cid):
+                    self.counters["hits" if cid else "negative_hits"] += 1
+                    return True, cid
+            self.counters["misses"] += 1
+            return False, None
+
+    def store(self, ref: str, channel_id: Optional[str]) -> None:
+        with self._lock:
+            self.refs[ref] = {
+                "channel_id": channel_id,
+                "resolved_at": time.time(),
+                "ttl": self.ttl if channel_id else self.negative_ttl,
+            }
+            self._dirty = True
+
+    def uploads_for(self, channel_id: str) -> Tuple[bool, Optional[str]]:
+        """Return (found, uploads playlist id); found with None means the channel has none."""
+        with self._lock:
+            entry = self.uploads.get(channel_id)
+            if entry is not None and self._fresh(entry, entry.get("uploads")):
+                return True, entry.get("uploads")
+            return False, None
+
+    def store_uploads(self, channel_id: str, uploads: Optional[str]) -> None:
+        with self._lock:
+            self.uploads[channel_id] = {
+                "uploads": uploads,
+                "resolved_at": time.time(),
+                "ttl": self.ttl if uploads else self.negative_ttl,
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = {"schema_version": self.SCHEMA_VERSION, "refs": self.refs, "uploads": self.uploads}
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            save_json(data, tmp)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+def resolve_channel_cached(
+    kind: str,
+    value: str,
+    api_key: str,
+    relevance_language: Optional[str] = None,
+    cache: Optional[ResolutionCache] = None,
+) -> Optional[str]:
+    """`resolve_channel_id` behind the resolution cache (canonical ids never hit either)."""
+    if kind == "channel_id" or cache is None:
+        return resolve_channel_id(kind, value, api_key, relevance_language)
+    found, cid = cache.lookup(value)
+    if found:
+        return cid
+    cid = resolve_channel_id(kind, value, api_key, relevance_language)
+    cache.store(value, cid)
+    return cid
+
+
+def build_channels_map(
+    rows: List[SourceRow],
+    api_key: str,
+    relevance_language: str | None = None,
+    cache: Optional[ResolutionCache] = None,
+) -> Dict[str, str]:
     """Resolve non-canonical references to canonical channel IDs (yt UCIDs).
 
     Returns mapping from reference key to channel_id. Keys include the
@@ -26,7 +135,7 @@ def build_channels_map(rows: List[SourceRow], api_key: str, relevance_language:
         if kind == "playlist_id" or kind == "video_id":
             # Not a channel; skip for channel map
             continue
-        cid = resolve_channel_id(kind, value, api_key, relevance_language)
+        cid = resolve_channel_cached(kind, value, api_key, relevance_language, cache)
         if cid:
             m[value] = cid
             m[r.source_ref] = cid
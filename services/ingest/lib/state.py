@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .io import load_json, save_json
+
+
+STATE_SCHEMA_VERSION = 2
+RECENT_IDS = 20
+
+
+@dataclass
+class SourceState:
+    """Incremental position of one channel or playlist.
+
+    `watermark` is the newest `published_at` seen; `recent_ids` holds the
+    newest video ids (newest first) so a deleted or privated head does not
+    force a full re-fetch.
+    """
+
+    watermark: Optional[str] = None
+    recent_ids: List[str] = field(default_factory=list)
+    updated_at: Optional[str] = None
+
+    def is_known(self, rec: Dict) -> bool:
+        return rec.get("video_id") in self.recent_ids
+
+    def is_older(self, rec: Dict) -> bool:
+        published = rec.get("published_at")
+        return bool(self.watermark and published and str(published) < self.watermark)
+
+
+class SourceProgress:
+    """Accumulates what a run fetched for one source, newest first."""
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.watermark: Optional[str] = None
+
+    def add(self, rec: Dict) -> None:
+        vid = rec.get("video_id")
+        if vid and len(self.ids) < RECENT_IDS:
+            self.ids.append(vid)
+        published = rec.get("published_at")
+        if published and (self.watermark is None or str(published) > self.watermark):
+            self.watermark = str(published)
+
+
+class IngestState:
+    """Schema-versioned `--state` file: `{"schema_version": 2, "sources": {key: {...}}}`.
+
+    Keys are channel ids or playlist ids. Loading the legacy flat
+    `{channel_id: last_video_id}` format migrates it in place.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, SourceState]] = None) -> None:
+        self.sources: Dict[str, SourceState] = sources or {}
+
+    @classmethod
+    def from_json(cls, data: Any) -> "IngestState":
+        if not isinstance(data, dict):
+            return cls()
+        if "schema_version" not in data:
+            # v1: {channel_id: last_video_id}
+            return cls({str(k): SourceState(recent_ids=[str(v)]) for k, v in data.items() if v})
+        sources: Dict[str, SourceState] = {}
+        for key, entry in (data.get("sources") or {}).items():
+            if not isinstance(entry, dict):
+                continue
+            sources[str(key)] = SourceState(
+                watermark=entry.get("watermark"),
+                recent_ids=[str(v) for v in entry.get("recent_ids") or []][:RECENT_IDS],
+                updated_at=entry.get("updated_at"),
+            )
+        return cls(sources)
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestState":
+        return cls.from_json(load_json(path))
+
+    def get(self, key: str) -> Optional[SourceState]:
+        return self.sources.get(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.sources
+
+    def update(self, key: str, progress: SourceProgress) -> None:
+        """Fold a run's progress into the source's state (no-op if nothing was fetched)."""
+        if not progress.ids:
+            return
+        prev = self.sources.get(key) or SourceState()
+        recent = list(dict.fromkeys(progress.ids + prev.recent_ids))[:RECENT_IDS]
+        watermark = max(filter(None, [prev.watermark, progress.watermark]), default=None)
+        now = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        self.sources[key] = SourceState(watermark, recent, now)
+
+    def to_json(self) -> Dict:
+        return {
+            "schema_version": STATE_SCHEMA_VERSION,
+            "sources": {
+                key: {"watermark": s.watermark, "recent_ids": s.recent_ids, "updated_at": s.updated_at}
+                for key, s in sorted(self.sources.items())
+            },
+        }
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        save_json(self.to_json(), tmp)
+        os.replace(tmp, path)
+
+    def staleness_key(self, key: Optional[str]) -> str:
+        """Sort key: sources without state first, then oldest watermark first."""
+        s = self.sources.get(key) if key else None
+        if s is None:
+            return ""
+        return s.watermark or " "
+
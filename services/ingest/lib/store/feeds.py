@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+FEED_COLLECTION = "feeds"
+DEFAULT_FEED_SIZE = 48
+
+# Category slugs served by the API; keep in sync with CATEGORIES in apps/api/main.py
+FEED_TOPICS: List[str] = ["prophets", "duas", "ramadan", "seerah", "nasheeds"]
+FEED_LANGUAGES: List[Optional[str]] = [None, "en"]
+FEED_KIDS: List[Optional[bool]] = [None, True, False]
+# Card fields stored per snapshot item; keep in sync with FIELD_PROFILES["card"] + _REQUIRED_FIELDS in apps/api/main.py
+FEED_FIELDS: List[str] = [
+    "video_id",
+    "source_item_id",
+    "video_url",
+    "title",
+    "channel_id",
+    "channel_title",
+    "published_at",
+    "updated_at",
+    "duration_seconds",
+    "duplicate_of",
+    "eligible",
+    "thumbnails.medium",
+    "thumbnails.default",
+]
+
+
+def feed_key(language: Optional[str], made_for_kids: Optional[bool], topic: Optional[str]) -> str:
+    """Feed document id for a filter combination (mirrored by `_feed_key` in the API)."""
+    kids = "any" if made_for_kids is None else ("kids" if made_for_kids else "general")
+    return f"{(language or 'any').lower()}__{kids}__{topic or 'all'}"
+
+
+@dataclass(frozen=True)
+class FeedSpec:
+    language: Optional[str] = None
+    made_for_kids: Optional[bool] = None
+    topic: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return feed_key(self.language, self.made_for_kids, self.topic)
+
+    def filters(self) -> List[Tuple[str, str, Any]]:
+        """Same filters the API applies for these query parameters."""
+        out: List[Tuple[str, str, Any]] = []
+        if self.made_for_kids is not None:
+            out.append(("made_for_kids", "==", self.made_for_kids))
+        if self.language:
+            if self.language.lower() == "en":
+                out.append(("is_english", "==", True))
+            else:
+                out.append(("language", "==", self.language))
+        if self.topic:
+            out.append(("topics", "array_contains", self.topic))
+        return out
+
+
+def feed_specs(topics: Optional[List[str]] = None) -> List[FeedSpec]:
+    """All materialized combinations; topic-less feeds come first (topic feeds fall back to them)."""
+    topics = FEED_TOPICS if topics is None else topics
+    return [
+        FeedSpec(lang, kids, topic)
+        for topic in [None, *topics]
+        for lang in FEED_LANGUAGES
+        for kids in FEED_KIDS
+    ]
+
+
+def _query_feed(client: Any, collection: str, spec: FeedSpec, limit: int) -> List[Dict]:
+    from google.cloud.firestore_v1 import FieldFilter  # type: ignore
+    from google.cloud import firestore as _fs  # type: ignore
+
+    q = client.collection(collection)
+    for field, op, value in spec.filters():
+        q = q.where(filter=FieldFilter(field, op, value))
+    q = q.order_by("published_at", direction=_fs.Query.DESCENDING).limit(limit)
+    return [d.to_dict() for d in q.stream()]
+
+
+def project_card(rec: Dict, fields: List[str] = FEED_FIELDS) -> Dict:
+    """Copy of `rec` with only `fields` (dotted paths keep their nesting)."""
+    out: Dict = {}
+    for path in fields:
+        parts = path.split(".")
+        src: Any = rec
+        for part in parts:
+            src = src.get(part) if isinstance(src, dict) else None
+            if src is None:
+                break
+        if src is None:
+            continue
+        dst = out
+        for part in parts[:-1]:
+            dst = dst.setdefault(part, {})
+        dst[parts[-1]] = src
+    return out
+
+
+def write_feed_snapshots(
+    client: Any,
+    collection: str = "content",
+    size: int = DEFAULT_FEED_SIZE,
+    feed_collection: str = FEED_COLLECTION,
+    specs: Optional[List[FeedSpec]] = None,
+) -> int:
+    """Precompute the first `size` records of each common feed into `feed_collection/{key}`.
+
+    Each snapshot holds the records projected to `FEED_FIELDS` (the API
+    decorates them and only serves projections within those fields), the
+    cursor for the page after them and whether a topic feed fell back to
+    the topic-less feed because no record carries that topic yet. Docs are
+    written one at a time so an oversized or failing feed only loses itself.
+    Returns docs written.
+    """
+    stamp = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    built: Dict[str, List[Dict]] = {}
+    written = 0
+    for spec in specs if specs is not None else feed_specs():
+        try:
+            items = _query_feed(client, collection, spec, size + 1)
+        except Exception as e:
+            print(f"WARN: feed '{spec.key}' not rebuilt: {e}")
+            continue
+        fallback = False
+        if spec.topic and not items:
+            base = FeedSpec(spec.language, spec.made_for_kids).key
+            if base in built:
+                items, fallback = built[base], True
+        built[spec.key] = items
+        next_cursor = items[size - 1].get("published_at") if len(items) > size else None
+        doc = {
+            "items": [project_card(rec) for rec in items[:size]],
+            "fields": FEED_FIELDS,
+            "next_cursor": next_cursor,
+            "fallback": fallback,
+            "size": size,
+            "updated_at": stamp,
+        }
+        try:
+            client.collection(feed_collection).document(spec.key).set(doc)
+        except Exception as e:
+            print(f"WARN: feed '{spec.key}' not written: {e}")
+            continue
+        written += 1
+    return written
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ..cache import open_sqlite
+
+
+def record_fingerprint(rec: Dict) -> str:
+    """Stable hash of the fields a record persists (key order does not matter)."""
+    payload = json.dumps(rec, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    """Local record of what was last committed per document.
+
+    Rows are keyed by `(scope, doc_id)` where scope names the target
+    (e.g. `project/collection`). Entries older than `max_age` seconds are
+    ignored so documents changed or deleted out-of-band are eventually
+    rewritten.
+    """
+
+    def __init__(self, path: Path, max_age: float = 30 * 86400) -> None:
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = open_sqlite(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            " scope TEXT NOT NULL, doc_id TEXT NOT NULL, fp TEXT NOT NULL, written_at REAL NOT NULL,"
+            " PRIMARY KEY (scope, doc_id))"
+        )
+
+    def unchanged(self, scope: str, items: Iterable[Tuple[str, str]]) -> set:
+        """Return the doc ids among `(doc_id, fingerprint)` pairs whose stored fingerprint matches."""
+        wanted = dict(items)
+        ids = list(wanted)
+        cutoff = time.time() - self.max_age
+        same = set()
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                for doc_id, fp in self._db.execute(
+                    f"SELECT doc_id, fp FROM fingerprints WHERE scope = ? AND written_at >= ? AND doc_id IN ({marks})",
+                    [scope, cutoff, *chunk],
+                ):
+                    if wanted.get(doc_id) == fp:
+                        same.add(doc_id)
+        return same
+
+    def put(self, scope: str, items: List[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO fingerprints (scope, doc_id, fp, written_at) VALUES (?, ?, ?, ?)",
+                [(scope, doc_id, fp, now) for doc_id, fp in items],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,6 +1,16 @@
+# Storage backends for persisting ingested records.
+
 from __future__ import annotations
 
-from typing import Dict, Iterable, Optional
+import datetime as dt
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .fingerprints import FingerprintStore, record_fingerprint
 
 
 def make_content_id(record: Dict) -> Optional[str]:
@@ -10,37 +20,205 @@ def make_content_id(record: Dict) -> Optional[str]:
     return f"yt:{vid}"
 
 
-def write_firestore_content(records: Iterable[Dict], project_id: str, collection: str = "content") -> int:
-    """Write records to Firestore Native as documents in collection.
-
-    Each record is stored under doc id `yt:{VIDEOID}` with the record fields.
-    Requires `google-cloud-firestore` and ADC credentials (`gcloud auth application-default login`).
-    """
+def firestore_client(project_id: str) -> Any:
     try:
         from google.cloud import firestore  # type: ignore
     except Exception as e:
         raise RuntimeError(
             "google-cloud-firestore is required. Install via `pip install google-cloud-firestore`"
         ) from e
+    return firestore.Client(project=project_id)
+
+
+# google.api_core exception names worth retrying: contention and transient backend errors
+_RETRYABLE_ERRORS = {
+    "Aborted",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    return type(exc).__name__ in _RETRYABLE_ERRORS
+
+
+TOPIC_COVERAGE = ("meta", "topic_coverage")
+
+
+def update_topic_coverage(client: Any, collection: str, topics: Iterable[str]) -> Dict[str, int]:
+    """Recount docs per topic (Firestore count aggregation) into `meta/topic_coverage`.
+
+    The API reads this index to skip topic queries that cannot match and go
+    straight to its no-topic fallback. The given topics and every topic the
+    index already lists are recounted, so topics dropped from docs shrink
+    (and leave the index at zero) instead of keeping their old counts.
+    """
+    from google.cloud.firestore_v1 import FieldFilter  # type: ignore
+
+    ref = client.collection(TOPIC_COVERAGE[0]).document(TOPIC_COVERAGE[1])
+    snap = ref.get()
+    previous = (snap.to_dict() or {}) if snap.exists else {}
+    # An index written for another collection says nothing about this one
+    known = (previous.get("topics") or {}) if previous.get("collection", collection) == collection else {}
+    counts: Dict[str, int] = {}
+    for topic in sorted(set(topics) | set(known)):
+        q = client.collection(collection).where(filter=FieldFilter("topics", "array_contains", topic))
+        result = q.count().get()
+        n = int(result[0][0].value)
+        if n:
+            counts[topic] = n
+    stamp = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    ref.set({"topics": counts, "collection": collection, "updated_at": stamp})
+    return counts
+
+
+class FirestoreContentWriter:
+    """Incremental, change-aware bulk writer.
+
+    Buffers records and commits batches of up to BATCH_LIMIT docs, with up
+    to `max_in_flight` commits running on worker threads (`<= 1` commits
+    inline). With a `FingerprintStore`, records whose persisted fields are
+    unchanged since the last successful commit are skipped. Contended or
+    transiently failing batches are retried with backoff; batches that
+    still fail are counted instead of aborting the run. Call `close()` to
+    commit the remainder and wait for in-flight batches. After any write the
+    topic coverage index is recounted on close (topics of written docs plus
+    those it already lists).
+    """
 
-    client = firestore.Client(project=project_id)
-    written = 0
-    batch = client.batch()
     BATCH_LIMIT = 400  # leave headroom under Firestore 500 ops limit
-    ops = 0
-    for rec in records:
+
+    def __init__(
+        self,
+        client: Any,
+        collection: str = "content",
+        fingerprints: Optional[FingerprintStore] = None,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        retry_delay: float = 0.5,
+    ) -> None:
+        self.client = client
+        self.collection = collection
+        self.fingerprints = fingerprints
+        self.scope = f"{getattr(client, 'project', '') or ''}/{collection}"
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.retries = 0
+        self.topics_written: set = set()
+        self._candidates: List[Tuple[str, Dict]] = []
+        self._pending: List[Tuple[str, Dict, str]] = []
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Deque[Future] = deque()
+
+    def add(self, rec: Dict) -> None:
         cid = make_content_id(rec)
         if not cid:
-            continue
-        doc_ref = client.collection(collection).document(cid)
-        batch.set(doc_ref, rec, merge=True)
-        ops += 1
-        written += 1
-        if ops >= BATCH_LIMIT:
-            batch.commit()
-            batch = client.batch()
-            ops = 0
-    if ops:
-        batch.commit()
-    return written
+            return
+        self._candidates.append((cid, rec))
+        if len(self._candidates) >= self.BATCH_LIMIT:
+            self._filter_candidates()
+        while len(self._pending) >= self.BATCH_LIMIT:
+            self._submit(self._pending[: self.BATCH_LIMIT])
+            self._pending = self._pending[self.BATCH_LIMIT :]
+
+    def _filter_candidates(self) -> None:
+        cands, self._candidates = self._candidates, []
+        fps = [(cid, rec, record_fingerprint(rec)) for cid, rec in cands]
+        same = self.fingerprints.unchanged(self.scope, [(cid, fp) for cid, _, fp in fps]) if self.fingerprints else set()
+        for cid, rec, fp in fps:
+            if cid in same:
+                self.skipped += 1
+            else:
+                self._pending.append((cid, rec, fp))
+
+    def _submit(self, ops: List[Tuple[str, Dict, str]]) -> None:
+        if self.max_in_flight <= 1:
+            self._commit(ops)
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        while len(self._in_flight) >= self.max_in_flight:
+            self._in_flight.popleft().result()
+        self._in_flight.append(self._pool.submit(self._commit, ops))
+
+    def _commit(self, ops: List[Tuple[str, Dict, str]]) -> None:
+        coll = self.client.collection(self.collection)
+        # Only changed docs get here, so the stamp marks the last real update (the API's ETags use it)
+        stamp = dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        for attempt in range(self.max_retries + 1):
+            try:
+                batch = self.client.batch()
+                for cid, rec, _ in ops:
+                    batch.set(coll.document(cid), {**rec, "updated_at": stamp}, merge=True)
+                batch.commit()
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    print(f"WARN: Firestore batch of {len(ops)} docs failed: {e}")
+                    with self._lock:
+                        self.failed += len(ops)
+                    return
+                with self._lock:
+                    self.retries += 1
+                time.sleep(min(8.0, self.retry_delay * (2 ** attempt)) * (0.5 + random.random() / 2))
+        with self._lock:
+            self.written += len(ops)
+            for _, rec, _ in ops:
+                self.topics_written.update(t for t in rec.get("topics") or [] if isinstance(t, str))
+        if self.fingerprints is not None:
+            try:
+                self.fingerprints.put(self.scope, [(cid, fp) for cid, _, fp in ops])
+            except Exception as e:
+                print(f"WARN: failed to record Firestore fingerprints: {e}")
+
+    def flush(self) -> None:
+        """Commit everything buffered and wait for in-flight batches."""
+        self._filter_candidates()
+        for i in range(0, len(self._pending), self.BATCH_LIMIT):
+            self._submit(self._pending[i : i + self.BATCH_LIMIT])
+        self._pending = []
+        while self._in_flight:
+            self._in_flight.popleft().result()
 
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {"written": self.written, "skipped": self.skipped, "failed": self.failed, "retries": self.retries}
+
+    def close(self) -> int:
+        try:
+            self.flush()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        if self.written:
+            try:
+                update_topic_coverage(self.client, self.collection, self.topics_written)
+            except Exception as e:
+                print(f"WARN: topic coverage index not updated: {e}")
+        return self.written
+
+
+def write_firestore_content(
+    records: Iterable[Dict],
+    project_id: str,
+    collection: str = "content",
+    fingerprints: Optional[FingerprintStore] = None,
+) -> int:
+    """Write records to Firestore Native as documents in collection.
+
+    Each record is stored under doc id `yt:{VIDEOID}` with the record fields.
+    Requires `google-cloud-firestore` and ADC credentials (`gcloud auth application-default login`).
+    """
+    writer = FirestoreContentWriter(firestore_client(project_id), collection, fingerprints)
+    for rec in records:
+        writer.add(rec)
+    return writer.close()
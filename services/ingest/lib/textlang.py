@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import open_sqlite
+
+
+LangResult = Tuple[Optional[str], Optional[float]]
+
+MIN_TEXT_CHARS = 20
+DETECT_SEED = 0
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", (text or "")).strip()
+
+
+def text_key(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _seed_langdetect() -> bool:
+    """Import langdetect with a fixed seed so results are reproducible; False if missing."""
+    try:
+        from langdetect import DetectorFactory  # type: ignore
+    except Exception:
+        return False
+    DetectorFactory.seed = DETECT_SEED
+    return True
+
+
+def detect_text_language(text: str) -> LangResult:
+    """Detect language of already normalized text via langdetect; returns (lang, confidence).
+
+    Returns (None, None) if langdetect is unavailable or the text is too short.
+    """
+    if not text or len(text) < MIN_TEXT_CHARS or not _seed_langdetect():
+        return None, None
+    try:
+        from langdetect import detect_langs  # type: ignore
+
+        # detect_langs returns list like ['en:0.99','fr:0.01']
+        langs = detect_langs(text)
+        if not langs:
+            return None, None
+        best = max(langs, key=lambda l: l.prob)
+        return getattr(best, "lang", None), float(getattr(best, "prob", 0.0))
+    except Exception:
+        return None, None
+
+
+def _detect_chunk(texts: List[str]) -> List[LangResult]:
+    return [detect_text_language(t) for t in texts]
+
+
+class TextLanguageDetector:
+    """Batched, cached text language detection.
+
+    Texts are keyed by the SHA-1 of their normalized form, so repeated
+    titles/descriptions are detected once (and, with `cache_path`, once
+    across runs). Uncached texts are spread over a process pool when a
+    batch has at least `min_parallel` of them.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None, workers: int = 1, min_parallel: int = 32) -> None:
+        self.workers = workers
+        self.min_parallel = min_parallel
+        self.counters: Dict[str, int] = {"cached": 0, "detected": 0, "skipped": 0}
+        self._memory: Dict[str, LangResult] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._db = None
+        if cache_path:
+            self._db = open_sqlite(cache_path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS text_lang (key TEXT PRIMARY KEY, lang TEXT, conf REAL)")
+
+    def skip(self, n: int = 1) -> None:
+        """Count records whose explicit language metadata made detection unnecessary."""
+        with self._lock:
+            self.counters["skipped"] += n
+
+    def _lookup(self, keys: List[str]) -> Dict[str, LangResult]:
+        found: Dict[str, LangResult] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._memory:
+                    found[k] = self._memory[k]
+            missing = [k for k in keys if k not in found]
+            if self._db is not None and missing:
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i : i + 500]
+                    marks = ",".join("?" * len(chunk))
+                    for k, lang, conf in self._db.execute(
+                        f"SELECT key, lang, conf FROM text_lang WHERE key IN ({marks})", chunk
+                    ):
+                        found[k] = self._memory[k] = (lang, conf)
+        return found
+
+    def _store(self, results: Dict[str, LangResult]) -> None:
+        with self._lock:
+            self._memory.update(results)
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO text_lang (key, lang, conf) VALUES (?, ?, ?)",
+                    [(k, lang, conf) for k, (lang, conf) in results.items()],
+                )
+
+    def _run(self, texts: List[str]) -> List[LangResult]:
+        if self.workers <= 1 or len(texts) < self.min_parallel or not _seed_langdetect():
+            return _detect_chunk(texts)
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the ingest process is multi-threaded by now
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+        size = max(1, -(-len(texts) // self.workers))
+        chunks = [texts[i : i + size] for i in range(0, len(texts), size)]
+        out: List[LangResult] = []
+        for part in pool.map(_detect_chunk, chunks):
+            out.extend(part)
+        return out
+
+    def detect_many(self, texts: List[str]) -> List[LangResult]:
+        """Detect languages for `texts`, returning results in the same order."""
+        normalized = [normalize_text(t) for t in texts]
+        keys = [text_key(t) for t in normalized]
+        known = self._lookup(list(dict.fromkeys(keys)))
+        todo: Dict[str, str] = {}
+        for k, t in zip(keys, normalized):
+            if k not in known and k not in todo:
+                todo[k] = t
+        if todo:
+            results = dict(zip(todo.keys(), self._run(list(todo.values()))))
+            self._store(results)
+            known.update(results)
+        with self._lock:
+            self.counters["detected"] += len(todo)
+            self.counters["cached"] += len(keys) - len(todo)
+        return [known[k] for k in keys]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ...policy.automaton import normalize_text
+
+
+# Phrases per topic slug, matched as whole words in title + description.
+# Keys cover the API CATEGORIES (FEED_TOPICS) and the kids policy's allowed_topics.
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    "prophets": [
+        "prophet", "prophets", "nabi", "anbiya", "qisas al anbiya", "stories of the prophets", "messenger of allah",
+        "ibrahim", "musa", "yusuf", "yunus", "nuh", "sulaiman", "sulayman", "dawud", "ismail", "yaqub", "ayyub",
+    ],
+    "duas": [
+        "dua", "duas", "duaa", "du a", "supplication", "supplications", "dhikr", "zikr", "adhkar", "azkar",
+        "morning adhkar", "evening adhkar",
+    ],
+    "ramadan": [
+        "ramadan", "ramadhan", "ramzan", "suhoor", "suhur", "sahur", "iftar", "taraweeh", "tarawih",
+        "laylat al qadr", "laylatul qadr", "eid al fitr", "eid ul fitr",
+    ],
+    "seerah": [
+        "seerah", "sirah", "sira", "life of the prophet", "prophet muhammad", "hijrah", "hijra", "battle of badr",
+        "sahaba", "sahabah", "companions of the prophet",
+    ],
+    "nasheeds": ["nasheed", "nasheeds", "nasyid", "anasheed", "islamic song", "islamic songs", "vocals only"],
+    "arabic": [
+        "arabic", "learn arabic", "arabic alphabet", "arabic letters", "alif ba ta", "huroof", "hijaiyah",
+        "noorani qaida", "qaida",
+    ],
+    "stories": [
+        "story", "stories", "storytime", "story time", "bedtime story", "bedtime stories", "islamic stories",
+        "tale", "tales",
+    ],
+}
+
+
+def topic_dictionaries(extra_slugs: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """TOPIC_KEYWORDS plus an entry for each extra slug (e.g. a policy's allowed_topics).
+
+    Slugs without a curated dictionary match their own name ("quran_recitation"
+    → "quran recitation") and its plural.
+    """
+    out = {slug: list(phrases) for slug, phrases in TOPIC_KEYWORDS.items()}
+    for slug in extra_slugs:
+        slug = str(slug).strip().lower()
+        if slug and slug not in out:
+            name = normalize_text(slug)
+            out[slug] = [name, f"{name}s"]
+    return out
+
+
+class TopicTagger:
+    """Keyword topic classifier compiled once into a word-level phrase trie.
+
+    Phrases match whole words only ("dua" does not match "dual"). Each
+    record's normalized text is split once and every word costs one dict
+    lookup unless it starts a phrase, so tagging stays linear in the text
+    however many topics and phrases are compiled in.
+    """
+
+    def __init__(self, dictionaries: Optional[Dict[str, List[str]]] = None) -> None:
+        dictionaries = TOPIC_KEYWORDS if dictionaries is None else dictionaries
+        self.topics = sorted(dictionaries)
+        # Nested {word: node}; the "" key of a node holds the slugs of phrases ending there
+        self.trie: Dict[str, Any] = {}
+        for slug in self.topics:
+            for phrase in dictionaries[slug]:
+                words = normalize_text(phrase).split()
+                if not words:
+                    continue
+                node = self.trie
+                for w in words:
+                    node = node.setdefault(w, {})
+                node.setdefault("", set()).add(slug)
+
+    def tag_text(self, text: str) -> List[str]:
+        words = normalize_text(text).split()
+        n = len(words)
+        root = self.trie
+        found: Set[str] = set()
+        for i, w in enumerate(words):
+            node = root.get(w)
+            j = i + 1
+            while node is not None:
+                slugs = node.get("")
+                if slugs:
+                    found.update(slugs)
+                if j >= n:
+                    break
+                node = node.get(words[j])
+                j += 1
+        return sorted(found)
+
+    def tag_batch(self, records: List[Dict]) -> int:
+        """Merge detected slugs into each record's `topics`; returns how many records got a new topic."""
+        changed = 0
+        for rec in records:
+            found = self.tag_text(f"{rec.get('title') or ''} {rec.get('description') or ''}")
+            if not found:
+                continue
+            existing = [t for t in rec.get("topics") or [] if isinstance(t, str)]
+            merged = sorted(set(existing) | set(found))
+            if merged != sorted(existing):
+                changed += 1
+            rec["topics"] = merged
+        return changed
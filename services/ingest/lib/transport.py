@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+from urllib.parse import urlsplit
+
+
+# Google APIs only gzip responses when the User-Agent also mentions gzip.
+USER_AGENT = "lumens-ingest/0.1 (gzip)"
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    elapsed: float = 0.0
+
+
+@dataclass
+class TransportStats:
+    """Aggregate counters for calls made through a transport."""
+
+    calls: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+    seconds: float = 0.0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, elapsed: float, wire_bytes: int = 0, body_bytes: int = 0, error: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.seconds += elapsed
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+            if error:
+                self.errors += 1
+
+    def opened(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "connections_opened": self.connections_opened,
+                "seconds": round(self.seconds, 3),
+                "avg_ms": round(1000.0 * self.seconds / self.calls, 1) if self.calls else 0.0,
+                "wire_bytes": self.wire_bytes,
+                "body_bytes": self.body_bytes,
+            }
+
+
+class Transport(Protocol):
+    """Minimal GET interface used by the YouTube client."""
+
+    stats: TransportStats
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        ...
+
+
+def _decode_body(raw: bytes, headers: Dict[str, str]) -> bytes:
+    if headers.get("content-encoding", "").lower() == "gzip" and raw:
+        return gzip.decompress(raw)
+    return raw
+
+
+_Key = Tuple[str, str, int]
+
+
+class PooledTransport:
+    """Keep-alive HTTP(S) transport with a small per-host connection pool.
+
+    - Thread-safe: connections are checked out under a lock and used by one
+      thread at a time; idle connections are reused LIFO.
+    - Sends `Accept-Encoding: gzip` and transparently decompresses bodies.
+    - Records per-call wall time in `stats`; `on_call(url, status, elapsed)`
+      can be set to observe individual calls.
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = 16,
+        on_call: Optional[Callable[[str, int, float], None]] = None,
+    ) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.on_call = on_call
+        self.stats = TransportStats()
+        self._idle: Dict[_Key, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, key: _Key, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        self.stats.opened()
+        return conn, False
+
+    def _checkin(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle.clear()
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key: _Key = (scheme, parts.hostname or "", port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip", **(headers or {})}
+
+        start = time.monotonic()
+        while True:
+            conn, reused = self._checkout(key, timeout)
+            try:
+                conn.request("GET", target, headers=req_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # A pooled connection may have been closed by the server while
+                # idle; retry once on a fresh connection before giving up.
+                if reused:
+                    continue
+                self.stats.record(time.monotonic() - start, error=True)
+                raise
+            break
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        body = _decode_body(raw, resp_headers)
+        elapsed = time.monotonic() - start
+        self.stats.record(elapsed, len(raw), len(body), error=resp.status >= 400)
+        if self.on_call:
+            self.on_call(url, resp.status, elapsed)
+        return HttpResponse(resp.status, resp_headers, body, elapsed)
@@ -1,52 +1,105 @@
 from __future__ import annotations
 
 import json
+import os
 import time
-from typing import Dict, Iterator, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from http.client import HTTPException
 from urllib.parse import urlencode, urlparse, parse_qs
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
 
+from .cache import ResponseCache
+from .quota import QuotaLedger
+from .transport import HttpResponse, PooledTransport, Transport
 
-API_BASE = "https://www.googleapis.com/youtube/v3"
+
+# Overridable to point ingest at a local stand-in (see services/ingest/bench)
+API_BASE = os.getenv("LUMENS_YT_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
 YOUTUBE_HOSTS = {"www.youtube.com", "youtube.com", "m.youtube.com", "youtu.be"}
 
 
-def http_get_json(path: str, params: Dict[str, str], api_key: str) -> Dict:
+_transport: Transport = PooledTransport()
+
+
+def set_transport(transport: Transport) -> Transport:
+    """Install the transport used by `http_get_json`; returns the previous one."""
+    global _transport
+    previous = _transport
+    _transport = transport
+    return previous
+
+
+def get_transport() -> Transport:
+    return _transport
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> Optional[ResponseCache]:
+    """Install (or clear with None) the ETag cache used by `http_get_json`."""
+    global _response_cache
+    previous = _response_cache
+    _response_cache = cache
+    return previous
+
+
+_quota_ledger: QuotaLedger = QuotaLedger()
+
+
+def set_quota_ledger(ledger: QuotaLedger) -> QuotaLedger:
+    """Install the ledger charged by `yt_api`; returns the previous one."""
+    global _quota_ledger
+    previous = _quota_ledger
+    _quota_ledger = ledger
+    return previous
+
+
+def get_quota_ledger() -> QuotaLedger:
+    return _quota_ledger
+
+
+def _error_detail(body: bytes) -> str:
+    text = body.decode("utf-8", "ignore")
+    try:
+        err = json.loads(text).get("error", {})
+        message = err.get("message")
+        reason = (err.get("errors", [{}])[0] or {}).get("reason")
+        return f"{message} (reason: {reason})"
+    except Exception:
+        return text[:200]
+
+
+def _http_get(path: str, params: Dict[str, str], api_key: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
     params = {**params, "key": api_key}
     url = f"{API_BASE}{path}?{urlencode(params)}"
-    req = Request(url, headers={"User-Agent": "lumens-ingest/0.1"})
     try:
-        with urlopen(req, timeout=30) as resp:
-            data = resp.read()
-            if resp.status != 200:
-                # Attempt to surface error JSON details even on non-200
-                try:
-                    detail = json.loads(data.decode("utf-8")).get("error", {}).get("message", "")
-                except Exception:
-                    detail = (data[:200].decode("utf-8", "ignore") if isinstance(data, (bytes, bytearray)) else str(data))
-                raise RuntimeError(f"HTTP {resp.status} for {url} - {detail}")
-            return json.loads(data.decode("utf-8"))
-    except HTTPError as e:
-        # Read error body for YouTube error details
-        body = ""
-        try:
-            body_bytes = e.read()
-            body = body_bytes.decode("utf-8", "ignore")
-        except Exception:
-            pass
-        detail = ""
-        try:
-            ej = json.loads(body)
-            err = ej.get("error", {})
-            message = err.get("message")
-            reason = (err.get("errors", [{}])[0] or {}).get("reason")
-            detail = f"{message} (reason: {reason})"
-        except Exception:
-            detail = body[:200]
-        raise RuntimeError(f"HTTP {e.code} for {url} - {detail}") from None
-    except URLError as e:
+        resp = _transport.get(url, headers=headers, timeout=30)
+    except (HTTPException, OSError) as e:
         raise RuntimeError(f"Network error calling {url}: {e}") from None
+    if resp.status not in (200, 304):
+        # Surface YouTube error details (message + reason) from the error body
+        raise RuntimeError(f"HTTP {resp.status} for {url} - {_error_detail(resp.body)}")
+    return resp
+
+
+def http_get_json(path: str, params: Dict[str, str], api_key: str) -> Dict:
+    """GET a Data API resource, revalidating against the response cache if one is set."""
+    cache = _response_cache
+    if cache is None:
+        return json.loads(_http_get(path, params, api_key).body.decode("utf-8"))
+    key = cache.make_key(path, params)
+    cached = cache.lookup(key)
+    headers = {"If-None-Match": cached.etag} if cached else None
+    resp = _http_get(path, params, api_key, headers)
+    if resp.status == 304 and cached:
+        cache.mark_hit(key)
+        return json.loads(cached.body)
+    text = resp.body.decode("utf-8")
+    data = json.loads(text)
+    etag = resp.headers.get("etag") or (data.get("etag") if isinstance(data, dict) else None)
+    if etag:
+        cache.store(key, str(etag), text, refreshed=cached is not None)
+    return data
 
 
 def backoff_sleep(attempt: int) -> None:
@@ -55,15 +108,24 @@ def backoff_sleep(attempt: int) -> None:
 
 def yt_api(path: str, params: Dict[str, str], api_key: str, max_attempts: int = 4) -> Dict:
     for attempt in range(max_attempts):
+        # Every attempt is billed, so charge the ledger before each one
+        _quota_ledger.charge(path)
         try:
             return http_get_json(path, params, api_key)
-        except Exception:
-            if attempt == max_attempts - 1:
+        except Exception as e:
+            # Retrying a quota error only burns more of the day's quota,
+            # and a missing resource will not appear on retry either
+            if attempt == max_attempts - 1 or _is_quota_error(e) or _is_not_found(e):
                 raise
             backoff_sleep(attempt)
     raise RuntimeError("Unreachable")
 
 
+def _is_quota_error(e: Exception) -> bool:
+    msg = str(e)
+    return "quotaExceeded" in msg or "dailyLimitExceeded" in msg
+
+
 def get_uploads_playlist_id(channel_id: str, api_key: str) -> Optional[str]:
     """Return the channel's uploads playlist ID (low quota path)."""
     resp = yt_api(
@@ -143,18 +205,70 @@ def resolve_channel_id(kind: str, value: str, api_key: str, relevance_language:
     return None
 
 
-def iter_channel_videos(channel_id: str, api_key: str, limit: int, relevance_language: Optional[str] = None) -> Iterator[Dict]:
+def derive_uploads_playlist_id(channel_id: str) -> Optional[str]:
+    """Map a `UC…` channel id to its `UU…` uploads playlist without an API call."""
+    if channel_id.startswith("UC") and len(channel_id) == 24:
+        return "UU" + channel_id[2:]
+    return None
+
+
+def _is_not_found(e: Exception) -> bool:
+    msg = str(e)
+    return msg.startswith("HTTP 404") or "playlistNotFound" in msg
+
+
+def iter_channel_videos(
+    channel_id: str,
+    api_key: str,
+    limit: int,
+    relevance_language: Optional[str] = None,
+    uploads_playlist_id: Optional[str] = None,
+    on_uploads_resolved: Optional[Callable[[str, Optional[str]], None]] = None,
+    stop_before: Optional[str] = None,
+    uploads_known: bool = False,
+) -> Iterator[Dict]:
     """Yield latest videos for a channel.
 
-    Prefers the channel's uploads playlist (playlistItems; 1 unit per call).
+    Prefers the channel's uploads playlist (playlistItems; 1 unit per call),
+    using a known or derived `UU…` id and only asking `/channels` when that
+    playlist does not exist. `on_uploads_resolved(channel_id, uploads)` is
+    called after such a lookup so callers can cache the answer.
+    With `uploads_known`, `uploads_playlist_id` is such a cached answer and
+    `/channels` is not asked again: None goes straight to search, and the
+    derived playlist 404ing again means the channel has no public uploads.
     Falls back to search (100 units per call) if uploads playlist is unavailable.
+    `stop_before` (a published_at watermark) ends paging early; the search
+    fallback passes it as `publishedAfter`.
     """
-    uploads = get_uploads_playlist_id(channel_id, api_key)
-    if uploads:
+    derived = derive_uploads_playlist_id(channel_id)
+    search_only = uploads_known and not uploads_playlist_id
+    tried = None if search_only else (uploads_playlist_id or derived)
+    if tried:
+        yielded = False
+        try:
+            for rec in iter_playlist_videos(tried, api_key, limit, stop_before):
+                yielded = True
+                yield rec
+            return
+        except RuntimeError as e:
+            if yielded or not _is_not_found(e):
+                raise
+    if search_only:
+        uploads = None
+    elif uploads_known and tried == derived:
+        uploads = tried
+    else:
+        uploads = get_uploads_playlist_id(channel_id, api_key)
+        if on_uploads_resolved:
+            on_uploads_resolved(channel_id, uploads)
+    if uploads and uploads != tried:
         # Use low-quota playlistItems path
-        for rec in iter_playlist_videos(uploads, api_key, limit):
+        for rec in iter_playlist_videos(uploads, api_key, limit, stop_before):
             yield rec
         return
+    if uploads:
+        # The channel's own uploads playlist 404s: it has no public uploads, so search would find nothing either
+        return
 
     # Fallback to search (higher quota)
     fetched = 0
@@ -170,6 +284,8 @@ def iter_channel_videos(channel_id: str, api_key: str, limit: int, relevance_lan
         }
         if relevance_language:
             params["relevanceLanguage"] = relevance_language
+        if stop_before:
+            params["publishedAfter"] = stop_before
         if page_token:
             params["pageToken"] = page_token
         resp = yt_api("/search", params, api_key)
@@ -197,7 +313,18 @@ def iter_channel_videos(channel_id: str, api_key: str, limit: int, relevance_lan
             break
 
 
-def iter_playlist_videos(playlist_id: str, api_key: str, limit: int) -> Iterator[Dict]:
+def _page_fully_older(dates: List[Optional[str]], stop_before: Optional[str]) -> bool:
+    """True if every dated item on a page was published before `stop_before`."""
+    known = [d for d in dates if d]
+    return bool(stop_before and known and all(d < stop_before for d in known))
+
+
+def iter_playlist_videos(playlist_id: str, api_key: str, limit: int, stop_before: Optional[str] = None) -> Iterator[Dict]:
+    """Yield playlist videos page by page.
+
+    With `stop_before` (an ISO timestamp watermark), paging stops after the
+    first page whose items are all older than it.
+    """
     fetched = 0
     page_token: Optional[str] = None
     while fetched < limit:
@@ -210,8 +337,10 @@ def iter_playlist_videos(playlist_id: str, api_key: str, limit: int) -> Iterator
         if page_token:
             params["pageToken"] = page_token
         resp = yt_api("/playlistItems", params, api_key)
+        page_dates: List[Optional[str]] = []
         for item in resp.get("items", []):
             sn = item.get("snippet", {})
+            page_dates.append(sn.get("publishedAt"))
             rid = sn.get("resourceId", {})
             if rid.get("kind") != "youtube#video":
                 continue
@@ -231,5 +360,5 @@ def iter_playlist_videos(playlist_id: str, api_key: str, limit: int) -> Iterator
             if fetched >= limit:
                 break
         page_token = resp.get("nextPageToken")
-        if not page_token or fetched >= limit:
+        if not page_token or fetched >= limit or _page_fully_older(page_dates, stop_before):
             break
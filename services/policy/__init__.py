@@ -0,0 +1 @@
+# Content policy compilation and evaluation.
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Casefold and collapse punctuation/whitespace to single spaces.
+
+    Keywords and scanned text go through the same normalization, so
+    "Challenge-gone WRONG!" matches the keyword "challenge gone wrong".
+    """
+    return _NON_WORD_RE.sub(" ", (text or "").casefold()).strip()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton matching many keywords in one pass over a text.
+
+    Patterns are matched at word starts (a match must begin at the start of
+    the text or after a space) but may end mid-word, so "prank" also matches
+    "pranks" while "art" does not match "start". Scanning is linear in the
+    text length regardless of how many keywords are compiled in.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        self.patterns: List[str] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for p in patterns:
+            self._add(p)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        norm = normalize_text(pattern)
+        if not norm:
+            return
+        idx = len(self.patterns)
+        self.patterns.append(norm)
+        node = 0
+        # Leading space anchors the pattern to a word start
+        for ch in " " + norm:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(idx)
+
+    def _build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str, normalized: bool = False) -> Set[int]:
+        """Indices (into `patterns`) of every pattern occurring in `text`."""
+        if not self.patterns:
+            return set()
+        hits: Set[int] = set()
+        node = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for ch in " " + (text if normalized else normalize_text(text)):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.update(out[node])
+        return hits
+
+    def to_json(self) -> Dict:
+        return {"patterns": self.patterns, "goto": self.goto, "fail": self.fail, "out": self.out}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "KeywordAutomaton":
+        automaton = cls()
+        automaton.patterns = list(data["patterns"])
+        automaton.goto = [dict(g) for g in data["goto"]]
+        automaton.fail = list(data["fail"])
+        automaton.out = [list(o) for o in data["out"]]
+        return automaton
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ..ingest.lib.store.feeds import DEFAULT_FEED_SIZE, write_feed_snapshots
+from .compiler import CompiledPolicy, compile_policy_file, load_policy, save_compiled
+from .reevaluate import ReevalStats, iter_firestore, iter_ndjson, reevaluate_records, write_back_payload, write_ndjson
+
+
+ROOT = Path(__file__).resolve().parents[2]
+POLICIES_DIR = ROOT / "policies"
+
+
+def compiled_path(out_dir: Path, key: str) -> Path:
+    return out_dir / f"{key.replace('/', '_')}.json"
+
+
+def snapshot_path(out_dir: Path, snapshot_id: str) -> Path:
+    """Artifact kept per version ("{community}_{vertical}@{version}.json") for diffing docs it evaluated."""
+    return out_dir / f"{snapshot_id.replace('/', '_')}.json"
+
+
+def save_artifacts(policy: CompiledPolicy, out_dir: Path) -> Path:
+    """Save `policy` as the current artifact and as its version's snapshot; returns the current path."""
+    out = compiled_path(out_dir, policy.key)
+    save_compiled(policy, out)
+    save_compiled(policy, snapshot_path(out_dir, policy.snapshot_id))
+    return out
+
+
+def artifact_history(out_dir: Path) -> Callable[[str], Optional[CompiledPolicy]]:
+    """Lookup of compiled artifacts by snapshot id (None when that version was never saved)."""
+
+    def _load(snapshot_id: str) -> Optional[CompiledPolicy]:
+        path = snapshot_path(out_dir, snapshot_id)
+        return load_policy(path) if snapshot_id and path.exists() else None
+
+    return _load
+
+
+def cmd_compile(paths: List[Path], out_dir: Path) -> int:
+    if not paths:
+        paths = sorted(POLICIES_DIR.rglob("policy.yaml"))
+    if not paths:
+        print("No policy files found under policies/**/policy.yaml")
+        return 1
+    for path in paths:
+        policy = compile_policy_file(path)
+        out = save_artifacts(policy, out_dir)
+        print(f"Compiled {path} → {out} ({policy.snapshot_id}, {len(policy.keywords)} keywords, {len(policy.automaton.goto)} states)")
+    return 0
+
+
+def cmd_reevaluate(
+    policy_path: Path,
+    out_dir: Path,
+    previous_path: Optional[Path] = None,
+    ndjson: Optional[Path] = None,
+    firestore_project: Optional[str] = None,
+    collection: str = "content",
+    out: Optional[Path] = None,
+    dry_run: bool = False,
+    progress_every: int = 5000,
+    firestore_concurrency: int = 4,
+    feed_size: int = DEFAULT_FEED_SIZE,
+) -> int:
+    """Re-check stored content against a new policy version, writing back only flipped docs.
+
+    The previous version is the compiled artifact in `out_dir` (what ingest
+    last applied) unless `previous_path` is given. Docs whose decision is
+    from an older version are diffed against that version's snapshot
+    artifact (`snapshot_path`) when it is kept in `out_dir`. On success the
+    new version is saved there (after writing to Firestore or `out`) so the
+    next run diffs against it. Feed snapshots embed `eligible`, so they are
+    rebuilt (first `feed_size` items; 0 disables) after Firestore docs flipped.
+    """
+    policy = load_policy(policy_path)
+    previous_path = previous_path or compiled_path(out_dir, policy.key)
+    previous = load_policy(previous_path) if previous_path.exists() else None
+    changed = policy.changed_groups(previous)
+    if previous is None:
+        print(f"No previous artifact at {previous_path}; evaluating every rule")
+    else:
+        print(f"{previous.snapshot_id} → {policy.snapshot_id}: changed rule groups: {', '.join(changed) or 'none'}")
+
+    writer = None
+    if ndjson is not None:
+        records = iter_ndjson(ndjson)
+    elif firestore_project:
+        from ..ingest.lib.store.firestore_writer import FirestoreContentWriter, firestore_client
+
+        client = firestore_client(firestore_project)
+        records = iter_firestore(client, collection)
+        if not dry_run:
+            writer = FirestoreContentWriter(client, collection, max_in_flight=firestore_concurrency)
+    else:
+        print("Pass --ndjson or --firestore-project")
+        return 2
+
+    stats = ReevalStats()
+    flipped = (
+        rec for rec, _ in reevaluate_records(records, policy, previous, stats, progress_every, artifact_history(out_dir))
+    )
+    if writer is not None:
+        for rec in flipped:
+            writer.add(write_back_payload(rec, policy.key))
+        writer.close()
+        counts = writer.counts()
+        print(f"Firestore: {counts['written']} docs updated, {counts['failed']} failed, {counts['retries']} retries")
+        if feed_size > 0 and counts["written"]:
+            try:
+                n = write_feed_snapshots(writer.client, collection, feed_size)
+                print(f"Rebuilt {n} feed snapshots (first {feed_size} items each)")
+            except Exception as e:
+                print(f"WARN: feed snapshots not rebuilt: {e}")
+        if counts["failed"]:
+            print("WARN: some updates failed; keeping the previous artifact so a re-run retries them")
+            print(f"Re-evaluated {stats.summary()}")
+            return 1
+    elif out is not None and not dry_run:
+        written = write_ndjson(flipped, out)
+        print(f"Wrote {written} flipped docs → {out}")
+    else:
+        for _ in flipped:
+            pass
+    print(f"Re-evaluated {stats.summary()}")
+
+    # Only advance the baseline once the flips were persisted somewhere
+    if writer is not None or (out is not None and not dry_run):
+        target = save_artifacts(policy, out_dir)
+        print(f"Saved {policy.snapshot_id} → {target}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Compile and apply content policies.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    c = sub.add_parser("compile", help="Compile policy.yaml files into versioned JSON artifacts")
+    c.add_argument("policies", nargs="*", help="policy.yaml paths (default: every policies/**/policy.yaml)")
+    c.add_argument("--out-dir", default="out/policy", help="Directory for compiled artifacts (default: out/policy)")
+
+    r = sub.add_parser("reevaluate", help="Re-check stored content after a policy change, writing back only flipped docs")
+    r.add_argument("policy", help="New policy (policy.yaml or compiled .json)")
+    r.add_argument("--previous", default=None, help="Compiled artifact of the version content was last evaluated with (default: <out-dir>/<community>_<vertical>.json)")
+    r.add_argument("--out-dir", default="out/policy", help="Directory for compiled artifacts (default: out/policy)")
+    r.add_argument("--ndjson", default=None, help="Read content from an ingest NDJSON snapshot instead of Firestore")
+    r.add_argument("--out", default=None, help="With --ndjson: write the flipped docs (updated) to this NDJSON file")
+    r.add_argument("--firestore-project", default=os.getenv("LUMENS_GCP_PROJECT"), help="Scan and update Firestore in this project (env LUMENS_GCP_PROJECT)")
+    r.add_argument("--firestore-collection", default="content", help="Firestore collection (default: content)")
+    r.add_argument("--firestore-concurrency", type=int, default=4, help="Max Firestore update batches in flight (default: 4)")
+    r.add_argument("--feed-size", type=int, default=int(os.getenv("LUMENS_FEED_SIZE", str(DEFAULT_FEED_SIZE))), help=f"Items per feed snapshot rebuilt after docs flipped in Firestore; 0 disables (default: {DEFAULT_FEED_SIZE})")
+    r.add_argument("--progress-every", type=int, default=5000, help="Print throughput every N docs (0 disables)")
+    r.add_argument("--dry-run", action="store_true", help="Report what would flip without writing docs or saving the artifact")
+
+    args = ap.parse_args(argv)
+    if args.command == "compile":
+        return cmd_compile([Path(p) for p in args.policies], Path(args.out_dir))
+    if args.command == "reevaluate":
+        return cmd_reevaluate(
+            Path(args.policy),
+            Path(args.out_dir),
+            previous_path=Path(args.previous) if args.previous else None,
+            ndjson=Path(args.ndjson) if args.ndjson else None,
+            firestore_project=args.firestore_project,
+            collection=args.firestore_collection,
+            out=Path(args.out) if args.out else None,
+            dry_run=args.dry_run,
+            progress_every=args.progress_every,
+            firestore_concurrency=args.firestore_concurrency,
+            feed_size=args.feed_size,
+        )
+    return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .automaton import KeywordAutomaton, normalize_text
+
+
+# Bump when the compiled artifact layout or matching semantics change
+COMPILER_VERSION = 1
+
+# Rule groups hashed separately so re-evaluation can tell which ones changed
+RULE_GROUPS = ("blocked_keywords", "blocked_topics", "allowed_topics", "labels", "age_range", "review")
+# The groups a decision's `eligible` flag depends on
+ELIGIBILITY_GROUPS = ("blocked_keywords", "blocked_topics")
+
+
+def load_policy_source(path: Path) -> Dict[str, Any]:
+    """Load a policy.yaml (requires PyYAML)."""
+    try:
+        import yaml  # type: ignore
+    except Exception as e:
+        raise RuntimeError("PyYAML is required to read policy.yaml. Install via `pip install pyyaml`") from e
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: policy must be a mapping")
+    return data
+
+
+def _sha1(data: Any) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _terms(values: Optional[Iterable[Any]]) -> List[str]:
+    return sorted({normalize_text(str(v)) for v in values or [] if normalize_text(str(v))})
+
+
+def _slugs(values: Optional[Iterable[Any]]) -> List[str]:
+    return sorted({str(v).strip().lower() for v in values or [] if str(v).strip()})
+
+
+class CompiledPolicy:
+    """A policy.yaml compiled for fast batch evaluation.
+
+    All keyword rules (blocked keywords plus safe/risky label tags) share
+    one automaton, so each record's title and description are scanned once
+    regardless of the number of keywords; topic rules are set lookups.
+    `rule_hashes` fingerprints each rule group's compiled form.
+    """
+
+    def __init__(self, key: str, version: str, rules: Dict[str, Any], source_sha1: str = "", automaton: Optional[KeywordAutomaton] = None) -> None:
+        self.key = key
+        self.version = version
+        self.rules = rules
+        self.source_sha1 = source_sha1
+        self.rule_hashes: Dict[str, str] = {group: _sha1(rules.get(group)) for group in RULE_GROUPS}
+        # Pattern i of the automaton is keyword `self.keywords[i]` = (kind, term)
+        self.keywords: List[Tuple[str, str]] = [("blocked", t) for t in rules["blocked_keywords"]]
+        self.keywords += [("risky", t) for t in rules["labels"]["risky_tags"]]
+        self.keywords += [("safe", t) for t in rules["labels"]["safe_tags"]]
+        self.automaton = automaton or KeywordAutomaton(term for _, term in self.keywords)
+        self.blocked_topics = set(rules["blocked_topics"])
+        self.allowed_topics = set(rules["allowed_topics"])
+
+    @property
+    def snapshot_id(self) -> str:
+        """PolicyDoc id: "{community}/{vertical}@{version}"."""
+        return f"{self.key}@{self.version}"
+
+    @classmethod
+    def from_source(cls, data: Dict[str, Any]) -> "CompiledPolicy":
+        meta = data.get("meta") or {}
+        elig = data.get("eligibility") or {}
+        labels = data.get("labels") or {}
+        review = data.get("review") or {}
+        key = f"{meta.get('community') or 'default'}/{meta.get('vertical') or 'default'}"
+        age = list(elig.get("age_range") or [])
+        rules = {
+            "blocked_keywords": _terms(elig.get("blocked_keywords")),
+            "blocked_topics": _slugs(elig.get("blocked_topics")),
+            "allowed_topics": _slugs(elig.get("allowed_topics")),
+            "labels": {"risky_tags": _terms(labels.get("risky_tags")), "safe_tags": _terms(labels.get("safe_tags"))},
+            "age_range": [int(a) for a in age[:2]] if len(age) >= 2 else None,
+            "review": {
+                "require_human": bool(review.get("require_human")),
+                "reviewers_min": int(review.get("reviewers_min") or 0),
+            },
+        }
+        return cls(key, str(data.get("version") or ""), rules, _sha1(data))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "compiler_version": COMPILER_VERSION,
+            "id": self.snapshot_id,
+            "key": self.key,
+            "version": self.version,
+            "source_sha1": self.source_sha1,
+            "rules": self.rules,
+            "rule_hashes": self.rule_hashes,
+            "automaton": self.automaton.to_json(),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CompiledPolicy":
+        # Artifacts from another compiler version are rebuilt from their rules
+        automaton = None
+        if data.get("compiler_version") == COMPILER_VERSION and data.get("automaton"):
+            automaton = KeywordAutomaton.from_json(data["automaton"])
+        return cls(data["key"], data["version"], data["rules"], data.get("source_sha1", ""), automaton)
+
+    def changed_groups(self, previous: Optional["CompiledPolicy"]) -> List[str]:
+        """Rule groups whose compiled form differs from `previous` (all of them without one)."""
+        if previous is None or previous.key != self.key:
+            return list(RULE_GROUPS)
+        return [g for g in RULE_GROUPS if self.rule_hashes[g] != previous.rule_hashes.get(g)]
+
+    def _scan(self, rec: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """Blocked-keyword reasons and label tags found in title + description."""
+        text = normalize_text(f"{rec.get('title') or ''} {rec.get('description') or ''}")
+        reasons: List[str] = []
+        labels = set()
+        for idx in sorted(self.automaton.find(text, normalized=True)):
+            kind, term = self.keywords[idx]
+            if kind == "blocked":
+                reasons.append(f"blocked_keyword:{term}")
+            else:
+                labels.add(term)
+        return reasons, sorted(labels)
+
+    @staticmethod
+    def _topics(rec: Dict[str, Any]) -> set:
+        return {str(t).lower() for t in rec.get("topics") or []}
+
+    def _on_topic(self, topics: set) -> Optional[bool]:
+        return bool(topics & self.allowed_topics) if topics and self.allowed_topics else None
+
+    def evaluate(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        """Decision for one record (does not modify it)."""
+        reasons, labels = self._scan(rec)
+        topics = self._topics(rec)
+        reasons.extend(f"blocked_topic:{t}" for t in sorted(topics & self.blocked_topics))
+        return {
+            "policy_id": self.snapshot_id,
+            "eligible": not reasons,
+            "reasons": reasons,
+            "labels": labels,
+            "on_topic": self._on_topic(topics),
+            "age_range": self.rules["age_range"],
+            "review_required": self.rules["review"]["require_human"],
+        }
+
+    def reevaluate(self, rec: Dict[str, Any], prior: Dict[str, Any], groups: Iterable[str]) -> Dict[str, Any]:
+        """Decision for a record recomputing only `groups`, the rest carried over from `prior`.
+
+        `prior` must be this policy's decision under the version the groups
+        were diffed against; the result equals `evaluate(rec)`. The text is
+        only scanned when keyword or label rules changed.
+        """
+        groups = set(groups)
+        old = prior.get("reasons") or []
+        keyword_reasons = [r for r in old if r.startswith("blocked_keyword:")]
+        topic_reasons = [r for r in old if r.startswith("blocked_topic:")]
+        labels = list(prior.get("labels") or [])
+        if groups & {"blocked_keywords", "labels"}:
+            scanned, scanned_labels = self._scan(rec)
+            if "blocked_keywords" in groups:
+                keyword_reasons = scanned
+            if "labels" in groups:
+                labels = scanned_labels
+        topics = self._topics(rec)
+        if "blocked_topics" in groups:
+            topic_reasons = [f"blocked_topic:{t}" for t in sorted(topics & self.blocked_topics)]
+        reasons = keyword_reasons + topic_reasons
+        return {
+            "policy_id": self.snapshot_id,
+            "eligible": not reasons,
+            "reasons": reasons,
+            "labels": labels,
+            "on_topic": self._on_topic(topics) if "allowed_topics" in groups else prior.get("on_topic"),
+            "age_range": self.rules["age_range"],
+            "review_required": self.rules["review"]["require_human"],
+        }
+
+    def apply(self, records: List[Dict[str, Any]]) -> int:
+        """Evaluate a batch, writing `policies[key]` and the overall `eligible` flag; returns ineligible count."""
+        blocked = 0
+        for rec in records:
+            decision = self.evaluate(rec)
+            results = rec.setdefault("policies", {})
+            results[self.key] = decision
+            rec["eligible"] = all(r.get("eligible", True) for r in results.values())
+            blocked += 0 if decision["eligible"] else 1
+        return blocked
+
+
+def compile_policy_file(path: Path) -> CompiledPolicy:
+    return CompiledPolicy.from_source(load_policy_source(path))
+
+
+def load_policy(path: Path) -> CompiledPolicy:
+    """Load a compiled artifact (.json) or compile a policy.yaml on the fly."""
+    if path.suffix.lower() == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return CompiledPolicy.from_json(json.load(f))
+    return compile_policy_file(path)
+
+
+def save_compiled(policy: CompiledPolicy, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(policy.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compiler import ELIGIBILITY_GROUPS, CompiledPolicy
+
+
+# Fields a decision reads; Firestore scans project to these
+SCAN_FIELDS = ["video_id", "title", "description", "topics", "policies", "eligible"]
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_firestore(client: Any, collection: str = "content", page_size: int = 500) -> Iterator[Dict]:
+    """Scan a collection in document-id order, one page per query, reading only SCAN_FIELDS."""
+    last = None
+    while True:
+        q = client.collection(collection).select(SCAN_FIELDS).order_by("__name__").limit(page_size)
+        if last is not None:
+            q = q.start_after(last)
+        docs = list(q.stream())
+        for d in docs:
+            yield d.to_dict() or {}
+        if len(docs) < page_size:
+            return
+        last = docs[-1]
+
+
+class ReevalStats:
+    """Counters and throughput for a re-evaluation run."""
+
+    def __init__(self) -> None:
+        self.scanned = 0
+        self.full = 0  # no usable prior decision: every rule evaluated
+        self.partial = 0  # only changed eligibility rules evaluated
+        self.skipped = 0  # prior decision still valid, nothing evaluated
+        self.to_eligible = 0
+        self.to_ineligible = 0
+        self.started = time.monotonic()
+
+    @property
+    def flipped(self) -> int:
+        return self.to_eligible + self.to_ineligible
+
+    def rate(self) -> float:
+        return self.scanned / max(time.monotonic() - self.started, 1e-9)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        return (
+            f"{self.scanned} docs in {elapsed:.1f}s ({self.rate():.0f} docs/s): "
+            f"{self.full} full, {self.partial} partial, {self.skipped} skipped; "
+            f"{self.flipped} flipped ({self.to_eligible} → eligible, {self.to_ineligible} → ineligible)"
+        )
+
+
+def reevaluate_records(
+    records: Iterable[Dict],
+    policy: CompiledPolicy,
+    previous: Optional[CompiledPolicy] = None,
+    stats: Optional[ReevalStats] = None,
+    progress_every: int = 0,
+    history: Optional[Callable[[str], Optional[CompiledPolicy]]] = None,
+) -> Iterator[Tuple[Dict, Dict]]:
+    """Yield `(record, decision)` for records whose eligibility under `policy` flipped.
+
+    Each record's stored decision is diffed against the version that made
+    it: `previous`, or whatever `history(policy_id)` returns for older
+    snapshot ids (docs that did not flip keep the `policy_id` of an earlier
+    run). Only the rule groups changed since that version are re-checked,
+    and none at all when no eligibility rule changed. Records without a
+    decision from a known version are fully evaluated; a missing decision
+    counts as eligible. Flipped records get an up-to-date decision and
+    overall `eligible` flag written onto them.
+    """
+    stats = stats or ReevalStats()
+    known: Dict[str, Optional[CompiledPolicy]] = {policy.snapshot_id: policy}
+    if previous is not None:
+        known[previous.snapshot_id] = previous
+    # Changed groups per prior snapshot id (None: version unknown, evaluate fully)
+    changes: Dict[str, Optional[Tuple[List[str], List[str]]]] = {}
+
+    def _changes(prior_id: str) -> Optional[Tuple[List[str], List[str]]]:
+        if prior_id not in changes:
+            if prior_id not in known:
+                known[prior_id] = history(prior_id) if history is not None else None
+            base = known[prior_id]
+            if base is None or base.key != policy.key:
+                changes[prior_id] = None
+            else:
+                changed = policy.changed_groups(base)
+                changes[prior_id] = (changed, [g for g in changed if g in ELIGIBILITY_GROUPS])
+        return changes[prior_id]
+
+    for rec in records:
+        stats.scanned += 1
+        if progress_every and stats.scanned % progress_every == 0:
+            print(f"… {stats.scanned} docs scanned ({stats.rate():.0f} docs/s), {stats.flipped} flipped")
+        prior = (rec.get("policies") or {}).get(policy.key)
+        diff = _changes(str(prior.get("policy_id") or "")) if prior else None
+        if prior and diff is not None:
+            changed, eligibility_changed = diff
+            if not eligibility_changed:
+                stats.skipped += 1
+                continue
+            stats.partial += 1
+            if policy.reevaluate(rec, prior, eligibility_changed)["eligible"] == bool(prior.get("eligible", True)):
+                continue
+            decision = policy.reevaluate(rec, prior, changed)
+        else:
+            stats.full += 1
+            decision = policy.evaluate(rec)
+            if decision["eligible"] == bool((prior or {}).get("eligible", True)):
+                continue
+        if decision["eligible"]:
+            stats.to_eligible += 1
+        else:
+            stats.to_ineligible += 1
+        results = rec.setdefault("policies", {})
+        results[policy.key] = decision
+        rec["eligible"] = all(r.get("eligible", True) for r in results.values())
+        yield rec, decision
+
+
+def write_back_payload(rec: Dict, policy_key: str) -> Dict:
+    """Minimal merge payload for a flipped record: its decision and overall flag."""
+    return {"video_id": rec.get("video_id"), "policies": {policy_key: rec["policies"][policy_key]}, "eligible": rec["eligible"]}
+
+
+def write_ndjson(records: Iterable[Dict], path: Path) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
@@ -0,0 +1,275 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api import main
+from apps.api.cursors import encode_cursor, filter_hash
+from services.ingest.lib.store.feeds import FEED_FIELDS
+
+
+def _doc(vid, published_at, **extra):
+    return {
+        "video_id": vid,
+        "published_at": published_at,
+        "updated_at": "2024-02-01T00:00:00Z",
+        "title": f"Video {vid}",
+        "description": "long text",
+        "is_english": True,
+        "thumbnails": {"medium": {"url": f"m/{vid}"}, "high": {"url": f"h/{vid}"}},
+        **extra,
+    }
+
+
+class _Snap:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return None if self._data is None else dict(self._data)
+
+
+class _DocRef:
+    def __init__(self, client, collection, doc_id):
+        self.client, self.collection, self.id = client, collection, doc_id
+
+    async def get(self):
+        self.client.reads.append(f"{self.collection}/{self.id}")
+        return _Snap(self.id, self.client.data.get(self.collection, {}).get(self.id))
+
+
+def _select(d, fields):
+    out = {}
+    for path in fields:
+        src, parts = d, path.split(".")
+        for part in parts:
+            src = src.get(part) if isinstance(src, dict) else None
+        if src is not None:
+            dst = out
+            for part in parts[:-1]:
+                dst = dst.setdefault(part, {})
+            dst[parts[-1]] = src
+    return out
+
+
+class _Query:
+    """Enough of the async Firestore query API for the content endpoints."""
+
+    def __init__(self, client, collection, filters=(), order=(), start=None, count=None, fields=None):
+        self.client, self.collection = client, collection
+        self.filters, self.order, self.start, self.count, self.fields = filters, order, start, count, fields
+
+    def _with(self, **kw):
+        args = dict(filters=self.filters, order=self.order, start=self.start, count=self.count, fields=self.fields)
+        return _Query(self.client, self.collection, **{**args, **kw})
+
+    def where(self, filter):
+        return self._with(filters=(*self.filters, (filter.field_path, filter.op_string, filter.value)))
+
+    def order_by(self, field, direction=None):
+        if self.client.ordered_fails:
+            raise RuntimeError("The query requires an index")
+        return self._with(order=(*self.order, field))
+
+    def start_after(self, values):
+        return self._with(start=values)
+
+    def limit(self, n):
+        return self._with(count=n)
+
+    def select(self, fields):
+        return self._with(fields=list(fields))
+
+    def document(self, doc_id):
+        return _DocRef(self.client, self.collection, doc_id)
+
+    def _match(self, d):
+        for field, op, value in self.filters:
+            if op == "array_contains" and value not in (d.get(field) or []):
+                return False
+            if op == "==" and d.get(field) != value:
+                return False
+        return True
+
+    async def stream(self):
+        self.client.queries.append(self)
+        if self.client.delay:
+            await asyncio.sleep(self.client.delay)
+        rows = [(doc_id, d) for doc_id, d in self.client.data.get(self.collection, {}).items() if self._match(d)]
+        if self.order:
+            rows.sort(key=lambda r: (r[1].get("published_at"), r[0]), reverse=True)
+        if self.start:
+            after, ref = self.start["published_at"], self.start.get("__name__")
+            if ref is not None:
+                rows = [r for r in rows if (r[1]["published_at"], r[0]) < (after, ref.id)]
+            else:
+                rows = [r for r in rows if r[1]["published_at"] < after]
+        for doc_id, d in rows[: self.count]:
+            yield _Snap(doc_id, _select(d, self.fields) if self.fields else d)
+
+
+class _Client:
+    project = "proj"
+
+    def __init__(self, content):
+        self.data = {"content": {f"yt:{d['video_id']}": d for d in content}, "feeds": {}, "meta": {}}
+        self.reads = []
+        self.queries = []
+        self.delay = 0.0
+        self.ordered_fails = False
+
+    def collection(self, name):
+        return _Query(self, name)
+
+
+CONTENT = [
+    _doc("a", "2024-01-05", topics=["duas"], made_for_kids=True),
+    _doc("b", "2024-01-04"),
+    _doc("c", "2024-01-04", duplicate_of="a", channel_id="UCmirror"),
+    _doc("d", "2024-01-04", channel_id="UCmirror"),
+    _doc("e", "2024-01-01"),
+    _doc("f", "2024-01-02", eligible=False),
+]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    client = _Client(CONTENT)
+    monkeypatch.setenv("LUMENS_GCP_PROJECT", "proj")
+    monkeypatch.delenv("LUMENS_API_REPLICA", raising=False)
+    monkeypatch.setattr(main, "_fs_client", lambda project_id: client)
+    monkeypatch.setattr(main, "_cache", main._ResponseCache())
+    monkeypatch.setattr(main, "_replica", None)
+    with TestClient(main.app) as http:
+        yield http, client
+
+
+def _ids(resp):
+    return [it["video_id"] for it in resp.json()["items"]]
+
+
+def test_pages_follow_keyset_cursors_and_reject_foreign_ones(api):
+    http, client = api
+    first = http.get("/v1/content", params={"limit": 2})
+    assert first.status_code == 200
+    assert _ids(first) == ["a", "d"]
+    # Card profile by default, projected in the query itself
+    item = first.json()["items"][0]
+    assert "description" not in item and item["thumb"] == "m/a" and item["thumbnails"] == {"medium": {"url": "m/a"}}
+    assert item["url"] == "https://www.youtube.com/watch?v=a"
+
+    cursor = first.json()["nextCursor"]
+    second = http.get("/v1/content", params={"limit": 2, "cursor": cursor})
+    # c is a re-upload of a and f is blocked by policy: dropped from pages, paging itself is unaffected
+    assert _ids(second) == ["b"]
+    third = http.get("/v1/content", params={"limit": 2, "cursor": second.json()["nextCursor"]})
+    assert _ids(third) == ["e"] and third.json()["nextCursor"] is None
+    # The next page was prefetched while the first one was served
+    assert main._cache.counters["prefetches"] >= 1
+
+    foreign = http.get("/v1/content", params={"limit": 2, "cursor": cursor, "madeForKids": "true"})
+    assert foreign.status_code == 400 and foreign.headers["cache-control"] == "no-store"
+    legacy = http.get("/v1/content", params={"limit": 10, "cursor": "2024-01-04"})
+    assert _ids(legacy) == ["e"]
+
+
+def test_channel_pages_keep_their_reuploads(api):
+    http, _ = api
+    assert _ids(http.get("/v1/content", params={"channelId": "UCmirror"})) == ["d", "c"]
+
+
+def test_etag_and_not_modified(api):
+    http, _ = api
+    resp = http.get("/v1/content")
+    etag = resp.headers["etag"]
+    assert resp.headers["cache-control"] == main.CACHE_CONTROL["content"]
+    again = http.get("/v1/content", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert http.get("/v1/content", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    # Each projection is its own representation
+    assert http.get("/v1/content", params={"fields": "full"}).headers["etag"] != etag
+
+    cats = http.get("/v1/categories")
+    assert http.get("/v1/categories", headers={"If-None-Match": cats.headers["etag"]}).status_code == 304
+
+
+def test_fields_projection(api):
+    http, client = api
+    full = http.get("/v1/content", params={"fields": "full", "limit": 1}).json()["items"][0]
+    assert full["description"] == "long text"
+    custom = http.get("/v1/content", params={"fields": "title,thumb", "limit": 1}).json()["items"][0]
+    assert set(custom) == {"video_id", "published_at", "updated_at", "title", "thumbnails", "thumb", "url", "embed"}
+    assert http.get("/v1/content", params={"fields": "title,bad-field"}).status_code == 400
+
+    assert main._parse_fields(None) == sorted(FEED_FIELDS)
+    assert main._parse_fields("full") is None
+    assert main._project([{"a": {"b": 1, "c": 2}, "d": 3}], ["a.b", "x.y"]) == [{"a": {"b": 1}}]
+
+
+def test_lists_hide_duplicates_and_ineligible_records():
+    items = [
+        {"video_id": "a", "eligible": True},
+        {"video_id": "c", "duplicate_of": "a"},
+        {"video_id": "f", "eligible": False},
+        {"video_id": "g"},
+    ]
+    assert main._collapse_duplicates(items)[1:] == items[2:]
+    assert [it["video_id"] for it in main._visible(items)] == ["a", "g"]
+
+
+def test_feed_snapshot_serves_card_pages_only(api):
+    http, client = api
+    items = [main._project([d], FEED_FIELDS)[0] for d in CONTENT[:3]]
+    client.data["feeds"]["any__any__all"] = {"items": items, "fields": FEED_FIELDS, "size": 3, "next_cursor": "x"}
+    snap = http.get("/v1/content", params={"limit": 3})
+    assert _ids(snap) == ["a", "b"] and client.reads == ["feeds/any__any__all"]
+    # Only the prefetch of the next page ran a query
+    assert all(q.start for q in client.queries)
+    assert snap.json()["nextCursor"] == encode_cursor(items[-1], filter_hash(None, None, None, None))
+    # Whole documents are not in the snapshot, so they come from the live query
+    client.queries.clear()
+    http.get("/v1/content", params={"limit": 3, "fields": "full"})
+    # (the earlier page's prefetch may also land here; it always has a start position)
+    assert any(q.start is None for q in client.queries)
+
+
+def test_topic_coverage_and_fallback(api):
+    http, client = api
+    # No coverage doc yet: the topic is queried normally
+    assert _ids(http.get("/v1/content", params={"topic": "duas"})) == ["a"]
+    client.data["meta"]["topic_coverage"] = {"topics": {"duas": 1}}
+    main._cache = main._ResponseCache()
+    ramadan = http.get("/v1/content", params={"topic": "ramadan", "limit": 2}).json()
+    assert ramadan["topicFallback"] is True and [it["video_id"] for it in ramadan["items"]] == ["a", "d"]
+
+    # Paging past the last topic item ends the list instead of restarting on latest items
+    first = http.get("/v1/content", params={"topic": "duas", "limit": 1}).json()
+    assert [it["video_id"] for it in first["items"]] == ["a"] and first["topicFallback"] is False
+    cursor = encode_cursor({"video_id": "a", "published_at": "2024-01-05"}, filter_hash(None, None, None, "duas"))
+    end = http.get("/v1/content", params={"topic": "duas", "limit": 1, "cursor": cursor}).json()
+    assert end["items"] == [] and end["topicFallback"] is False and end["nextCursor"] is None
+
+
+def test_unordered_fallback_and_timeout(api, monkeypatch):
+    http, client = api
+    client.ordered_fails = True
+    resp = http.get("/v1/content", params={"limit": 10})
+    assert resp.status_code == 200 and sorted(_ids(resp)) == ["a", "b", "d", "e"]
+
+    main._cache = main._ResponseCache()
+    client.ordered_fails = False
+    client.delay = 0.2
+    monkeypatch.setattr(main, "QUERY_TIMEOUT", 0.05)
+    resp = http.get("/v1/content")
+    assert resp.status_code == 504 and resp.headers["cache-control"] == "no-store"
+    assert http.get("/").status_code == 504
+
+
+def test_home_renders_cards(api):
+    http, _ = api
+    resp = http.get("/", params={"lang": "en"})
+    assert resp.status_code == 200
+    assert "Video a" in resp.text and "Video c" not in resp.text and "Video f" not in resp.text
+    assert http.get("/", headers={"If-None-Match": resp.headers["etag"]}).status_code == 304
@@ -0,0 +1,37 @@
+import base64
+import json
+
+import pytest
+
+from apps.api.cursors import InvalidCursor, decode_cursor, encode_cursor, filter_hash, next_page_cursor
+
+
+def test_cursor_round_trip_is_bound_to_filters():
+    filters = filter_hash("UC1", True, "EN", "duas")
+    # Language is case-insensitive; other filters are not
+    assert filters == filter_hash("UC1", True, "en", "duas")
+    assert filters != filter_hash("UC1", None, "en", "duas")
+
+    cursor = encode_cursor({"video_id": "v1", "published_at": "2024-01-02T00:00:00Z"}, filters)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, filters) == ("2024-01-02T00:00:00Z", "yt:v1")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, filter_hash("UC2", True, "en", "duas"))
+    assert decode_cursor(None, filters) is None
+
+
+def test_legacy_and_malformed_cursors():
+    filters = filter_hash(None, None, None, None)
+    # Bare published_at cursors from older clients resume by time only
+    assert decode_cursor("2024-01-02T00:00:00Z", filters) == ("2024-01-02T00:00:00Z", None)
+    # A JSON object without a position is not a usable cursor
+    empty = base64.urlsafe_b64encode(json.dumps({"f": filters}).encode()).decode().rstrip("=")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(empty, filters)
+
+
+def test_next_page_cursor_only_when_more_docs_were_fetched():
+    filters = filter_hash(None, None, None, None)
+    docs = [{"video_id": f"v{i}", "published_at": f"2024-01-0{9 - i}"} for i in range(3)]
+    assert next_page_cursor(docs, 3, filters) is None
+    assert decode_cursor(next_page_cursor(docs, 2, filters), filters) == ("2024-01-08", "yt:v1")
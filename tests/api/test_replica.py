@@ -0,0 +1,124 @@
+import asyncio
+import json
+from pathlib import Path
+
+from apps.api.cursors import decode_cursor, filter_hash
+from apps.api.replica import Replica
+
+
+def _doc(vid, published_at, updated_at="2024-02-01T00:00:00Z", **extra):
+    return {"video_id": vid, "published_at": published_at, "updated_at": updated_at, **extra}
+
+
+class _Source:
+    """Stands in for the Firestore source: a dict of docs plus the stamps delta pulls asked for."""
+
+    def __init__(self, docs):
+        self.docs = {f"yt:{d['video_id']}": d for d in docs}
+        self.asked = []
+
+    async def scan(self):
+        for doc_id, d in list(self.docs.items()):
+            yield doc_id, d
+
+    async def changes_since(self, stamp):
+        self.asked.append(stamp)
+        for doc_id, d in list(self.docs.items()):
+            if d["updated_at"] >= stamp:
+                yield doc_id, d
+
+
+def test_bootstrap_from_ndjson_then_delta_pull_with_lag(tmp_path: Path):
+    snapshot = tmp_path / "content.ndjson"
+    recs = [
+        _doc("a", "2024-01-01", "2024-02-01T00:00:10Z", topics=["duas"]),
+        _doc("b", "2024-01-02", "2024-02-01T00:00:20Z"),
+        {"title": "no id"},
+    ]
+    snapshot.write_text("".join(json.dumps(r) + "\n" for r in recs))
+    source = _Source([])
+    replica = Replica(source, lag=30)
+    assert replica.load_ndjson(str(snapshot)) == 2
+    assert replica.ready and replica.watermark == "2024-02-01T00:00:20Z"
+    assert replica.has_topic("duas")
+
+    # A batch stamped before the watermark but committed after it is still picked up
+    source.docs = {
+        "yt:a": _doc("a", "2024-01-01", "2024-02-01T00:00:05Z", topics=["seerah"]),
+        "yt:c": _doc("c", "2024-01-03", "2024-01-31T00:00:00Z"),
+    }
+    assert asyncio.run(replica.pull_changes()) == 1
+    assert source.asked == ["2024-01-31T23:59:50Z"]
+    # Topic side table is replaced, not appended to
+    assert not replica.has_topic("duas") and replica.has_topic("seerah")
+    assert replica.stats()["docs"] == 2
+    assert replica.stats()["watermark"] == "2024-02-01T00:00:20Z"
+
+
+def test_full_scan_bootstraps_and_rescan_drops_deleted_docs():
+    source = _Source([_doc("a", "2024-01-01", topics=["duas"]), _doc("b", "2024-01-02")])
+    replica = Replica(source)
+    assert not replica.ready
+    # Without a watermark a pull is a full scan
+    assert asyncio.run(replica.pull_changes()) == 2
+    assert replica.ready and replica.stats()["scans"] == 1
+
+    del source.docs["yt:a"]
+    assert asyncio.run(replica.full_scan()) == 1
+    assert [d["video_id"] for d in replica.page(10)["items"]] == ["b"]
+    assert not replica.has_topic("duas")
+
+
+def _catalog():
+    return [
+        _doc("a", "2024-01-05", channel_id="UC1", made_for_kids=True, is_english=True, language="en", topics=["duas"]),
+        _doc("b", "2024-01-04", channel_id="UC2", made_for_kids=False, is_english=True, language="en-GB"),
+        _doc("c", "2024-01-04", channel_id="UC1", made_for_kids=True, is_english=False, language="ar", topics=["duas"]),
+        _doc("d", "2024-01-04", channel_id="UC2", made_for_kids=True, is_english=True),
+        _doc("e", "2024-01-01", channel_id="UC1", is_english=False, language="ar"),
+    ]
+
+
+def test_page_filters_match_live_query():
+    replica = Replica(_Source(_catalog()))
+    asyncio.run(replica.full_scan())
+
+    def ids(**kw):
+        return [d["video_id"] for d in replica.page(10, **kw)["items"]]
+
+    # Newest first; equal published_at is ordered by doc id descending
+    assert ids() == ["a", "d", "c", "b", "e"]
+    assert ids(channel_id="UC1") == ["a", "c", "e"]
+    assert ids(made_for_kids=True) == ["a", "d", "c"]
+    assert ids(made_for_kids=False) == ["b"]
+    # English uses the derived is_english flag; other languages match exactly
+    assert ids(language="EN") == ["a", "d", "b"]
+    assert ids(language="ar") == ["c", "e"]
+    assert ids(topic="duas", made_for_kids=True) == ["a", "c"]
+
+
+def test_page_keyset_cursor_and_topic_fallback():
+    replica = Replica(_Source(_catalog()))
+    asyncio.run(replica.full_scan())
+    filters = filter_hash(None, None, None, None)
+
+    seen = []
+    after = None
+    while True:
+        page = replica.page(2, after=after)
+        seen += [d["video_id"] for d in page["items"]]
+        assert page["topicFallback"] is False
+        if not page["nextCursor"]:
+            break
+        after = decode_cursor(page["nextCursor"], filters)
+    # Items sharing a timestamp across a page boundary are neither skipped nor repeated
+    assert seen == ["a", "d", "c", "b", "e"]
+
+    # Legacy cursors (bare published_at) resume strictly before that time
+    assert [d["video_id"] for d in replica.page(10, after=("2024-01-04", None))["items"]] == ["e"]
+
+    fallback = replica.page(2, topic="ramadan")
+    assert fallback["topicFallback"] is True
+    assert [d["video_id"] for d in fallback["items"]] == ["a", "d"]
+    # The cursor still belongs to the requested filters
+    assert decode_cursor(fallback["nextCursor"], filter_hash(None, None, None, "ramadan")) == ("2024-01-04", "yt:d")
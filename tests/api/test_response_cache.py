@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from apps.api.main import _ResponseCache
+
+
+class _Counter:
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("query failed")
+        return self.calls
+
+
+def test_fresh_entries_are_hits_and_expired_ones_recompute():
+    async def _run():
+        fresh = _ResponseCache(ttl=60, stale=0)
+        compute = _Counter()
+        assert await fresh.get("k", compute) == 1
+        assert await fresh.get("k", compute) == 1
+        assert compute.calls == 1 and fresh.counters["hits"] == 1
+
+        expired = _ResponseCache(ttl=0, stale=0)
+        compute = _Counter()
+        await expired.get("k", compute)
+        assert await expired.get("k", compute) == 2
+        assert expired.counters["misses"] == 2
+
+    asyncio.run(_run())
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    async def _run():
+        cache = _ResponseCache(ttl=0, stale=60)
+        compute = _Counter(delay=0.01)
+        assert await cache.get("k", compute) == 1
+        # Stale: old value now, a single background refresh
+        assert await cache.get("k", compute) == 1
+        assert await cache.get("k", compute) == 1
+        assert cache.counters["stale_hits"] == 2 and cache.counters["refreshes"] == 1
+        await asyncio.sleep(0.05)
+        assert compute.calls == 2
+        assert await cache.get("k", compute) == 2
+
+    asyncio.run(_run())
+
+
+def test_concurrent_misses_share_one_computation():
+    async def _run():
+        cache = _ResponseCache()
+        compute = _Counter(delay=0.01)
+        results = await asyncio.gather(*(cache.get("k", compute) for _ in range(5)))
+        assert results == [1] * 5 and compute.calls == 1
+        assert cache.counters["misses"] == 1 and cache.counters["coalesced"] == 4
+        assert cache.stats()["hit_rate_pct"] == 80
+
+    asyncio.run(_run())
+
+
+def test_failures_are_not_cached_and_prefetch_warms_keys():
+    async def _run():
+        cache = _ResponseCache(max_entries=2)
+        failing = _Counter(fail=True)
+        with pytest.raises(RuntimeError):
+            await cache.get("k", failing)
+        with pytest.raises(RuntimeError):
+            await cache.get("k", failing)
+        assert failing.calls == 2 and cache.stats()["entries"] == 0
+
+        compute = _Counter()
+        cache.prefetch("next", compute)
+        cache.prefetch("next", compute)
+        await asyncio.sleep(0)
+        assert cache.counters["prefetches"] == 1
+        assert await cache.get("next", compute) == 1 and cache.counters["hits"] == 1
+        # Background failures are counted, not raised
+        cache.prefetch("bad", failing)
+        await asyncio.sleep(0)
+        assert cache.counters["background_errors"] == 1
+
+        await cache.get("a", _Counter())
+        await cache.get("b", _Counter())
+        assert cache.stats()["entries"] == 2 and cache.counters["evictions"] == 1
+
+    asyncio.run(_run())
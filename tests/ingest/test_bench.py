@@ -0,0 +1,51 @@
+import json
+
+from services.ingest.bench import run
+from services.ingest.bench.fake_youtube import FakeCatalog, FakeYouTubeApi
+
+
+def _get(api, path, etag=None, **params):
+    status, headers, body = api.handle(path, {k: str(v) for k, v in params.items()}, etag)
+    return status, headers, (json.loads(body) if body else None)
+
+
+def test_fake_api_pages_etags_and_quota():
+    catalog = FakeCatalog.synthetic(2, videos_per_channel=7)
+    api = FakeYouTubeApi(catalog, quota=4)
+    uploads = catalog.channels[0].uploads
+
+    status, headers, page = _get(api, "/playlistItems", playlistId=uploads, part="snippet", maxResults=5)
+    assert status == 200 and len(page["items"]) == 5 and page["nextPageToken"] == "p5"
+    _, _, rest = _get(api, "/playlistItems", playlistId=uploads, part="snippet", maxResults=5, pageToken="p5")
+    assert len(rest["items"]) == 2 and "nextPageToken" not in rest
+
+    status, _, _ = _get(api, "/playlistItems", headers["ETag"], playlistId=uploads, part="snippet", maxResults=5)
+    assert status == 304
+    assert _get(api, "/playlistItems", playlistId="UUnope", part="snippet")[0] == 404
+
+    # 4 units spent; the next call is over quota
+    status, _, err = _get(api, "/videos", id=page["items"][0]["snippet"]["resourceId"]["videoId"], part="snippet")
+    assert status == 403 and err["error"]["errors"][0]["reason"] == "quotaExceeded"
+    stats = api.stats()
+    assert (stats["calls"], stats["units"], stats["not_modified"], stats["errors"]) == (5, 4, 1, 2)
+
+
+def test_bench_never_targets_firestore(tmp_path, monkeypatch):
+    monkeypatch.setenv("LUMENS_GCP_PROJECT", "prod")
+    monkeypatch.setenv("LUMENS_POLICIES", "policies/x/policy.yaml")
+    cmd = run._ingest_command(tmp_path / "channels.csv", tmp_path, 5, 2, ["--firestore-project", "prod"])
+    # The last --firestore-project wins in argparse; empty means no Firestore sink
+    assert cmd[-2:] == ["--firestore-project", ""]
+    env = run._child_env("http://127.0.0.1:1")
+    # Present but empty, so the CLI's .env loading cannot fill them back in
+    assert env["LUMENS_GCP_PROJECT"] == "" and env["LUMENS_POLICIES"] == ""
+
+
+def test_bench_runs_ingest_against_fake_server():
+    cold, warm = run.run_size(3, videos_per_channel=8, limit=5, concurrency=2, latency_ms=0, passes=2, extra_args=[])
+    assert (cold["pass"], warm["pass"]) == ("cold", "warm1")
+    assert cold["records"] > 0 and cold["calls"] > 0 and cold["units"] >= cold["calls"]
+    # Warm runs only pick up the new uploads
+    assert warm["records"] == 3 * 2
+    assert run.check_baseline([cold], [cold], max_slowdown=0) == []
+    assert run.check_baseline([{**cold, "calls": cold["calls"] + 1}], [cold], max_slowdown=0)
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+from services.ingest.lib import youtube
+from services.ingest.lib.cache import ResponseCache
+from services.ingest.lib.transport import HttpResponse, TransportStats
+
+
+class _EtagTransport:
+    """Serves a fixed body per URL path and honours If-None-Match."""
+
+    def __init__(self):
+        self.stats = TransportStats()
+        self.etag = '"v1"'
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=30.0):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if headers.get("If-None-Match") == self.etag:
+            return HttpResponse(304, {"etag": self.etag}, b"")
+        body = json.dumps({"etag": self.etag, "items": [{"id": self.etag}]}).encode()
+        return HttpResponse(200, {"etag": self.etag}, body)
+
+
+def test_cache_key_ignores_api_key_and_param_order():
+    a = ResponseCache.make_key("/videos", {"id": "x", "part": "snippet", "key": "K1"})
+    b = ResponseCache.make_key("/videos", {"part": "snippet", "key": "K2", "id": "x"})
+    assert a == b
+    assert "K1" not in a
+
+
+def test_http_get_json_revalidates_with_etag(tmp_path: Path):
+    tr = _EtagTransport()
+    cache = ResponseCache(tmp_path / "http.sqlite")
+    prev_tr = youtube.set_transport(tr)
+    prev_cache = youtube.set_response_cache(cache)
+    try:
+        first = youtube.http_get_json("/playlistItems", {"playlistId": "UU1"}, "KEY")
+        second = youtube.http_get_json("/playlistItems", {"playlistId": "UU1"}, "KEY")
+        assert first == second
+        assert "If-None-Match" not in tr.requests[0][1]
+        assert tr.requests[1][1]["If-None-Match"] == '"v1"'
+        tr.etag = '"v2"'
+        third = youtube.http_get_json("/playlistItems", {"playlistId": "UU1"}, "KEY")
+        assert third["items"][0]["id"] == '"v2"'
+    finally:
+        youtube.set_transport(prev_tr)
+        youtube.set_response_cache(prev_cache)
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["refreshed"]) == (1, 1, 1)
+    cache.close()
+
+    # Entries persist across process restarts
+    reopened = ResponseCache(tmp_path / "http.sqlite")
+    assert reopened.lookup(ResponseCache.make_key("/playlistItems", {"playlistId": "UU1"})).etag == '"v2"'
+    reopened.close()
+
+
+def test_cache_evicts_by_size_and_age(tmp_path: Path):
+    cache = ResponseCache(tmp_path / "http.sqlite", max_entries=2)
+    for i in range(4):
+        cache.store(f"k{i}", "e", "x" * 10)
+    cache.evict()
+    assert cache.lookup("k0") is None
+    assert cache.lookup("k3") is not None
+
+    cache.max_age = -1
+    assert cache.lookup("k3") is None
+    cache.close()
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from services.ingest import cli
+
+
+CSV = """source,source_ref,name,notes
+youtube,https://www.youtube.com/channel/UCaaaaaaaaaaaaaaaaaaaaaa,A,
+youtube,https://www.youtube.com/channel/UCbbbbbbbbbbbbbbbbbbbbbb,B,
+youtube,https://www.youtube.com/playlist?list=PLshared,Shared,
+"""
+
+VIDEOS = {
+    "UCaaaaaaaaaaaaaaaaaaaaaa": ["a3", "a2", "a1"],
+    "UCbbbbbbbbbbbbbbbbbbbbbb": ["b2", "shared", "b1"],
+    "PLshared": ["shared", "p1"],
+}
+
+
+def _rec(vid: str, cid: str):
+    return {"video_id": vid, "channel_id": cid, "title": vid, "published_at": "2024-01-01T00:00:00Z"}
+
+
+def _patch_fetchers(monkeypatch):
+    def _channel(channel_id, api_key, limit, *args):
+        for vid in VIDEOS[channel_id][:limit]:
+            yield _rec(vid, channel_id)
+
+    def _playlist(playlist_id, api_key, limit):
+        for vid in VIDEOS[playlist_id][:limit]:
+            yield _rec(vid, "UCplaylist")
+
+    monkeypatch.setattr(cli, "iter_channel_videos", _channel)
+    monkeypatch.setattr(cli, "iter_playlist_videos", _playlist)
+
+
+def _run(tmp_path: Path, concurrency: int, state=None):
+    csv_path = tmp_path / "channels.csv"
+    csv_path.write_text(CSV)
+    state_path = tmp_path / f"state_{concurrency}.json"
+    if state is not None:
+        state_path.write_text(json.dumps(state))
+    out = tmp_path / f"out_{concurrency}" / "videos"
+    rc = cli.run_ingest(csv_path, out, 10, "key", False, "any", state_path=state_path, concurrency=concurrency)
+    assert rc == 0
+    ids = [json.loads(line)["video_id"] for line in out.with_suffix(".ndjson").read_text().splitlines()]
+    saved = json.loads(state_path.read_text())
+    assert saved["schema_version"] == 2
+    return ids, {k: v["recent_ids"] for k, v in saved["sources"].items()}
+
+
+def test_concurrent_fetch_matches_serial(tmp_path: Path, monkeypatch):
+    _patch_fetchers(monkeypatch)
+    serial_ids, serial_state = _run(tmp_path, 1)
+    parallel_ids, parallel_state = _run(tmp_path, 4)
+    assert serial_ids == ["a3", "a2", "a1", "b2", "shared", "b1", "p1"]
+    assert parallel_ids == serial_ids
+    assert parallel_state == serial_state == {
+        "UCaaaaaaaaaaaaaaaaaaaaaa": ["a3", "a2", "a1"],
+        "UCbbbbbbbbbbbbbbbbbbbbbb": ["b2", "shared", "b1"],
+        "PLshared": ["shared", "p1"],
+    }
+
+
+def test_concurrent_fetch_respects_legacy_state(tmp_path: Path, monkeypatch):
+    _patch_fetchers(monkeypatch)
+    # Flat v1 state {channel_id: last_video_id} is migrated on load
+    ids, state = _run(tmp_path, 3, state={"UCaaaaaaaaaaaaaaaaaaaaaa": "a2"})
+    assert ids[:1] == ["a3"]
+    assert "a1" not in ids
+    assert state["UCaaaaaaaaaaaaaaaaaaaaaa"] == ["a3", "a2"]
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from services.ingest.lib import enrich
+from services.ingest.lib.enrich_cache import EnrichmentCache
+
+
+def _item(vid, views):
+    return {
+        "id": vid,
+        "contentDetails": {"duration": "PT1M", "definition": "hd"},
+        "statistics": {"viewCount": str(views)},
+        "snippet": {"defaultAudioLanguage": "en", "title": "t", "tags": ["x"]},
+        "status": {"madeForKids": True, "privacyStatus": "public"},
+    }
+
+
+def test_fetch_videos_info_only_requests_new_or_stale(tmp_path: Path, monkeypatch):
+    calls = []
+    views = {"a": 1, "b": 2, "c": 3}
+
+    def _yt_api(path, params, api_key):
+        ids = params["id"].split(",")
+        calls.append((params["part"], ids))
+        return {"items": [_item(v, views[v]) for v in ids]}
+
+    monkeypatch.setattr(enrich, "yt_api", _yt_api)
+    cache = EnrichmentCache(tmp_path / "enrich.sqlite", stats_ttl=3600)
+    previous = enrich.set_enrichment_cache(cache)
+    try:
+        first = enrich.fetch_videos_info(["a", "b"], "key")
+        assert calls == [("contentDetails,statistics,snippet,status", ["a", "b"])]
+        assert first["a"]["statistics"]["viewCount"] == "1"
+
+        calls.clear()
+        second = enrich.fetch_videos_info(["a", "b"], "key")
+        assert calls == []
+        assert second["b"]["contentDetails"]["duration"] == "PT1M"
+        assert second["b"]["status"] == {"madeForKids": True}
+
+        cache.stats_ttl = -1
+        views["a"] = 10
+        third = enrich.fetch_videos_info(["a"], "key")
+        assert calls == [("statistics", ["a"])]
+        assert third["a"]["statistics"]["viewCount"] == "10"
+        assert third["a"]["snippet"]["defaultAudioLanguage"] == "en"
+
+        # A batch that needs a full fetch anyway takes its stale ids along
+        calls.clear()
+        views.update(a=11, c=3)
+        fourth = enrich.fetch_videos_info(["a", "c"], "key")
+        assert calls == [("contentDetails,statistics,snippet,status", ["a", "c"])]
+        assert fourth["a"]["statistics"]["viewCount"] == "11" and fourth["c"]["statistics"]["viewCount"] == "3"
+    finally:
+        enrich.set_enrichment_cache(previous)
+    stats = cache.stats()
+    assert (stats["fresh"], stats["stale"], stats["missing"]) == (2, 2, 3)
+    cache.close()
+
+
+def test_fetch_videos_info_parallel_batches(monkeypatch):
+    seen = []
+
+    def _yt_api(path, params, api_key):
+        ids = params["id"].split(",")
+        seen.append(len(ids))
+        return {"items": [{"id": v} for v in ids]}
+
+    monkeypatch.setattr(enrich, "yt_api", _yt_api)
+    ids = [f"v{i}" for i in range(180)]
+    out = enrich.fetch_videos_info(ids, "key", max_in_flight=3)
+    assert sorted(seen) == [30, 50, 50, 50]
+    assert set(out) == set(ids)
@@ -0,0 +1,91 @@
+from services.ingest.lib.store import feeds
+from services.ingest.lib.store.feeds import FeedSpec, feed_key, feed_specs, write_feed_snapshots
+
+
+RECORDS = [
+    {
+        "video_id": f"v{i}",
+        "published_at": f"2024-01-{i + 1:02d}",
+        "is_english": i % 2 == 0,
+        "made_for_kids": True,
+        "description": "long text",
+        "thumbnails": {"default": {"url": f"d{i}"}, "high": {"url": f"h{i}"}},
+    }
+    for i in range(6)
+]
+
+
+def _fake_query(client, collection, spec, limit):
+    def _match(rec):
+        for field, op, value in spec.filters():
+            if op == "array_contains":
+                if value not in (rec.get(field) or []):
+                    return False
+            elif rec.get(field) != value:
+                return False
+        return True
+
+    hits = sorted((r for r in RECORDS if _match(r)), key=lambda r: r["published_at"], reverse=True)
+    return hits[:limit]
+
+
+class _Ref:
+    def __init__(self, client, path):
+        self.client, self.path = client, path
+
+    def set(self, data):
+        if self.path in self.client.fail:
+            raise RuntimeError("request payload size exceeds the limit")
+        self.client.docs[self.path] = data
+
+
+class _Client:
+    def __init__(self, fail=()):
+        self.docs = {}
+        self.fail = set(fail)
+
+    def collection(self, name):
+        self.current = name
+        return self
+
+    def document(self, doc_id):
+        return _Ref(self, f"{self.current}/{doc_id}")
+
+
+def test_feed_keys_and_specs():
+    assert feed_key(None, None, None) == "any__any__all"
+    assert feed_key("EN", True, "duas") == "en__kids__duas"
+    specs = feed_specs(["duas"])
+    assert len(specs) == 12
+    assert all(s.topic is None for s in specs[:6])
+
+
+def test_snapshots_hold_first_page_and_topic_fallback(monkeypatch):
+    monkeypatch.setattr(feeds, "_query_feed", _fake_query)
+    client = _Client(fail=["feeds/any__kids__duas"])
+    n = write_feed_snapshots(client, size=2, specs=feed_specs(["duas"]))
+    # One failing doc does not take the other feeds down with it
+    assert n == 11 and "feeds/any__kids__duas" not in client.docs
+
+    english = client.docs["feeds/en__any__all"]
+    assert [r["video_id"] for r in english["items"]] == ["v4", "v2"]
+    # Items are slim cards: no description, only the card thumbnail sizes
+    assert english["items"][0] == {"video_id": "v4", "published_at": "2024-01-05", "thumbnails": {"default": {"url": "d4"}}}
+    assert english["fields"] == feeds.FEED_FIELDS
+    assert english["next_cursor"] == "2024-01-03"
+    assert english["fallback"] is False
+
+    # No record carries a topic yet, so topic feeds mirror the topic-less feed
+    duas = client.docs["feeds/en__kids__duas"]
+    assert duas["fallback"] is True
+    assert [r["video_id"] for r in duas["items"]] == ["v4", "v2"]
+
+    assert client.docs["feeds/any__general__all"] == {
+        "items": [],
+        "fields": feeds.FEED_FIELDS,
+        "next_cursor": None,
+        "fallback": False,
+        "size": 2,
+        "updated_at": english["updated_at"],
+    }
+    assert FeedSpec("en", True, "duas").key == "en__kids__duas"
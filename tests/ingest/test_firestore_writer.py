@@ -0,0 +1,157 @@
+import threading
+from pathlib import Path
+
+from services.ingest.lib.store.fingerprints import FingerprintStore
+from services.ingest.lib.store import firestore_writer
+from services.ingest.lib.store.firestore_writer import FirestoreContentWriter
+
+
+class Aborted(Exception):
+    """Stands in for google.api_core.exceptions.Aborted (write contention)."""
+
+
+class _Batch:
+    def __init__(self, client):
+        self.client = client
+        self.docs = []
+
+    def set(self, ref, data, merge=False):
+        self.docs.append(ref)
+        self.client.data[ref] = data
+
+    def commit(self):
+        with self.client.lock:
+            if self.client.fail_next:
+                self.client.fail_next -= 1
+                raise self.client.error
+            self.client.committed.append(list(self.docs))
+
+
+class _Client:
+    project = "proj"
+
+    def __init__(self, fail_next=0, error=None):
+        self.lock = threading.Lock()
+        self.committed = []
+        self.data = {}
+        self.fail_next = fail_next
+        self.error = error or Aborted("contention")
+
+    def batch(self):
+        return _Batch(self)
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return doc_id
+
+
+def _records(n, views=0):
+    return [{"video_id": f"v{i}", "title": f"t{i}", "views": views} for i in range(n)]
+
+
+def test_skips_unchanged_docs(tmp_path: Path):
+    store = FingerprintStore(tmp_path / "fp.sqlite")
+    first = FirestoreContentWriter(_Client(), fingerprints=store)
+    for rec in _records(900):
+        first.add(rec)
+    assert first.close() == 900
+
+    client = _Client()
+    second = FirestoreContentWriter(client, fingerprints=store)
+    recs = _records(900)
+    recs[5]["views"] = 10  # the only change
+    for rec in recs:
+        second.add(rec)
+    second.close()
+    assert second.counts() == {"written": 1, "skipped": 899, "failed": 0, "retries": 0}
+    assert client.committed == [["yt:v5"]]
+    assert client.data["yt:v5"]["updated_at"].endswith("Z")
+
+
+def test_parallel_commits_cover_every_doc():
+    client = _Client()
+    writer = FirestoreContentWriter(client, max_in_flight=4)
+    for rec in _records(2000):
+        writer.add(rec)
+    assert writer.close() == 2000
+    assert sorted(len(b) for b in client.committed) == [400] * 5
+    assert len({d for b in client.committed for d in b}) == 2000
+
+
+def test_retries_contention_then_counts_failures(tmp_path: Path):
+    client = _Client(fail_next=2)
+    writer = FirestoreContentWriter(client, max_in_flight=1, retry_delay=0)
+    for rec in _records(10):
+        writer.add(rec)
+    writer.close()
+    assert writer.counts() == {"written": 10, "skipped": 0, "failed": 0, "retries": 2}
+
+    store = FingerprintStore(tmp_path / "fp.sqlite")
+    broken = _Client(fail_next=1, error=ValueError("bad doc"))
+    writer = FirestoreContentWriter(broken, fingerprints=store, max_in_flight=1, retry_delay=0)
+    for rec in _records(10):
+        writer.add(rec)
+    writer.close()
+    assert writer.counts()["failed"] == 10
+    # Failed docs were not fingerprinted, so the next run writes them
+    retry = FirestoreContentWriter(_Client(), fingerprints=store, max_in_flight=1)
+    for rec in _records(10):
+        retry.add(rec)
+    assert retry.close() == 10
+
+
+def test_close_recounts_topics_of_written_docs(monkeypatch):
+    recounted = []
+    monkeypatch.setattr(
+        firestore_writer, "update_topic_coverage", lambda client, coll, topics: recounted.append(sorted(topics))
+    )
+    writer = FirestoreContentWriter(_Client(), max_in_flight=1)
+    writer.add({"video_id": "a", "topics": ["duas", "ramadan"]})
+    writer.add({"video_id": "b", "topics": ["duas"]})
+    writer.add({"video_id": "c"})
+    writer.close()
+    assert recounted == [["duas", "ramadan"]]
+
+    # Docs written without topics may have lost some: the index is still recounted
+    untagged = FirestoreContentWriter(_Client(), max_in_flight=1)
+    untagged.add({"video_id": "d"})
+    untagged.close()
+    assert recounted == [["duas", "ramadan"], []]
+
+    FirestoreContentWriter(_Client(), max_in_flight=1).close()
+    assert len(recounted) == 2
+
+
+class _Coverage:
+    """Just enough of Firestore for `update_topic_coverage`: one coverage doc and topic counts."""
+
+    def __init__(self, docs, coverage):
+        self.docs, self.coverage, self.counted = docs, coverage, []
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return self
+
+    def get(self):
+        return type("Snap", (), {"exists": True, "to_dict": lambda _: dict(self.coverage)})()
+
+    def set(self, data, merge=False):
+        self.coverage = data
+
+    def where(self, filter):
+        topic = filter.value
+        self.counted.append(topic)
+        n = sum(topic in d["topics"] for d in self.docs)
+        result = [[type("Agg", (), {"value": n})()]]
+        return type("Query", (), {"count": lambda _: type("Count", (), {"get": lambda _: result})()})()
+
+
+def test_topic_coverage_recount_drops_removed_topics():
+    client = _Coverage([{"topics": ["duas"]}, {"topics": ["seerah"]}], {"topics": {"duas": 2, "ramadan": 1}, "collection": "content"})
+    assert firestore_writer.update_topic_coverage(client, "content", ["seerah"]) == {"duas": 1, "seerah": 1}
+    assert client.counted == ["duas", "ramadan", "seerah"]
+    assert client.coverage["topics"] == {"duas": 1, "seerah": 1}
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from services.ingest.lib.near_dupes import NearDuplicateIndex, _probe_buckets, near_duplicate_stage, simhash, title_tokens
+
+
+def test_title_tokens_drop_noise_and_uploader_name():
+    assert title_tokens("Story of Prophet Yusuf (AS) | Islamic Cartoon HD", "Zaky") == ["story", "prophet", "yusuf"]
+    assert title_tokens("Learn Arabic with Zaky", "Zaky") == ["learn", "arabic"]
+    assert title_tokens("The Prophet's Mi'raj") == ["prophets", "miraj"]
+    assert simhash(title_tokens("STORY OF PROPHET YUSUF!!")) == simhash(title_tokens("Story of Prophet Yusuf for kids"))
+
+
+def test_index_tags_reuploads_and_keeps_distinct_episodes(tmp_path: Path):
+    path = tmp_path / "near_dupes.sqlite"
+    index = NearDuplicateIndex(path)
+    assert index.check("a", "Story of Prophet Yusuf for kids", 300, "Zaky") is None
+    assert index.check("b", "STORY OF PROPHET YUSUF (AS) | Islamic Cartoon", 304, "Mirror") == "a"
+    # Same title but a different length is a different video
+    assert index.check("c", "Story of Prophet Yusuf", 900) is None
+    # Episode numbers must agree
+    assert index.check("e3", "Zaky Episode 3", 200) is None
+    assert index.check("e4", "Zaky Episode 4", 200) is None
+    assert index.stats()["duplicates"] == 1
+    index.close()
+
+    # Persisted between runs, and re-checking a known id is stable
+    index = NearDuplicateIndex(path)
+    assert index.check("b", "anything", 1) == "a"
+    assert index.check("a", "Story of Prophet Yusuf for kids", 300) is None
+    recs = [
+        {"video_id": "m", "title": "Story of prophet Yusuf - full video", "duration_seconds": 299},
+        {"video_id": "n", "title": "Wudu song"},
+    ]
+    out = list(near_duplicate_stage(recs, index))
+    assert out[0]["duplicate_of"] == "a"
+    assert "duplicate_of" not in out[1]
+    index.close()
+
+
+def test_long_videos_match_across_several_duration_buckets():
+    # 3% of an hour is ~108s: several 30s buckets either way
+    assert _probe_buckets(3600) == list(range(116, 124))
+    assert _probe_buckets(40) == [1]
+    assert _probe_buckets(None) == [-1]
+    index = NearDuplicateIndex()
+    assert index.check("long", "Seerah full lecture part 2", 3600) is None
+    assert index.check("mirror", "SEERAH LECTURE PART 2 (HD)", 3700) == "long"
+    assert index.check("cut", "Seerah lecture part 2", 3500) == "long"
+    assert index.check("other", "Seerah lecture part 2", 3400) is None
@@ -0,0 +1,108 @@
+import random
+import time
+
+from services.ingest.lib import pipeline
+from services.ingest.lib.store.firestore_writer import FirestoreContentWriter
+
+
+def test_ordered_map_keeps_input_order():
+    def _slow(i):
+        time.sleep(random.random() / 200)
+        return i * i
+
+    assert list(pipeline.ordered_map(_slow, range(20), 4)) == [i * i for i in range(20)]
+    assert list(pipeline.ordered_map(_slow, range(5), 1)) == [0, 1, 4, 9, 16]
+
+
+def test_ordered_map_is_lazy():
+    started = []
+
+    def _track(i):
+        started.append(i)
+        return i
+
+    it = pipeline.ordered_map(_track, range(100), 2)
+    assert next(it) == 0
+    # Window is 2 * concurrency, so far fewer than 100 calls were submitted
+    assert len(started) <= 5
+    it.close()
+
+
+def test_enrich_stage_uses_micro_batches(monkeypatch):
+    batches = []
+
+    def _enrich(records, api_key):
+        batches.append(len(records))
+        for r in records:
+            r["enriched"] = True
+
+    monkeypatch.setattr(pipeline, "enrich_records", _enrich)
+    out = list(pipeline.enrich_stage(({"video_id": str(i)} for i in range(120)), "key"))
+    assert batches == [50, 50, 20]
+    assert [r["video_id"] for r in out] == [str(i) for i in range(120)]
+    assert all(r["enriched"] for r in out)
+
+
+def test_language_filter_stage_counts():
+    counter = pipeline.StageCounter()
+    recs = [{"is_english": True}, {"language": "ar"}, {"text_language": "en", "text_lang_conf": 0.9}]
+    kept = list(pipeline.language_filter_stage(recs, "en", counter))
+    assert len(kept) == 2
+    assert (counter.seen, counter.kept) == (3, 2)
+
+
+class _StubBatch:
+    def __init__(self, log):
+        self.log = log
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append(ref)
+
+    def commit(self):
+        self.log.append(len(self.ops))
+
+
+class _StubClient:
+    def __init__(self):
+        self.commits = []
+
+    def batch(self):
+        return _StubBatch(self.commits)
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return doc_id
+
+
+def test_firestore_writer_commits_incrementally():
+    client = _StubClient()
+    writer = FirestoreContentWriter(client, max_in_flight=1)
+    for i in range(450):
+        writer.add({"video_id": f"v{i}"})
+        if i == 399:
+            assert client.commits == [400]
+    assert writer.close() == 450
+    assert client.commits == [400, 50]
+
+
+def test_enrich_stage_overlaps_batches_and_keeps_order(monkeypatch):
+    import threading
+
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def _enrich(records, api_key):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+
+    monkeypatch.setattr(pipeline, "enrich_records", _enrich)
+    out = list(pipeline.enrich_stage(({"video_id": str(i)} for i in range(400)), "key", max_in_flight=4))
+    assert [r["video_id"] for r in out] == [str(i) for i in range(400)]
+    assert 1 < active["max"] <= 4
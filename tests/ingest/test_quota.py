@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from services.ingest import cli
+from services.ingest.lib import youtube
+from services.ingest.lib.quota import QuotaExceeded, QuotaLedger, estimate_source_units
+
+
+def test_ledger_counts_units_per_endpoint():
+    ledger = QuotaLedger()
+    ledger.charge("/search")
+    ledger.charge("/videos")
+    ledger.charge("/videos")
+    rep = ledger.report()
+    assert rep["used"] == 102
+    assert rep["endpoints"]["/search"] == {"calls": 1, "units": 100}
+    assert rep["endpoints"]["/videos"] == {"calls": 2, "units": 2}
+
+
+def test_ledger_refuses_calls_over_budget():
+    ledger = QuotaLedger(budget=50)
+    ledger.charge("/playlistItems")
+    with pytest.raises(QuotaExceeded):
+        ledger.charge("/search")
+    assert ledger.used == 1
+    assert ledger.report()["refused_calls"] == 1
+
+
+def test_yt_api_does_not_retry_quota_errors(monkeypatch):
+    calls = []
+
+    def _fail(path, params, api_key):
+        calls.append(path)
+        raise RuntimeError("HTTP 403 for url - quota (reason: quotaExceeded)")
+
+    monkeypatch.setattr(youtube, "http_get_json", _fail)
+    previous = youtube.set_quota_ledger(QuotaLedger())
+    try:
+        with pytest.raises(RuntimeError):
+            youtube.yt_api("/videos", {}, "KEY")
+        assert len(calls) == 1
+        assert youtube.get_quota_ledger().used == 1
+    finally:
+        youtube.set_quota_ledger(previous)
+
+
+def test_estimate_source_units():
+    assert estimate_source_units("channel_id", 100, True, False) == 3
+    assert estimate_source_units("channel_id", 100, True, False, uploads_known=True) == 2
+    assert estimate_source_units("handle", 50, False, True) == 103
+    assert estimate_source_units("playlist_id", 10, True, False) == 1
+
+
+def test_run_ingest_admits_stalest_sources_within_budget(tmp_path: Path, monkeypatch):
+    csv_path = tmp_path / "channels.csv"
+    csv_path.write_text(
+        "source,source_ref,name,notes\n"
+        "youtube,https://www.youtube.com/channel/UCaaaaaaaaaaaaaaaaaaaaaa,A,\n"
+        "youtube,https://www.youtube.com/channel/UCbbbbbbbbbbbbbbbbbbbbbb,B,\n"
+        "youtube,@unresolved,C,\n"
+    )
+    state_path = tmp_path / "state.json"
+    state_path.write_text(json.dumps({"UCaaaaaaaaaaaaaaaaaaaaaa": "old"}))
+    fetched = []
+
+    def _channel(channel_id, api_key, limit, *args):
+        fetched.append(channel_id)
+        yield {"video_id": f"{channel_id}-1", "channel_id": channel_id}
+
+    monkeypatch.setattr(cli, "iter_channel_videos", _channel)
+    monkeypatch.setattr(cli, "resolve_channel_cached", lambda kind, value, *a: value if kind == "channel_id" else None)
+    out = tmp_path / "out" / "videos"
+    # B (never ingested) costs 1 unit; C would need a 100-unit search; A has state
+    rc = cli.run_ingest(csv_path, out, 10, "key", False, "any", state_path=state_path, quota_budget=4)
+    assert rc == 0
+    assert fetched == ["UCaaaaaaaaaaaaaaaaaaaaaa", "UCbbbbbbbbbbbbbbbbbbbbbb"]
@@ -0,0 +1,137 @@
+from pathlib import Path
+
+from services.ingest.lib import resolve, youtube
+from services.ingest.lib.io import SourceRow
+from services.ingest.lib.resolve import ResolutionCache, build_channels_map
+
+UC = "UC178EmfQAV3OT-UpuO6WUMg"
+
+
+def test_derive_uploads_playlist_id():
+    assert youtube.derive_uploads_playlist_id(UC) == "UU178EmfQAV3OT-UpuO6WUMg"
+    assert youtube.derive_uploads_playlist_id("not-a-channel") is None
+
+
+def test_iter_channel_videos_skips_channels_lookup(monkeypatch):
+    paths = []
+
+    def _yt_api(path, params, api_key):
+        paths.append(path)
+        return {"items": [{"snippet": {"resourceId": {"kind": "youtube#video", "videoId": "v1"}}}]}
+
+    monkeypatch.setattr(youtube, "yt_api", _yt_api)
+    recs = list(youtube.iter_channel_videos(UC, "key", 1))
+    assert [r["video_id"] for r in recs] == ["v1"]
+    assert paths == ["/playlistItems"]
+
+
+def test_iter_channel_videos_falls_back_when_derived_playlist_missing(monkeypatch):
+    calls = []
+    resolved = {}
+
+    def _yt_api(path, params, api_key):
+        calls.append((path, params.get("playlistId")))
+        if path == "/playlistItems" and params["playlistId"].startswith("UU"):
+            raise RuntimeError("HTTP 404 for url - not found (reason: playlistNotFound)")
+        if path == "/channels":
+            return {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": "PLuploads"}}}]}
+        return {"items": [{"snippet": {"resourceId": {"kind": "youtube#video", "videoId": "v2"}}}]}
+
+    monkeypatch.setattr(youtube, "yt_api", _yt_api)
+    recs = list(youtube.iter_channel_videos(UC, "key", 1, on_uploads_resolved=resolved.__setitem__))
+    assert [r["video_id"] for r in recs] == ["v2"]
+    assert [c[0] for c in calls] == ["/playlistItems", "/channels", "/playlistItems"]
+    assert resolved == {UC: "PLuploads"}
+
+
+def test_iter_channel_videos_empty_uploads_playlist_does_not_search(monkeypatch):
+    calls = []
+
+    def _yt_api(path, params, api_key):
+        calls.append(path)
+        if path == "/playlistItems":
+            raise RuntimeError("HTTP 404 for url - not found (reason: playlistNotFound)")
+        if path == "/channels":
+            return {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": youtube.derive_uploads_playlist_id(UC)}}}]}
+        raise AssertionError(f"unexpected {path}")
+
+    monkeypatch.setattr(youtube, "yt_api", _yt_api)
+    assert list(youtube.iter_channel_videos(UC, "key", 5)) == []
+    assert calls == ["/playlistItems", "/channels"]
+
+
+def test_resolution_cache_persists_positive_and_negative(tmp_path: Path, monkeypatch):
+    calls = []
+
+    def _resolve(kind, value, api_key, relevance_language=None):
+        calls.append(value)
+        return "UCfound" if value == "@found" else None
+
+    monkeypatch.setattr(resolve, "resolve_channel_id", _resolve)
+    rows = [
+        SourceRow("youtube", "@found", "Found"),
+        SourceRow("youtube", "@missing", "Missing"),
+        SourceRow("youtube", f"https://www.youtube.com/channel/{UC}", "Canonical"),
+    ]
+    path = tmp_path / "resolve.json"
+    cache = ResolutionCache(path)
+    first = build_channels_map(rows, "key", cache=cache)
+    cache.save()
+    assert first["@found"] == "UCfound"
+    assert "@missing" not in first
+    assert calls == ["@found", "@missing"]
+
+    calls.clear()
+    reloaded = ResolutionCache(path)
+    assert build_channels_map(rows, "key", cache=reloaded) == first
+    assert calls == []
+    assert reloaded.counters == {"hits": 1, "negative_hits": 1, "misses": 0}
+
+    # Negative entries expire sooner and get retried
+    expired = ResolutionCache(path, negative_ttl=-1)
+    expired.refs["@missing"]["ttl"] = -1
+    build_channels_map(rows, "key", cache=expired)
+    assert calls == ["@missing"]
+
+
+def test_cached_uploads_answers_skip_channels_lookup(tmp_path: Path, monkeypatch):
+    calls = []
+    empty = "UC" + "x" * 22
+    uploads = {UC: None, empty: youtube.derive_uploads_playlist_id(empty)}
+
+    def _yt_api(path, params, api_key):
+        calls.append(path)
+        if path == "/playlistItems":
+            raise RuntimeError("HTTP 404 for url - not found (reason: playlistNotFound)")
+        if path == "/channels":
+            playlist = uploads[params["id"]]
+            return {"items": [{"contentDetails": {"relatedPlaylists": {"uploads": playlist}}}] if playlist else []}
+        return {"items": [{"id": {"kind": "youtube#video", "videoId": "v3"}, "snippet": {}}]}
+
+    def _run(cache):
+        out = {}
+        for cid in uploads:
+            found, known = cache.uploads_for(cid)
+            out[cid] = list(youtube.iter_channel_videos(cid, "key", 1, None, known, cache.store_uploads, None, found))
+        cache.save()
+        return out
+
+    monkeypatch.setattr(youtube, "yt_api", _yt_api)
+    path = tmp_path / "resolve.json"
+    first = _run(ResolutionCache(path))
+    assert [r["video_id"] for r in first[UC]] == ["v3"] and first[empty] == []
+    assert calls.count("/channels") == 2
+
+    # Second run: no uploads playlist goes straight to search, the derived one is retried once
+    calls.clear()
+    second = _run(ResolutionCache(path))
+    assert second == first
+    assert calls == ["/search", "/playlistItems"]
+
+    # Expired answers are looked up again
+    calls.clear()
+    cache = ResolutionCache(path)
+    for entry in cache.uploads.values():
+        entry["ttl"] = -1
+    _run(cache)
+    assert calls.count("/channels") == 2
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from services.ingest.lib import youtube
+from services.ingest.lib.state import IngestState, SourceProgress, STATE_SCHEMA_VERSION
+
+
+def test_migrates_flat_state():
+    state = IngestState.from_json({"UC1": "vid9"})
+    s = state.get("UC1")
+    assert s.recent_ids == ["vid9"]
+    assert s.watermark is None
+    assert s.is_known({"video_id": "vid9"})
+
+
+def test_update_keeps_ring_and_watermark(tmp_path: Path):
+    state = IngestState.from_json({"UC1": "old"})
+    progress = SourceProgress()
+    for vid, ts in [("n2", "2024-02-02T00:00:00Z"), ("n1", "2024-02-01T00:00:00Z")]:
+        progress.add({"video_id": vid, "published_at": ts})
+    state.update("UC1", progress)
+    path = tmp_path / "state.json"
+    state.save(path)
+
+    loaded = IngestState.load(path)
+    s = loaded.get("UC1")
+    assert loaded.to_json()["schema_version"] == STATE_SCHEMA_VERSION
+    assert s.recent_ids == ["n2", "n1", "old"]
+    assert s.watermark == "2024-02-02T00:00:00Z"
+    assert s.is_older({"published_at": "2024-01-31T00:00:00Z"})
+    assert not s.is_older({"published_at": "2024-02-02T00:00:00Z"})
+
+
+def test_staleness_orders_missing_then_oldest_watermark():
+    state = IngestState.from_json(
+        {
+            "schema_version": 2,
+            "sources": {
+                "new": {"watermark": "2024-05-01T00:00:00Z", "recent_ids": ["a"]},
+                "old": {"watermark": "2023-01-01T00:00:00Z", "recent_ids": ["b"]},
+            },
+        }
+    )
+    keys = sorted(["new", "missing", "old"], key=state.staleness_key)
+    assert keys == ["missing", "old", "new"]
+
+
+def test_playlist_paging_stops_at_fully_older_page(monkeypatch):
+    pages = {
+        None: (["2024-03-01T00:00:00Z", "2024-01-15T00:00:00Z"], "p2"),
+        "p2": (["2023-12-01T00:00:00Z", "2023-11-01T00:00:00Z"], "p3"),
+        "p3": (["2023-10-01T00:00:00Z"], None),
+    }
+    requested = []
+
+    def _yt_api(path, params, api_key):
+        token = params.get("pageToken")
+        requested.append(token)
+        dates, nxt = pages[token]
+        items = [
+            {"snippet": {"publishedAt": d, "resourceId": {"kind": "youtube#video", "videoId": f"{token}-{i}"}}}
+            for i, d in enumerate(dates)
+        ]
+        return {"items": items, "nextPageToken": nxt}
+
+    monkeypatch.setattr(youtube, "yt_api", _yt_api)
+    recs = list(youtube.iter_playlist_videos("UU1", "key", 100, stop_before="2024-01-01T00:00:00Z"))
+    assert requested == [None, "p2"]
+    assert len(recs) == 4
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from services.ingest.lib import enrich, textlang
+from services.ingest.lib.textlang import TextLanguageDetector, normalize_text
+
+
+def _fake_detect(calls):
+    def _detect(text):
+        calls.append(text)
+        return ("ar", 0.9) if "salam" in text else ("en", 0.99)
+    return _detect
+
+
+def test_detect_many_caches_by_normalized_text(tmp_path: Path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(textlang, "detect_text_language", _fake_detect(calls))
+    det = TextLanguageDetector(tmp_path / "textlang.sqlite")
+    out = det.detect_many(["Hello  world\nagain", "Hello world again", "salam alaykum"])
+    assert out == [("en", 0.99), ("en", 0.99), ("ar", 0.9)]
+    assert calls == ["Hello world again", "salam alaykum"]
+    assert det.stats() == {"cached": 1, "detected": 2, "skipped": 0}
+    det.close()
+
+    # A new detector reuses the persisted results
+    calls.clear()
+    det2 = TextLanguageDetector(tmp_path / "textlang.sqlite")
+    assert det2.detect_many(["salam   alaykum"]) == [("ar", 0.9)]
+    assert calls == []
+    det2.close()
+
+
+def test_normalize_text():
+    assert normalize_text("  a \n\t b ") == "a b"
+
+
+def test_enrich_skips_detection_when_language_is_conclusive(monkeypatch):
+    calls = []
+    monkeypatch.setattr(textlang, "detect_text_language", _fake_detect(calls))
+    det = TextLanguageDetector()
+    previous = enrich.set_text_language_detector(det)
+    monkeypatch.setattr(
+        enrich,
+        "fetch_videos_info",
+        lambda ids, api_key: {
+            "A": {"snippet": {"defaultAudioLanguage": "en-US", "defaultLanguage": "en", "title": "Story time for kids"}},
+            "B": {"snippet": {"defaultAudioLanguage": "en", "title": "salam alaykum everyone"}},
+            # Tags agree but the title is in another script: the text hint still decides is_english
+            "C": {"snippet": {"defaultAudioLanguage": "ar", "defaultLanguage": "ar", "title": "Story time"}},
+        },
+    )
+    try:
+        records = [{"video_id": "A"}, {"video_id": "B"}, {"video_id": "C"}]
+        enrich.enrich_records(records, "key")
+    finally:
+        enrich.set_text_language_detector(previous)
+    assert calls == ["salam alaykum everyone", "Story time"]
+    assert "text_language" not in records[0]
+    assert records[0]["is_english"] is True
+    assert records[1]["text_language"] == "ar"
+    assert records[2]["language"] == "ar" and records[2]["is_english"] is True
+    assert det.stats()["skipped"] == 1
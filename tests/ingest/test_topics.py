@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from services.ingest import backfill_topics
+from services.ingest.lib import pipeline
+from services.ingest.lib.store import firestore_writer
+from services.ingest.lib.store.feeds import FEED_TOPICS
+from services.ingest.lib.topics import TopicTagger, topic_dictionaries
+
+
+def test_dictionaries_cover_feed_topics_and_policy_slugs():
+    dicts = topic_dictionaries(["seerah", "quran_recitation"])
+    assert set(FEED_TOPICS) <= set(dicts)
+    assert dicts["quran_recitation"] == ["quran recitation", "quran recitations"]
+    tagger = TopicTagger(dicts)
+    assert tagger.tag_text("Quran Recitation by kids") == ["quran_recitation"]
+
+
+def test_tagger_matches_whole_words_and_phrases():
+    tagger = TopicTagger()
+    assert tagger.tag_text("Story of Prophet Yusuf | Islamic Stories") == ["prophets", "stories"]
+    assert tagger.tag_text("Du'a before sleeping") == ["duas"]
+    assert tagger.tag_text("The life of the Prophet") == ["prophets", "seerah"]
+    # Whole words only: "dual" is not "dua", "storyboard" is not "story"
+    assert tagger.tag_text("Dual storyboard") == []
+
+
+def test_topic_stage_merges_topics_in_batches():
+    recs = [
+        {"video_id": "1", "title": "Ramadan iftar ideas", "topics": ["custom"]},
+        {"video_id": "2", "title": "Cartoon"},
+        {"video_id": "3", "title": "Nasheed", "description": "vocals only"},
+    ]
+    counter = pipeline.TopicCounter()
+    out = list(pipeline.topic_stage(recs, TopicTagger(), batch_size=2, counter=counter))
+    assert [r["video_id"] for r in out] == ["1", "2", "3"]
+    assert out[0]["topics"] == ["custom", "ramadan"]
+    assert "topics" not in out[1]
+    assert (counter.seen, counter.tagged) == (3, 2)
+    assert counter.per_topic == {"custom": 1, "ramadan": 1, "nasheeds": 1}
+
+
+def test_backfill_writes_only_retagged_docs(tmp_path: Path):
+    snapshot = tmp_path / "content.ndjson"
+    recs = [
+        {"video_id": "a", "title": "Morning adhkar"},
+        {"video_id": "b", "title": "Cartoon"},
+        {"video_id": "c", "title": "Seerah", "topics": ["seerah"]},
+    ]
+    snapshot.write_text("".join(json.dumps(r) + "\n" for r in recs))
+    out = tmp_path / "retagged.ndjson"
+    assert backfill_topics.main(["--ndjson", str(snapshot), "--out", str(out)]) == 0
+    assert [json.loads(line) for line in out.read_text().splitlines()] == [
+        {"video_id": "a", "title": "Morning adhkar", "topics": ["duas"]}
+    ]
+
+
+def test_firestore_backfill_rebuilds_feed_snapshots(monkeypatch):
+    client = object()
+    written, rebuilt = [], []
+
+    class _Writer:
+        def __init__(self, client, collection, max_in_flight=4):
+            pass
+
+        def add(self, payload):
+            written.append(payload)
+
+        def close(self):
+            return len(written)
+
+        def counts(self):
+            return {"written": len(written), "skipped": 0, "failed": 0, "retries": 0}
+
+    docs = [{"video_id": "a", "title": "Ramadan nights"}, {"video_id": "b", "title": "Cartoon"}]
+    monkeypatch.setattr(firestore_writer, "firestore_client", lambda project: client)
+    monkeypatch.setattr(firestore_writer, "FirestoreContentWriter", _Writer)
+    monkeypatch.setattr(backfill_topics, "iter_firestore", lambda c, collection: iter(docs))
+    monkeypatch.setattr(backfill_topics, "write_feed_snapshots", lambda c, collection, size: rebuilt.append((c, collection, size)) or 36)
+
+    assert backfill_topics.main(["--firestore-project", "proj", "--feed-size", "12"]) == 0
+    assert written == [{"video_id": "a", "topics": ["ramadan"]}]
+    assert rebuilt == [(client, "content", 12)]
+
+    # Nothing re-tagged: feeds are left alone
+    written.clear()
+    rebuilt.clear()
+    docs[0]["topics"] = ["ramadan"]
+    assert backfill_topics.main(["--firestore-project", "proj"]) == 0
+    assert rebuilt == []
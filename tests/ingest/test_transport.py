@@ -0,0 +1,93 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.ingest.lib import youtube
+from services.ingest.lib.transport import PooledTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers = set()
+
+    def do_GET(self):
+        type(self).peers.add(self.client_address)
+        if self.path.startswith("/youtube/v3/missing"):
+            body = json.dumps({"error": {"message": "gone", "errors": [{"reason": "notFound"}]}}).encode()
+            status = 404
+        else:
+            body = json.dumps({"path": self.path, "ae": self.headers.get("Accept-Encoding")}).encode()
+            status = 200
+        gz = gzip.compress(body)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(gz)))
+        self.end_headers()
+        self.wfile.write(gz)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    _Handler.peers = set()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_pooled_transport_reuses_connection_and_decompresses(server):
+    tr = PooledTransport()
+    for i in range(5):
+        resp = tr.get(f"{server}/ping?i={i}")
+        assert resp.status == 200
+        data = json.loads(resp.body)
+        assert data["path"] == f"/ping?i={i}"
+        assert data["ae"] == "gzip"
+    stats = tr.stats.as_dict()
+    assert stats["calls"] == 5
+    assert stats["connections_opened"] == 1
+    assert len(_Handler.peers) == 1
+    tr.close()
+
+
+def test_pooled_transport_is_thread_safe(server):
+    tr = PooledTransport(max_idle_per_host=4)
+    errors = []
+
+    def _worker(n):
+        try:
+            for i in range(10):
+                assert tr.get(f"{server}/t{n}?i={i}").status == 200
+        except Exception as e:  # pragma: no cover - surfaced via assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert tr.stats.calls == 40
+    assert tr.stats.connections_opened <= 4
+    tr.close()
+
+
+def test_http_get_json_uses_installed_transport(server, monkeypatch):
+    monkeypatch.setattr(youtube, "API_BASE", f"{server}/youtube/v3")
+    previous = youtube.set_transport(PooledTransport())
+    try:
+        data = youtube.http_get_json("/videos", {"id": "abc"}, "KEY")
+        assert data["path"].startswith("/youtube/v3/videos?id=abc&key=KEY")
+        with pytest.raises(RuntimeError, match=r"HTTP 404 .* gone \(reason: notFound\)"):
+            youtube.http_get_json("/missing", {}, "KEY")
+    finally:
+        youtube.set_transport(previous)
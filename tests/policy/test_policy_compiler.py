@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+from services.ingest.lib.pipeline import PolicyCounter, policy_stage
+from services.policy.automaton import KeywordAutomaton
+from services.policy.compiler import CompiledPolicy, load_policy, save_compiled
+
+
+POLICY = {
+    "version": "v1",
+    "meta": {"community": "islamic_commons", "vertical": "kids"},
+    "eligibility": {
+        "age_range": [5, 12],
+        "allowed_topics": ["seerah", "Stories"],
+        "blocked_topics": ["violence"],
+        "blocked_keywords": ["prank", "Challenge gone wrong"],
+    },
+    "review": {"require_human": True, "reviewers_min": 1},
+    "labels": {"safe_tags": ["educational"], "risky_tags": ["challenge"]},
+}
+
+
+def test_automaton_matches_at_word_starts():
+    ac = KeywordAutomaton(["he", "she", "his", "hers", "art"])
+    found = {ac.patterns[i] for i in ac.find("Ushers: HIS start")}
+    # "she"/"he" are mid-word in "ushers"; "art" is mid-word in "start"
+    assert found == {"his"}
+    # No end boundary: "hers" also contains the word-start match "he"
+    assert {ac.patterns[i] for i in ac.find("she sells hers")} == {"she", "he", "hers"}
+
+
+def test_evaluate_blocks_keywords_and_topics():
+    policy = CompiledPolicy.from_source(POLICY)
+    assert policy.snapshot_id == "islamic_commons/kids@v1"
+    ok = policy.evaluate({"title": "Educational Seerah stories", "topics": ["seerah"]})
+    assert ok["eligible"] and ok["labels"] == ["educational"] and ok["on_topic"] is True
+    bad = policy.evaluate({"title": "Best PRANKS ever", "description": "a challenge-gone-wrong!", "topics": ["violence"]})
+    assert not bad["eligible"]
+    assert bad["reasons"] == ["blocked_keyword:challenge gone wrong", "blocked_keyword:prank", "blocked_topic:violence"]
+    assert bad["labels"] == ["challenge"]
+
+
+def test_compiled_artifact_round_trips(tmp_path: Path):
+    policy = CompiledPolicy.from_source(POLICY)
+    path = tmp_path / "kids.json"
+    save_compiled(policy, path)
+    loaded = load_policy(path)
+    assert loaded.rule_hashes == policy.rule_hashes
+    rec = {"title": "prank call"}
+    assert loaded.evaluate(rec) == policy.evaluate(rec)
+    # Artifacts from an older compiler are rebuilt from their rules
+    data = json.loads(path.read_text())
+    data["compiler_version"] = 0
+    assert CompiledPolicy.from_json(data).evaluate(rec) == policy.evaluate(rec)
+
+
+def test_policy_stage_annotates_batches():
+    policy = CompiledPolicy.from_source(POLICY)
+    counter = PolicyCounter()
+    recs = [{"video_id": str(i), "title": "prank" if i % 3 == 0 else "duas"} for i in range(10)]
+    out = list(policy_stage(recs, [policy], batch_size=4, counter=counter))
+    assert [r["video_id"] for r in out] == [str(i) for i in range(10)]
+    assert [r["eligible"] for r in out[:3]] == [False, True, True]
+    assert out[0]["policies"]["islamic_commons/kids"]["policy_id"] == "islamic_commons/kids@v1"
+    assert counter.evaluated == 10 and counter.ineligible == {"islamic_commons/kids@v1": 4}
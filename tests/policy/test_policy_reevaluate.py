@@ -0,0 +1,145 @@
+import copy
+import json
+from pathlib import Path
+
+from services.ingest.lib.store import firestore_writer
+from services.policy import cli
+from services.policy.cli import artifact_history, cmd_reevaluate, compiled_path, snapshot_path
+from services.policy.compiler import CompiledPolicy, save_compiled
+from services.policy.reevaluate import ReevalStats, reevaluate_records
+
+
+V1 = {
+    "version": "v1",
+    "meta": {"community": "islamic_commons", "vertical": "kids"},
+    "eligibility": {"allowed_topics": ["seerah"], "blocked_topics": ["violence"], "blocked_keywords": ["prank"]},
+    "labels": {"safe_tags": ["educational"], "risky_tags": []},
+}
+
+
+def _v2():
+    data = copy.deepcopy(V1)
+    data["version"] = "v2"
+    data["eligibility"]["blocked_keywords"] = ["challenge"]
+    data["labels"]["safe_tags"] = ["educational", "stories"]
+    return data
+
+
+def _catalog(policy):
+    recs = [
+        {"video_id": "a", "title": "Prank gone wrong"},
+        {"video_id": "b", "title": "Stories challenge", "topics": ["seerah"]},
+        {"video_id": "c", "title": "Educational duas"},
+        {"video_id": "d", "title": "Quiet night", "topics": ["violence"]},
+    ]
+    policy.apply(recs)
+    return recs
+
+
+def test_reevaluate_matches_full_evaluation():
+    v1, v2 = CompiledPolicy.from_source(V1), CompiledPolicy.from_source(_v2())
+    assert v2.changed_groups(v1) == ["blocked_keywords", "labels"]
+    for rec in _catalog(v1):
+        prior = rec["policies"][v1.key]
+        assert v2.reevaluate(rec, prior, v2.changed_groups(v1)) == v2.evaluate(rec)
+
+
+def test_only_flipped_records_are_yielded():
+    v1, v2 = CompiledPolicy.from_source(V1), CompiledPolicy.from_source(_v2())
+    recs = _catalog(v1)
+    recs.append({"video_id": "e", "title": "Challenge accepted"})  # never evaluated
+    stats = ReevalStats()
+    out = list(reevaluate_records(recs, v2, v1, stats))
+    assert {rec["video_id"]: d["eligible"] for rec, d in out} == {"a": True, "b": False, "e": False}
+    assert out[1][0]["policies"][v2.key]["labels"] == ["stories"]
+    assert (stats.scanned, stats.partial, stats.full, stats.to_eligible, stats.to_ineligible) == (5, 4, 1, 1, 2)
+    # No eligibility rule changed: stored decisions are reused without scanning
+    labels_only = CompiledPolicy.from_source({**V1, "version": "v3", "labels": {"safe_tags": ["x"]}})
+    stats = ReevalStats()
+    assert list(reevaluate_records(_catalog(v1), labels_only, v1, stats)) == []
+    assert stats.skipped == 4
+
+
+def test_cmd_reevaluate_ndjson_advances_baseline(tmp_path: Path):
+    v1 = CompiledPolicy.from_source(V1)
+    out_dir = tmp_path / "policy"
+    save_compiled(v1, compiled_path(out_dir, v1.key))
+    snapshot = tmp_path / "content.ndjson"
+    snapshot.write_text("".join(json.dumps(r) + "\n" for r in _catalog(v1)))
+    new_json = tmp_path / "v2.json"
+    save_compiled(CompiledPolicy.from_source(_v2()), new_json)
+
+    delta = tmp_path / "flipped.ndjson"
+    assert cmd_reevaluate(new_json, out_dir, ndjson=snapshot, out=delta, progress_every=0) == 0
+    assert sorted(json.loads(line)["video_id"] for line in delta.read_text().splitlines()) == ["a", "b"]
+    saved = json.loads(compiled_path(out_dir, v1.key).read_text())
+    assert saved["version"] == "v2"
+    assert snapshot_path(out_dir, "islamic_commons/kids@v2") == out_dir / "islamic_commons_kids@v2.json"
+    assert json.loads(snapshot_path(out_dir, "islamic_commons/kids@v2").read_text())["version"] == "v2"
+
+
+def test_docs_are_diffed_against_the_version_that_evaluated_them(tmp_path: Path):
+    v1, v2 = CompiledPolicy.from_source(V1), CompiledPolicy.from_source(_v2())
+    v3_source = _v2()
+    v3_source["version"] = "v3"
+    v3_source["eligibility"]["blocked_topics"] = ["violence", "scary"]
+    v3 = CompiledPolicy.from_source(v3_source)
+    for policy in (v1, v2):
+        save_compiled(policy, snapshot_path(tmp_path, policy.snapshot_id))
+
+    recs = _catalog(v1)
+    recs.append({"video_id": "f", "title": "Scary story", "topics": ["scary"]})
+    v1.apply(recs[-1:])
+    # v2 run: only a and b flip, so c, d and f keep their v1 decisions
+    assert [r["video_id"] for r, _ in reevaluate_records(recs, v2, v1)] == ["a", "b"]
+    assert sorted({r["policies"][v1.key]["policy_id"] for r in recs}) == [v1.snapshot_id, v2.snapshot_id]
+
+    stats = ReevalStats()
+    out = list(reevaluate_records(recs, v3, v2, stats, history=artifact_history(tmp_path)))
+    assert [r["video_id"] for r, _ in out] == ["f"]
+    # Nothing needed a full evaluation: v1 docs were diffed v1 → v3, v2 docs v2 → v3
+    assert (stats.full, stats.partial) == (0, 5)
+    for rec in recs:
+        assert rec["policies"][v3.key]["eligible"] == v3.evaluate(rec)["eligible"]
+    assert out[0][1] == v3.evaluate(out[0][0])
+
+
+def test_firestore_reevaluate_rebuilds_feed_snapshots(tmp_path: Path, monkeypatch):
+    v1 = CompiledPolicy.from_source(V1)
+    out_dir = tmp_path / "policy"
+    save_compiled(v1, compiled_path(out_dir, v1.key))
+    new_json = tmp_path / "v2.json"
+    save_compiled(CompiledPolicy.from_source(_v2()), new_json)
+    client = object()
+    written, rebuilt = [], []
+
+    class _Writer:
+        def __init__(self, client, collection, max_in_flight=4):
+            self.client = client
+
+        def add(self, payload):
+            written.append(payload)
+
+        def close(self):
+            return len(written)
+
+        def counts(self):
+            return {"written": len(written), "skipped": 0, "failed": 0, "retries": 0}
+
+    monkeypatch.setattr(firestore_writer, "firestore_client", lambda project: client)
+    monkeypatch.setattr(firestore_writer, "FirestoreContentWriter", _Writer)
+    monkeypatch.setattr(cli, "iter_firestore", lambda c, collection: iter(_catalog(v1)))
+    monkeypatch.setattr(cli, "write_feed_snapshots", lambda c, collection, size: rebuilt.append((c, collection, size)) or 36)
+
+    argv = ["reevaluate", str(new_json), "--out-dir", str(out_dir), "--firestore-project", "proj", "--progress-every", "0"]
+    assert cli.main(argv + ["--feed-size", "12"]) == 0
+    # Stored snapshots still carry the old eligibility of the flipped docs
+    assert sorted(p["video_id"] for p in written) == ["a", "b"]
+    assert rebuilt == [(client, "content", 12)]
+
+    # Nothing flipped against the saved v2 baseline: feeds are left alone
+    written.clear()
+    rebuilt.clear()
+    monkeypatch.setattr(cli, "iter_firestore", lambda c, collection: iter(_catalog(CompiledPolicy.from_source(_v2()))))
+    assert cli.main(argv) == 0
+    assert written == [] and rebuilt == []